@@ -0,0 +1,47 @@
+"""Fernet gegen AES-256-GCM: Dateigröße, Speichern und Entsperren des ganzen Tresors.
+
+    python -m benchmarks.cipher --entries 1000 10000 100000
+"""
+import os
+
+from benchmarks.common import (
+    build_manager, format_bytes, format_seconds, measure, parse_args, print_header, synthetic_entries,
+    temp_vault_path
+)
+from core.password_storage import PasswordEntry, PasswordManager
+from core.vault_format import encode_vault
+
+# (Bezeichnung, cipher, vault_layout); Fernet gibt es nur im Block-Format
+SETTINGS = (
+    ("Fernet", 'fernet', 'blob'),
+    ("GCM Block", 'aes-256-gcm', 'blob'),
+    ("GCM Records", 'aes-256-gcm', 'records'),
+)
+
+
+def unlock(path: str):
+    pm = PasswordManager(path)
+    if not pm.unlock_database("benchmark"):
+        raise RuntimeError("Entsperren fehlgeschlagen")
+
+
+def main():
+    args = parse_args("Verschlüsselung: Fernet gegen AES-GCM", rounds=3)
+
+    for count in args.entries:
+        # Unkomprimierter Inhalt als Bezug für den Aufschlag der Verschlüsselung
+        plain = len(encode_vault({'entries': [PasswordEntry(**fields).to_dict() for fields in synthetic_entries(count)]}))
+
+        print_header(f"{count} Einträge, Inhalt {format_bytes(plain).strip()}")
+        print(f"{'':12} {'Größe':>12} {'Aufschlag':>9} {'Speichern':>11} {'Entsperren':>11}")
+        for label, cipher, layout in SETTINGS:
+            path = temp_vault_path()
+            pm = build_manager(count, path, cipher=cipher, vault_layout=layout, compression='none')
+            save = measure(pm.save_database, args.rounds)
+            size = os.path.getsize(path)
+            print(f"{label:12} {format_bytes(size)} {(size - plain) / plain:8.1%} {format_seconds(save)} "
+                  f"{format_seconds(measure(lambda: unlock(path), args.rounds))}")
+
+
+if __name__ == '__main__':
+    main()
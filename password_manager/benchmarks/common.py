@@ -0,0 +1,95 @@
+"""Gemeinsame Hilfen der Benchmark-Skripte: synthetische Einträge, Test-Tresore und Zeitmessung.
+
+Die Skripte werden aus dem Projektordner als Modul gestartet, z.B.:
+
+    python -m benchmarks.title_index --entries 1000 10000 100000
+"""
+import argparse
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Iterable
+
+# Wie main.py: core.* und gui.* relativ zum Projektordner importieren
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.password_storage import PasswordManager
+
+# Schnelle Schlüsselableitung, damit Speichern/Entsperren nicht von der KDF dominiert wird (siehe benchmarks.kdf)
+FAST_KDF = {'algorithm': 'pbkdf2-sha256', 'iterations': 1000}
+DEFAULT_COUNTS = (1000, 10000)
+
+
+def parse_args(description: str, counts: Iterable[int] = DEFAULT_COUNTS, rounds: int = 5) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--entries', type=int, nargs='+', default=list(counts),
+                        help="Anzahl synthetischer Einträge (mehrere Werte möglich)")
+    parser.add_argument('--rounds', type=int, default=rounds, help="Wiederholungen, gemeldet wird die schnellste")
+    return parser.parse_args()
+
+
+def synthetic_entry(i: int) -> dict:
+    return {
+        'title': f"Konto {i:06d} Beispiel",
+        'username': f"benutzer{i}@example.com",
+        'password': f"Pw-{i:08x}-Xy!9",
+        'url': f"https://login{i % 500}.example.com/anmelden",
+        'notes': f"Notiz zu Konto {i}\nKundennummer {i * 7919}" if i % 3 == 0 else "",
+        'totp_secret': "JBSWY3DPEHPK3PXP" if i % 10 == 0 else "",
+        'category': ("Work", "Personal", "Banking", "Other")[i % 4],
+    }
+
+
+def synthetic_entries(count: int) -> list:
+    return [synthetic_entry(i) for i in range(count)]
+
+
+def temp_vault_path() -> str:
+    directory = tempfile.mkdtemp(prefix="pm-benchmark-")
+    atexit.register(shutil.rmtree, directory, True)
+    return os.path.join(directory, "vault.enc")
+
+
+def build_manager(count: int, path: str = None, password: str = "benchmark", **settings) -> PasswordManager:
+    """Entsperrter Tresor mit count Einträgen; settings setzen Attribute wie compression oder cipher"""
+    pm = PasswordManager(path or temp_vault_path())
+    for name, value in settings.items():
+        setattr(pm, name, value)
+    pm.create_new_database(password, FAST_KDF)
+    with pm.transaction():
+        for i in range(count):
+            pm.add_entry(**synthetic_entry(i))
+    return pm
+
+
+def measure(func: Callable[[], object], rounds: int = 5) -> float:
+    """Schnellste Laufzeit in Sekunden über rounds Aufrufe"""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:8.2f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds:8.2f} s "
+
+
+def format_bytes(size: int) -> str:
+    if size < 1024 * 1024:
+        return f"{size / 1024:9.1f} KB"
+    return f"{size / (1024 * 1024):9.1f} MB"
+
+
+def print_header(title: str):
+    print()
+    print(title)
+    print('-' * len(title))
@@ -0,0 +1,39 @@
+"""Kompression vor der Verschlüsselung: Dateigröße, Speichern und Entsperren je Verfahren und Stufe.
+
+    python -m benchmarks.compression --entries 1000 10000
+"""
+import os
+
+from benchmarks.common import (
+    build_manager, format_bytes, format_seconds, measure, parse_args, print_header, temp_vault_path
+)
+from core.password_storage import PasswordManager
+
+SETTINGS = (('none', 0), ('zlib', 1), ('zlib', 6), ('zlib', 9), ('lzma', 0), ('lzma', 6))
+
+
+def unlock(path: str):
+    pm = PasswordManager(path)
+    if not pm.unlock_database("benchmark"):
+        raise RuntimeError("Entsperren fehlgeschlagen")
+
+
+def main():
+    args = parse_args("Kompression: Größe, Speichern, Entsperren", rounds=3)
+
+    for count in args.entries:
+        for layout in ('records', 'blob'):
+            print_header(f"{count} Einträge, Layout {layout}")
+            print(f"{'':10} {'Größe':>12} {'Speichern':>11} {'Entsperren':>11}")
+            for compression, level in SETTINGS:
+                path = temp_vault_path()
+                pm = build_manager(count, path, vault_layout=layout, compression=compression,
+                                   compression_level=level)
+                save = measure(pm.save_database, args.rounds)
+                label = compression if compression == 'none' else f"{compression} {level}"
+                print(f"{label:10} {format_bytes(os.path.getsize(path))} {format_seconds(save)} "
+                      f"{format_seconds(measure(lambda: unlock(path), args.rounds))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Speicherbedarf und Aufbauzeit der Einträge sowie Volltextsuche, verglichen mit der früheren Eintragsklasse.
+
+    python -m benchmarks.entry_memory --entries 10000 100000
+"""
+import gc
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.common import (
+    format_bytes, format_seconds, measure, parse_args, print_header, synthetic_entries
+)
+from core.password_storage import PasswordEntry
+from core.secret_store import SecretStore
+from core.vault_format import decode_vault, encode_vault
+from gui.enhanced_search_manager import EnhancedSearchManager
+
+SEARCH_TERMS = ("konto 000999", "KUNDENNUMMER 7919", "nicht vorhanden")
+
+
+class LegacyEntry:
+    """Eintragsklasse vor __slots__: Attribute im __dict__, Zeitstempel als ISO-Strings, Geheimnisse im Klartext"""
+
+    def __init__(self, title, username, password, url="", notes="", totp_secret="", category="Other"):
+        self.title = title
+        self.username = username
+        self.password = password
+        self.url = url
+        self.notes = notes
+        self.totp_secret = totp_secret
+        self.category = category
+        self.created = datetime.now().isoformat()
+        self.modified = datetime.now().isoformat()
+
+    @classmethod
+    def from_dict(cls, data):
+        entry = cls(data['title'], data['username'], data['password'], data.get('url', ''),
+                    data.get('notes', ''), data.get('totp_secret', ''), data.get('category', 'Other'))
+        entry.created = data.get('created', datetime.now().isoformat())
+        entry.modified = data.get('modified', datetime.now().isoformat())
+        return entry
+
+
+def legacy_search(entries, term):
+    # Suche vor den gecachten Suchschlüsseln: lower() je Feld und Eintrag bei jedem Tastendruck
+    term = term.lower()
+    return [entry for entry in entries
+            if term in entry.title.lower() or term in entry.username.lower()
+            or term in entry.url.lower() or term in entry.notes.lower()]
+
+
+def build(factory, payload):
+    # Dekodieren und Aufbauen wie beim Entsperren
+    return [factory(row) for row in decode_vault(payload)['entries']]
+
+
+def retained_memory(factory, payload):
+    """Gibt (Einträge, belegte Bytes) zurück; gezählt wird nur, was die Einträge selbst festhalten"""
+    gc.collect()
+    tracemalloc.start()
+    entries = build(factory, payload)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return entries, retained
+
+
+def main():
+    args = parse_args("Einträge: Speicher, Aufbau, Suche", counts=(10000, 100000), rounds=3)
+
+    for count in args.entries:
+        payload = encode_vault({'entries': [PasswordEntry(**fields).to_dict() for fields in synthetic_entries(count)]})
+        secrets = SecretStore()
+
+        legacy_factory = LegacyEntry.from_dict
+        current_factory = lambda row: PasswordEntry.from_dict(row, secrets)
+        legacy, legacy_memory = retained_memory(legacy_factory, payload)
+        current, current_memory = retained_memory(current_factory, payload)
+        legacy_time = measure(lambda: build(legacy_factory, payload), args.rounds)
+        current_time = measure(lambda: build(current_factory, payload), args.rounds)
+
+        print_header(f"{count} Einträge")
+        print(f"{'':10} {'Speicher':>12} {'pro Eintrag':>12} {'Aufbau':>11}")
+        for label, memory, elapsed in (("vorher", legacy_memory, legacy_time),
+                                       ("jetzt", current_memory, current_time)):
+            print(f"{label:10} {format_bytes(memory)} {memory / count:10.0f} B {format_seconds(elapsed)}")
+
+        search = EnhancedSearchManager(None)
+        search.all_entries = current
+        for term in SEARCH_TERMS:
+            # Der erste Durchlauf füllt den Falt-Cache der Suche wie beim ersten Tastendruck
+            before = measure(lambda: legacy_search(legacy, term), args.rounds)
+            after = measure(lambda: search._filter_entries(term), args.rounds)
+            print(f"Suche {term!r:22} vorher {format_seconds(before)}  jetzt {format_seconds(after)}")
+
+
+if __name__ == '__main__':
+    main()
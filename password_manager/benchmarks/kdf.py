@@ -0,0 +1,116 @@
+"""Entsperrzeit und Spitzen-Speicherbedarf je KDF-Parametersatz.
+
+Jeder Kandidat wird in einem eigenen Prozess entsperrt, damit der gemessene Spitzenwert
+(VmHWM bzw. ru_maxrss) nur diese Schlüsselableitung enthält. scrypt reserviert seinen Speicher in
+OpenSSL, tracemalloc sieht ihn nicht; ohne das Modul resource (Windows) fehlt der Wert.
+
+    python -m benchmarks.kdf
+    python -m benchmarks.kdf --target 1.0 --rounds 3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import format_bytes, format_seconds, print_header, temp_vault_path
+from core.encryption import calibrate_kdf, scrypt_memory_bytes
+from core.password_storage import PasswordManager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+PASSWORD = "benchmark"
+CANDIDATES = (
+    {'algorithm': 'pbkdf2-sha256', 'iterations': 100000},
+    {'algorithm': 'pbkdf2-sha256', 'iterations': 310000},
+    {'algorithm': 'pbkdf2-sha256', 'iterations': 600000},
+    {'algorithm': 'scrypt', 'n': 2 ** 14, 'r': 8, 'p': 1},
+    {'algorithm': 'scrypt', 'n': 2 ** 15, 'r': 8, 'p': 1},
+    {'algorithm': 'scrypt', 'n': 2 ** 16, 'r': 8, 'p': 1},
+    {'algorithm': 'scrypt', 'n': 2 ** 17, 'r': 8, 'p': 1},
+)
+
+
+def peak_rss_bytes():
+    # ru_maxrss übernimmt unter Linux den Spitzenwert des Elternprozesses über exec hinweg,
+    # VmHWM gilt nur für den eigenen Adressraum
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux meldet KB, macOS Bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def measure_unlock(path: str) -> dict:
+    """Läuft im Kindprozess: ein Entsperren, Zeit und Zuwachs des Spitzen-Speichers"""
+    pm = PasswordManager(path)
+    before = peak_rss_bytes()
+    start = time.perf_counter()
+    if not pm.unlock_database(PASSWORD):
+        raise RuntimeError("Entsperren fehlgeschlagen")
+    seconds = time.perf_counter() - start
+    after = peak_rss_bytes()
+    return {'seconds': seconds, 'peak_bytes': None if before is None else after - before}
+
+
+def run_candidate(params: dict, rounds: int) -> dict:
+    path = temp_vault_path()
+    pm = PasswordManager(path)
+    pm.create_new_database(PASSWORD, params)
+    pm.lock_database()
+
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = []
+    for _ in range(rounds):
+        output = subprocess.run([sys.executable, '-m', 'benchmarks.kdf', '--unlock', path], cwd=project_dir,
+                                check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output.splitlines()[-1]))
+    return {'seconds': min(result['seconds'] for result in results),
+            'peak_bytes': max((result['peak_bytes'] for result in results), default=None)}
+
+
+def describe(params: dict) -> str:
+    if params['algorithm'] == 'scrypt':
+        return f"scrypt N=2^{params['n'].bit_length() - 1} r={params['r']} p={params['p']}"
+    return f"pbkdf2 {params['iterations']:>7} it."
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KDF-Parameter: Entsperrzeit und Speicherbedarf")
+    parser.add_argument('--target', type=float, default=0.5, help="Zielzeit für die kalibrierten Parameter (s)")
+    parser.add_argument('--rounds', type=int, default=3, help="Entsperrvorgänge je Kandidat")
+    parser.add_argument('--unlock', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.unlock:
+        print(json.dumps(measure_unlock(args.unlock)))
+        return
+
+    candidates = list(CANDIDATES)
+    for algorithm in ('pbkdf2-sha256', 'scrypt'):
+        calibrated = calibrate_kdf(args.target, algorithm)
+        if calibrated not in candidates:
+            candidates.append(calibrated)
+
+    print_header(f"Entsperren je Parametersatz (kalibriert auf {args.target} s)")
+    print(f"{'':24} {'Entsperren':>11} {'Spitze (RSS)':>13} {'scrypt-Formel':>13}")
+    for params in candidates:
+        result = run_candidate(params, args.rounds)
+        peak = "n/a" if result['peak_bytes'] is None else format_bytes(result['peak_bytes'])
+        formula = format_bytes(scrypt_memory_bytes(params)) if params['algorithm'] == 'scrypt' else ""
+        print(f"{describe(params):24} {format_seconds(result['seconds'])} {peak:>13} {formula:>13}")
+
+
+if __name__ == '__main__':
+    main()
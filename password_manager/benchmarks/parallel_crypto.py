@@ -0,0 +1,64 @@
+"""Verschlüsseln und Entschlüsseln in Blöcken mit 1..n Threads sowie der Aufwand je Aufruf des Thread-Pools.
+
+Aussagekräftig nur mit mehreren Kernen: das Skript meldet os.cpu_count() und warnt bei einem Kern.
+
+    python -m benchmarks.parallel_crypto --size 1 16 64 --workers 1 2 4 8
+"""
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import FAST_KDF, format_seconds, measure, print_header
+from core.encryption import DEFAULT_CHUNK_SIZE, PasswordEncryption, chunk_count, run_parallel
+
+SMALL_BATCHES = 1000
+
+
+def per_call_pool(func, items, workers):
+    # Verhalten vor dem gemeinsamen Pool: jeder Aufruf startet und beendet eigene Threads
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blockweise AES-GCM-Verschlüsselung im Thread-Pool")
+    parser.add_argument('--size', type=int, nargs='+', default=[1, 16, 64], help="Inhalt in MB")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    print(f"CPU-Kerne: {cores}")
+    if cores == 1:
+        print("Warnung: nur ein Kern, mehrere Threads können hier nicht schneller sein")
+
+    encryptor = PasswordEncryption()
+    encryptor.create_envelope("benchmark", FAST_KDF)
+
+    for size in args.size:
+        payload = os.urandom(size * 1024 * 1024)
+        count = chunk_count(len(payload), args.chunk_size)
+        chunks = {'size': args.chunk_size, 'count': count}
+        encrypted = encryptor.encrypt_payload(payload, 'aes-256-gcm', args.chunk_size)
+
+        print_header(f"{size} MB in {count} Blöcken")
+        print(f"{'Threads':8} {'Verschlüsseln':>13} {'Entschlüsseln':>13}")
+        for workers in args.workers:
+            encrypt = measure(lambda: encryptor.encrypt_payload(payload, 'aes-256-gcm', args.chunk_size, workers),
+                              args.rounds)
+            decrypt = measure(lambda: encryptor.decrypt_payload(encrypted, 'aes-256-gcm', chunks, workers),
+                              args.rounds)
+            print(f"{workers:<8} {format_seconds(encrypt):>13} {format_seconds(decrypt):>13}")
+
+    # Viele kleine Aufrufe wie beim Nachladen einzelner Geheimnis-Records
+    workers = max(args.workers)
+    items = range(2 * workers)
+    print_header(f"{SMALL_BATCHES} Aufrufe mit je {len(items)} Elementen, {workers} Threads")
+    for label, func in (("gemeinsamer Pool", run_parallel), ("Pool je Aufruf", per_call_pool)):
+        elapsed = measure(lambda: [func(abs, items, workers) for _ in range(SMALL_BATCHES)], args.rounds)
+        print(f"{label:18} {format_seconds(elapsed / SMALL_BATCHES)} pro Aufruf")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Titel-Lookup über den case-gefalteten Index im Vergleich zur früheren linearen Suche.
+
+    python -m benchmarks.title_index --entries 1000 10000 100000
+"""
+from benchmarks.common import build_manager, format_seconds, measure, parse_args, print_header
+
+LOOKUPS = 1000
+
+
+def linear_lookup(entries, title):
+    # Verhalten vor dem Index: jeder Aufruf durchsucht alle Einträge
+    key = title.casefold()
+    for entry in entries:
+        if entry.title.casefold() == key:
+            return entry
+    return None
+
+
+def main():
+    args = parse_args("Titel-Lookup: Index gegen lineare Suche")
+
+    for count in args.entries:
+        pm = build_manager(count)
+        titles = [pm.entries[i * count // LOOKUPS].title for i in range(LOOKUPS)]
+        missing = [f"fehlt {i}" for i in range(LOOKUPS)]
+
+        print_header(f"{count} Einträge, je {LOOKUPS} Lookups")
+        for label, func in (
+            ("Index, Treffer", lambda: [pm.get_entry(title) for title in titles]),
+            ("Index, kein Treffer", lambda: [pm.get_entry(title) for title in missing]),
+            ("Linear, Treffer", lambda: [linear_lookup(pm.entries, title) for title in titles]),
+            ("Linear, kein Treffer", lambda: [linear_lookup(pm.entries, title) for title in missing]),
+        ):
+            # Lineare Suche bei großen Tresoren nur einmal messen
+            rounds = args.rounds if label.startswith("Index") or count <= 10000 else 1
+            print(f"{label:22} {format_seconds(measure(func, rounds) / LOOKUPS)} pro Aufruf")
+
+        print(f"{'add_entry (Duplikat)':22} "
+              f"{format_seconds(measure(lambda: pm.add_entry(titles[0], 'x', 'y'), args.rounds))} pro Aufruf")
+
+
+if __name__ == '__main__':
+    main()
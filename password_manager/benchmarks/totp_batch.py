@@ -0,0 +1,46 @@
+"""OTP-Codes für viele Einträge: pyotp je Eintrag gegen compute_batch und die Codetabelle je Zeitschritt.
+
+    python -m benchmarks.totp_batch --entries 1000 10000
+"""
+import time
+
+import pyotp
+
+from benchmarks.common import format_seconds, measure, parse_args, print_header
+from core.totp_manager import TOTPManager
+
+VISIBLE_ROWS = 40
+
+
+def main():
+    args = parse_args("OTP-Codes: Einzelberechnung gegen Batch und Codetabelle")
+
+    for count in args.entries:
+        secrets = [pyotp.random_base32() for _ in range(count)]
+        visible = secrets[:VISIBLE_ROWS]
+        now = time.time()
+
+        def cold_batch():
+            # Neuer Manager: Secrets werden erst dekodiert
+            TOTPManager().compute_batch(secrets, now)
+
+        warm = TOTPManager()
+        warm.compute_batch(secrets, now)
+        table = TOTPManager()
+        for secret in secrets:
+            table.get_current_totp(secret)
+
+        print_header(f"{count} Einträge mit TOTP")
+        for label, func in (
+            ("pyotp je Eintrag", lambda: [pyotp.TOTP(secret).at(now) for secret in secrets]),
+            ("compute_batch, kalt", cold_batch),
+            ("compute_batch, warm", lambda: warm.compute_batch(secrets, now)),
+            # Innerhalb eines Zeitschritts kommt jeder Code aus der Tabelle
+            ("Tabelle, alle Zeilen", lambda: [table.get_current_totp(secret) for secret in secrets]),
+            (f"Tabelle, {VISIBLE_ROWS} sichtbare", lambda: [table.get_current_totp(secret) for secret in visible]),
+        ):
+            print(f"{label:24} {format_seconds(measure(func, args.rounds))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""Binäres Tresorformat im Vergleich zum früheren JSON (json.dumps mit indent=2): Größe, Kodieren, Dekodieren.
+
+    python -m benchmarks.vault_format --entries 1000 10000 100000
+"""
+import json
+
+from benchmarks.common import format_bytes, format_seconds, measure, parse_args, print_header, synthetic_entries
+from core.password_storage import PasswordEntry
+from core.vault_format import decode_vault, encode_vault
+
+
+def main():
+    args = parse_args("Tresor-Inhalt: Binärformat gegen JSON")
+
+    for count in args.entries:
+        # Gleiche Felder wie beim Speichern (to_dict), inkl. ID und ISO-Zeitstempeln
+        data = {'version': '1.0', 'created': "2024-01-01T00:00:00",
+                'entries': [PasswordEntry(**fields).to_dict() for fields in synthetic_entries(count)]}
+        binary = encode_vault(data)
+        text = json.dumps(data, indent=2).encode('utf-8')
+
+        print_header(f"{count} Einträge")
+        print(f"{'':8} {'Größe':>12} {'Kodieren':>11} {'Dekodieren':>11}")
+        for label, payload, encode, decode in (
+            ("JSON", text, lambda: json.dumps(data, indent=2).encode('utf-8'), lambda: json.loads(text)),
+            ("Binär", binary, lambda: encode_vault(data), lambda: decode_vault(binary)),
+        ):
+            print(f"{label:8} {format_bytes(len(payload))} {format_seconds(measure(encode, args.rounds))} "
+                  f"{format_seconds(measure(decode, args.rounds))}")
+
+
+if __name__ == '__main__':
+    main()
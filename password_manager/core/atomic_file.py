@@ -0,0 +1,80 @@
+import glob
+import os
+import tempfile
+from typing import Callable, List, Optional
+
+TEMP_SUFFIX = ".tmp"
+
+
+def atomic_write(path: str, data: bytes):
+    """Schreibt data absturzsicher: Temp-Datei im selben Verzeichnis, fsync, os.replace, fsync des Verzeichnisses"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=TEMP_SUFFIX, dir=directory)
+    
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    
+    fsync_directory(directory)
+
+
+def fsync_directory(directory: str):
+    # Unter Windows lassen sich Verzeichnisse nicht öffnen; os.replace ist dort bereits atomar genug
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def find_temp_files(path: str) -> List[str]:
+    pattern = glob.escape(os.path.abspath(path)) + ".*" + TEMP_SUFFIX
+    return sorted(glob.glob(pattern), key=os.path.getmtime)
+
+
+def recover_interrupted_write(path: str, is_complete: Optional[Callable[[str], bool]] = None) -> List[str]:
+    """Räumt Temp-Dateien eines abgebrochenen Schreibvorgangs auf und gibt die durchgeführten Aktionen zurück.
+    
+    Fehlt das Ziel, wird die neueste Temp-Datei übernommen, die is_complete besteht; unvollständige
+    Temp-Dateien bleiben dann für eine manuelle Prüfung liegen.
+    """
+    actions = []
+    temp_files = find_temp_files(path)
+    
+    if temp_files and not os.path.exists(path):
+        # Ziel fehlt: der Absturz geschah beim allerersten Speichern, neueste vollständige Temp-Datei übernehmen
+        while temp_files:
+            newest = temp_files.pop()
+            if is_complete is not None and not is_complete(newest):
+                actions.append(f"Unvollständig, nicht übernommen: {newest}")
+                continue
+            
+            os.replace(newest, path)
+            fsync_directory(os.path.dirname(os.path.abspath(path)))
+            actions.append(f"Wiederhergestellt: {newest} -> {path}")
+            break
+    
+    for temp_file in temp_files:
+        try:
+            os.remove(temp_file)
+            actions.append(f"Entfernt: {temp_file}")
+        except OSError:
+            pass
+    
+    return actions
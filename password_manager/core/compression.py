@@ -0,0 +1,24 @@
+import lzma
+import zlib
+
+COMPRESSION_METHODS = ('none', 'zlib', 'lzma')
+
+
+def compress_payload(data: bytes, method: str = 'none', level: int = 6) -> bytes:
+    if method == 'none':
+        return data
+    if method == 'zlib':
+        return zlib.compress(data, level)
+    if method == 'lzma':
+        return lzma.compress(data, preset=level)
+    raise ValueError(f"Unbekanntes Kompressionsverfahren: {method}")
+
+
+def decompress_payload(data: bytes, method: str = 'none') -> bytes:
+    if method == 'none':
+        return data
+    if method == 'zlib':
+        return zlib.decompress(data)
+    if method == 'lzma':
+        return lzma.decompress(data)
+    raise ValueError(f"Unbekanntes Kompressionsverfahren: {method}")
@@ -1,50 +1,366 @@
 import os
 import base64
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
+
+# Parameter aller Tresore ohne KDF-Angabe im Header
+LEGACY_KDF_PARAMS = {'algorithm': 'pbkdf2-sha256', 'iterations': 100000}
+MIN_PBKDF2_ITERATIONS = 100000
+# Obergrenze gegen grobe Timer, bei denen die Probe scheinbar keine Zeit braucht
+MAX_PBKDF2_ITERATIONS = 10000000
+MIN_SCRYPT_N = 2 ** 14
+MAX_SCRYPT_MEMORY = 1024 * 1024 * 1024
+DEFAULT_KDF_TARGET_SECONDS = 0.5
+KDF_ALGORITHMS = ('pbkdf2-sha256', 'scrypt')
+# Verschlüsselung des Tresor-Inhalts; 'fernet' nur noch für bestehende Dateien
+CIPHERS = ('aes-256-gcm', 'fernet')
+GCM_NONCE_SIZE = 12
+GCM_ASSOCIATED_DATA = b"PMGR payload"
+GCM_TAG_SIZE = 16
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def derive_key(master_password: str, salt: bytes, kdf_params: dict) -> bytes:
+    algorithm = kdf_params.get('algorithm')
+    
+    if algorithm == 'pbkdf2-sha256':
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=salt,
+            iterations=int(kdf_params['iterations']),
+        )
+        return kdf.derive(master_password.encode())
+    
+    if algorithm == 'scrypt':
+        kdf = Scrypt(
+            salt=salt,
+            length=32,
+            n=int(kdf_params['n']),
+            r=int(kdf_params['r']),
+            p=int(kdf_params['p']),
+        )
+        return kdf.derive(master_password.encode())
+    
+    raise ValueError(f"Unbekannter KDF-Algorithmus: {algorithm}")
+
+
+def scrypt_memory_bytes(kdf_params: dict) -> int:
+    return 128 * int(kdf_params['r']) * (int(kdf_params['n']) + int(kdf_params['p']))
+
+
+def benchmark_kdf(kdf_params: dict, rounds: int = 1) -> dict:
+    """Misst die Ableitungszeit eines Parametersatzes; Speicherbedarf bei scrypt nach 128·r·(N+p)"""
+    salt = os.urandom(16)
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        derive_key("benchmark", salt, kdf_params)
+        timings.append(time.perf_counter() - start)
+    
+    memory = scrypt_memory_bytes(kdf_params) if kdf_params.get('algorithm') == 'scrypt' else 0
+    return {'params': dict(kdf_params), 'seconds': min(timings), 'memory_bytes': memory}
+
+
+def calibrate_kdf(target_seconds: float = DEFAULT_KDF_TARGET_SECONDS, algorithm: str = 'pbkdf2-sha256') -> dict:
+    """Misst die KDF auf diesem Rechner und wählt die Parameter für die gewünschte Entsperrzeit"""
+    if algorithm == 'scrypt':
+        return _calibrate_scrypt(target_seconds)
+    
+    probe_iterations = 20000
+    salt = os.urandom(16)
+    
+    start = time.perf_counter()
+    derive_key("calibration", salt, {'algorithm': 'pbkdf2-sha256', 'iterations': probe_iterations})
+    elapsed = max(time.perf_counter() - start, 1e-6)
+    
+    iterations = int(probe_iterations * target_seconds / elapsed)
+    iterations = min(MAX_PBKDF2_ITERATIONS, max(MIN_PBKDF2_ITERATIONS, iterations // 1000 * 1000))
+    return {'algorithm': 'pbkdf2-sha256', 'iterations': iterations}
+
+
+def _calibrate_scrypt(target_seconds: float) -> dict:
+    # r=8/p=1 wie empfohlen; N verdoppeln, solange Zeit und Speicherlimit es erlauben
+    params = {'algorithm': 'scrypt', 'n': MIN_SCRYPT_N, 'r': 8, 'p': 1}
+    elapsed = benchmark_kdf(params)['seconds']
+    
+    while True:
+        candidate = dict(params, n=params['n'] * 2)
+        if elapsed * 2 > target_seconds or scrypt_memory_bytes(candidate) > MAX_SCRYPT_MEMORY:
+            return params
+        params = candidate
+        elapsed = benchmark_kdf(params)['seconds']
+
+
+def wrap_key(data_key: bytes, master_password: str, kdf_params: dict, salt: bytes = None) -> dict:
+    """Verschlüsselt den Datenschlüssel mit dem aus dem Master-Passwort abgeleiteten Schlüssel (ein Key-Slot)"""
+    if salt is None:
+        salt = os.urandom(16)
+    
+    key_encryption_key = base64.urlsafe_b64encode(derive_key(master_password, salt, kdf_params))
+    return {
+        'salt': base64.b64encode(salt).decode('ascii'),
+        'kdf': dict(kdf_params),
+        'key': Fernet(key_encryption_key).encrypt(data_key).decode('ascii')
+    }
+
+
+def unwrap_key(key_slot: dict, master_password: str) -> bytes:
+    salt = base64.b64decode(key_slot['salt'])
+    key_encryption_key = base64.urlsafe_b64encode(derive_key(master_password, salt, key_slot['kdf']))
+    return Fernet(key_encryption_key).decrypt(key_slot['key'].encode('ascii'))
+
+
+def chunk_count(length: int, chunk_size: int) -> int:
+    # Auch ein leerer Inhalt ergibt einen (authentifizierten) Block
+    return max(1, -(-length // chunk_size))
+
+
+def _chunk_associated_data(index: int, count: int) -> bytes:
+    # Index und Anzahl authentifizieren: vertauschte, doppelte oder abgeschnittene Blöcke schlagen fehl
+    return GCM_ASSOCIATED_DATA + struct.pack('<II', index, count)
+
+
+_executor = None
+_executor_size = 0
+_executor_lock = threading.Lock()
+
+
+def _shared_executor(workers: int) -> ThreadPoolExecutor:
+    # Von allen Aufrufen geteilt; mehr Abschnitte als Threads warten in der Queue
+    global _executor, _executor_size
+    with _executor_lock:
+        if workers > _executor_size:
+            # Größerer Pool für mehr Worker. Der alte wird nicht heruntergefahren, laufende Aufrufe
+            # halten ihn noch und reichen weiter ein; seine Threads enden, sobald er nicht mehr referenziert wird
+            _executor_size = max(workers, os.cpu_count() or 1)
+            _executor = ThreadPoolExecutor(max_workers=_executor_size, thread_name_prefix="crypto")
+        return _executor
+
+
+def run_parallel(func, items, workers: int) -> list:
+    # Skaliert nur, soweit das cryptography-Backend den GIL während der AES-Operation freigibt
+    items = list(items)
+    workers = min(workers, len(items))
+    if workers <= 1:
+        return [func(item) for item in items]
+    
+    # Je Worker ein zusammenhängender Abschnitt: höchstens workers Threads pro Aufruf, auch wenn
+    # der gemeinsame Pool größer ist, und die Reihenfolge bleibt erhalten
+    size = -(-len(items) // workers)
+    batches = [items[start:start + size] for start in range(0, len(items), size)]
+    executor = _shared_executor(workers)
+    futures = [executor.submit(lambda batch: [func(item) for item in batch], batch) for batch in batches]
+    return [result for future in futures for result in future.result()]
+
 
 class PasswordEncryption:
+    """Envelope-Verschlüsselung: ein zufälliger Datenschlüssel verschlüsselt den Inhalt,
+    jeder Key-Slot enthält ihn verschlüsselt mit einem Master-Passwort"""
+    
     def __init__(self):
         self.fernet = None
         self.salt = None
+        self.kdf_params = dict(LEGACY_KDF_PARAMS)
+        self.data_key = None
+        self.key_slots = []
+        self.active_slot = None
+        self._key_material = None
+        self._gcm = None
     
-    def generate_key_from_password(self, master_password: str, salt: bytes = None) -> bytes:
+    def generate_key_from_password(self, master_password: str, salt: bytes = None, kdf_params: dict = None) -> bytes:
         if salt is None:
             salt = os.urandom(16)
         
         self.salt = salt
+        self.kdf_params = dict(kdf_params or LEGACY_KDF_PARAMS)
         
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        
-        key = base64.urlsafe_b64encode(kdf.derive(master_password.encode()))
+        key = base64.urlsafe_b64encode(derive_key(master_password, salt, self.kdf_params))
         return key
     
-    def setup_encryption(self, master_password: str, salt: bytes = None):
-        key = self.generate_key_from_password(master_password, salt)
+    def setup_encryption(self, master_password: str, salt: bytes = None, kdf_params: dict = None):
+        """Direkter Schlüssel aus dem Passwort (Dateien ohne Key-Slots)"""
+        key = self.generate_key_from_password(master_password, salt, kdf_params)
         self.fernet = Fernet(key)
+        self._gcm = None
+        self._key_material = key
+        self.data_key = None
+        self.key_slots = []
+        self.active_slot = None
+    
+    def create_envelope(self, master_password: str, kdf_params: dict = None):
+        """Erzeugt einen neuen Datenschlüssel mit einem Key-Slot für master_password"""
+        self._set_data_key(Fernet.generate_key())
+        self.key_slots = [wrap_key(self.data_key, master_password, kdf_params or LEGACY_KDF_PARAMS)]
+        self._activate_slot(0)
+    
+    def open_envelope(self, master_password: str, key_slots: list):
+        """Entschlüsselt den Datenschlüssel aus dem ersten passenden Key-Slot"""
+        for index, key_slot in enumerate(key_slots):
+            try:
+                data_key = unwrap_key(key_slot, master_password)
+            except InvalidToken:
+                continue
+            
+            self._set_data_key(data_key)
+            self.key_slots = [dict(slot) for slot in key_slots]
+            self._activate_slot(index)
+            return
+        
+        raise ValueError("Entschlüsselung fehlgeschlagen. Falsches Passwort?")
+    
+    def convert_to_envelope(self):
+        """Stellt einen direkt abgeleiteten Schlüssel auf Envelope um, ohne die KDF erneut zu berechnen"""
+        if not self.fernet or self.key_slots:
+            return
+        
+        key_encryption_key = self.fernet
+        self._set_data_key(Fernet.generate_key())
+        self.key_slots = [{
+            'salt': base64.b64encode(self.salt).decode('ascii'),
+            'kdf': dict(self.kdf_params),
+            'key': key_encryption_key.encrypt(self.data_key).decode('ascii')
+        }]
+        self._activate_slot(0)
+    
+    def rewrap_key(self, master_password: str, kdf_params: dict = None, slot_index: int = None) -> list:
+        """Ersetzt einen Key-Slot (Standard: den zum Entsperren benutzten) durch einen für master_password"""
+        if self.data_key is None:
+            raise ValueError("Verschlüsselung nicht initialisiert!")
+        
+        if slot_index is None:
+            slot_index = self.active_slot
+        
+        key_slots = [dict(slot) for slot in self.key_slots]
+        key_slots[slot_index] = wrap_key(self.data_key, master_password, kdf_params or LEGACY_KDF_PARAMS)
+        return key_slots
+    
+    def set_key_slots(self, key_slots: list, active_slot: int = None):
+        self.key_slots = [dict(slot) for slot in key_slots]
+        self._activate_slot(self.active_slot if active_slot is None else active_slot)
+    
+    def encrypt_payload(self, data: bytes, cipher: str = 'aes-256-gcm', chunk_size: int = 0, workers: int = 1) -> bytes:
+        """Verschlüsselt den Tresor-Inhalt; AES-GCM liefert rohe Bytes (Nonce + Chiffretext + Tag) ohne Base64.
+        
+        Mit chunk_size > 0 wird der Inhalt in einzeln authentifizierte Blöcke geteilt, die auf
+        bis zu workers Threads verschlüsselt werden.
+        """
+        if cipher == 'fernet':
+            return self.encrypt_bytes(data)
+        if cipher != 'aes-256-gcm':
+            raise ValueError(f"Unbekanntes Verschlüsselungsverfahren: {cipher}")
+        
+        gcm = self._get_gcm()
+        if not chunk_size:
+            nonce = os.urandom(GCM_NONCE_SIZE)
+            return nonce + gcm.encrypt(nonce, data, GCM_ASSOCIATED_DATA)
+        
+        view = memoryview(data)
+        count = chunk_count(len(data), chunk_size)
+        
+        def encrypt_chunk(index):
+            nonce = os.urandom(GCM_NONCE_SIZE)
+            start = index * chunk_size
+            return nonce + gcm.encrypt(nonce, view[start:start + chunk_size], _chunk_associated_data(index, count))
+        
+        return b''.join(run_parallel(encrypt_chunk, range(count), workers))
+    
+    def decrypt_payload(self, encrypted_data: bytes, cipher: str = 'aes-256-gcm', chunks: dict = None,
+                        workers: int = 1) -> bytes:
+        """Gegenstück zu encrypt_payload; chunks ist das Manifest aus dem Header ({'size', 'count'})"""
+        if cipher == 'fernet':
+            return self.decrypt_bytes(encrypted_data)
+        if cipher != 'aes-256-gcm':
+            raise ValueError(f"Unbekanntes Verschlüsselungsverfahren: {cipher}")
+        
+        gcm = self._get_gcm()
+        view = memoryview(encrypted_data)
+        try:
+            if not chunks:
+                return gcm.decrypt(view[:GCM_NONCE_SIZE], view[GCM_NONCE_SIZE:], GCM_ASSOCIATED_DATA)
+            
+            count = int(chunks['count'])
+            stride = int(chunks['size']) + GCM_NONCE_SIZE + GCM_TAG_SIZE
+            
+            def decrypt_chunk(index):
+                start = index * stride
+                end = start + stride if index < count - 1 else len(view)
+                return gcm.decrypt(view[start:start + GCM_NONCE_SIZE], view[start + GCM_NONCE_SIZE:end],
+                                   _chunk_associated_data(index, count))
+            
+            return b''.join(run_parallel(decrypt_chunk, range(count), workers))
+        except InvalidTag as e:
+            raise ValueError("Entschlüsselung fehlgeschlagen. Falsches Passwort?") from e
+    
+    def seal_record(self, data: bytes, associated_data: bytes) -> bytes:
+        """Einzelner AES-GCM-Record (Nonce + Chiffretext + Tag) für das Record-Format"""
+        nonce = os.urandom(GCM_NONCE_SIZE)
+        return nonce + self._get_gcm().encrypt(nonce, data, associated_data)
+    
+    def open_record(self, record: bytes, associated_data: bytes) -> bytes:
+        try:
+            return self._get_gcm().decrypt(record[:GCM_NONCE_SIZE], record[GCM_NONCE_SIZE:], associated_data)
+        except InvalidTag as e:
+            raise ValueError("Record beschädigt oder falscher Schlüssel") from e
     
     def encrypt_data(self, data: str) -> bytes:
+        return self.encrypt_bytes(data.encode())
+    
+    def decrypt_data(self, encrypted_data: bytes) -> str:
+        return self.decrypt_bytes(encrypted_data).decode()
+    
+    def encrypt_bytes(self, data: bytes) -> bytes:
         if not self.fernet:
             raise ValueError("Verschlüsselung nicht initialisiert!")
         
-        encrypted_data = self.fernet.encrypt(data.encode())
-        return encrypted_data
+        return self.fernet.encrypt(data)
     
-    def decrypt_data(self, encrypted_data: bytes) -> str:
+    def decrypt_bytes(self, encrypted_data: bytes) -> bytes:
         if not self.fernet:
             raise ValueError("Verschlüsselung nicht initialisiert!")
         
         try:
-            decrypted_data = self.fernet.decrypt(encrypted_data)
-            return decrypted_data.decode()
+            return self.fernet.decrypt(encrypted_data)
         except Exception as e:
             raise ValueError("Entschlüsselung fehlgeschlagen. Falsches Passwort?") from e
     
     def get_salt(self) -> bytes:
-        return self.salt
\ No newline at end of file
+        return self.salt
+    
+    def get_kdf_params(self) -> dict:
+        return dict(self.kdf_params)
+    
+    def get_key_slots(self) -> list:
+        return [dict(slot) for slot in self.key_slots]
+    
+    def _set_data_key(self, data_key: bytes):
+        self.data_key = data_key
+        self.fernet = Fernet(data_key)
+        self._gcm = None
+        self._key_material = data_key
+    
+    def _get_gcm(self) -> AESGCM:
+        if self._key_material is None:
+            raise ValueError("Verschlüsselung nicht initialisiert!")
+        
+        if self._gcm is None:
+            # Eigener Schlüssel per HKDF, damit Fernet (Journal) und GCM nie dasselbe Schlüsselmaterial nutzen
+            gcm_key = HKDF(algorithm=hashes.SHA256(), length=32, salt=None,
+                           info=b"password-manager aes-256-gcm payload").derive(self._key_material)
+            self._gcm = AESGCM(gcm_key)
+        return self._gcm
+    
+    def _activate_slot(self, index: int):
+        # salt/kdf_params spiegeln den aktiven Slot, damit Header und Anzeige stimmen
+        self.active_slot = index
+        self.salt = base64.b64decode(self.key_slots[index]['salt'])
+        self.kdf_params = dict(self.key_slots[index]['kdf'])
\ No newline at end of file
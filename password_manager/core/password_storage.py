@@ -1,51 +1,342 @@
+import hashlib
+import io
 import json
+import marshal
 import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Optional
-from core.encryption import PasswordEncryption
+from typing import Callable, Dict, List, Optional
+from core.atomic_file import atomic_write, recover_interrupted_write
+from core.compression import compress_payload, decompress_payload
+from core.encryption import (
+    DEFAULT_CHUNK_SIZE, DEFAULT_KDF_TARGET_SECONDS, PasswordEncryption, calibrate_kdf, chunk_count
+)
+from core.vault_file import build_vault_file, is_complete_vault_file, parse_vault_file, read_vault_header
+from core.vault_format import decode_vault, encode_vault
+from core.record_format import (
+    RECORD_META, RECORD_SECRET, encode_records, read_index, read_records, read_secret_group, salvage_records,
+    verify_records
+)
+from core.save_worker import BackgroundSaveWorker
+from core.secret_store import SecretStore
+
+
+class _UnlockCancelled(Exception):
+    pass
+
+
+def _timestamp_to_iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+def _iso_to_timestamp(value) -> Optional[float]:
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def _fold(value: str) -> str:
+    folded = value.casefold()
+    return value if folded == value else folded
+
+
+def _digest_snapshot(file_data: bytes) -> str:
+    # Im Record-Format identifizieren Header und Index-Record (mit zufälliger Nonce) den Snapshot,
+    # so muss beim Entsperren nicht die ganze Datei gelesen werden
+    header, body_offset = read_vault_header(io.BytesIO(file_data))
+    if header.get('layout') == 'records':
+        index_start = body_offset + header['records']['index_offset']
+        return hashlib.sha256(file_data[:body_offset] + file_data[index_start:]).hexdigest()
+    return hashlib.sha256(file_data).hexdigest()
+
+
+def _digest_record_file(f, body_offset: int, index_offset: int) -> str:
+    # Wie _digest_snapshot für das Record-Format, liest aber nur Header und Index aus der Datei
+    f.seek(0)
+    head = f.read(body_offset)
+    f.seek(body_offset + index_offset)
+    return hashlib.sha256(head + f.read()).hexdigest()
+
+
+def _compact_id(entry_id: str):
+    # UUID-Hex als int (44 statt 81 Byte); andere IDs älterer Tresore bleiben Strings
+    if len(entry_id) == 32:
+        try:
+            value = int(entry_id, 16)
+        except ValueError:
+            return entry_id
+        if f"{value:032x}" == entry_id:
+            return value
+    return entry_id
+
+
+def _format_id(key) -> str:
+    return f"{key:032x}" if type(key) is int else key
+
+
+def _seal_totp_secret(store: SecretStore, value: str) -> bytes:
+    # Ein Secret nur aus Leerzeichen zählt wie bisher nicht als 2FA (has_totp)
+    return store.seal(value) if value.strip() else b''
+
+
+_shared_secret_store: Optional[SecretStore] = None
+
+
+def _default_secret_store() -> SecretStore:
+    # Für Einträge, die ohne PasswordManager erzeugt werden
+    global _shared_secret_store
+    if _shared_secret_store is None:
+        _shared_secret_store = SecretStore()
+    return _shared_secret_store
+
 
 class PasswordEntry:
-    def __init__(self, title: str, username: str, password: str, url: str = "", notes: str = "", totp_secret: str = "", category: str = "Other"):
+    # password, notes und totp_secret liegen nur verschlüsselt im Eintrag (siehe SecretStore).
+    # _source ist der SecretStore des Tresors, solange die Geheimnisse noch nicht aus der Datei gelesen
+    # wurden dessen _SecretRecords; bis dahin halten _password, _notes und _totp_secret die Passwortlänge
+    # bzw. die Flags aus den Metadaten. Suchschlüssel und Flags werden nicht mehr je Eintrag gespeichert.
+    __slots__ = ('_id', 'title', 'username', '_password', 'url', '_notes', '_totp_secret', '_otp_params', 'category',
+                 'created_ts', 'modified_ts', '_source')
+    
+    EDITABLE_FIELDS = ('title', 'username', 'password', 'url', 'notes', 'totp_secret', 'otp_params', 'category')
+    STATE_FIELDS = ('id', 'title', 'username', 'password', 'url', 'notes', 'totp_secret', 'otp_params', 'category',
+                    'created_ts', 'modified_ts')
+    
+    def __init__(self, title: str, username: str, password: str, url: str = "", notes: str = "", totp_secret: str = "", category: str = "Other",
+                 otp_params: str = "", created_ts: float = None, modified_ts: float = None, entry_id: str = None,
+                 secret_store: SecretStore = None):
+        store = self._source = secret_store or _default_secret_store()
+        self._id = _compact_id(entry_id) if entry_id else uuid.uuid4().int
         self.title = title
         self.username = username
-        self.password = password
+        self._password = store.seal(password)
         self.url = url
-        self.notes = notes
-        self.totp_secret = totp_secret
-        self.category = category
-        self.created = datetime.now().isoformat()
-        self.modified = datetime.now().isoformat()
+        self._notes = store.seal(notes)
+        self._totp_secret = _seal_totp_secret(store, totp_secret)
+        # Periode, Stellen, Algorithmus, HOTP-Zähler im otpauth-Query-Format; leer heißt TOTP/30 s/6/SHA1
+        self._otp_params = otp_params
+        self.category = sys.intern(category)
+        
+        if created_ts is None or modified_ts is None:
+            now = time.time()
+            created_ts = now if created_ts is None else created_ts
+            modified_ts = now if modified_ts is None else modified_ts
+        self.created_ts = created_ts
+        self.modified_ts = modified_ts
+    
+    # UUIDs liegen als int im Eintrag, als Hex-String nur an den Schnittstellen
+    @property
+    def id(self) -> str:
+        return _format_id(self._id)
+    
+    @id.setter
+    def id(self, value: str):
+        self._id = _compact_id(value)
+    
+    # Zugriff entschlüsselt bei Bedarf; der Klartext liegt danach nur im begrenzten Cache des SecretStore
+    @property
+    def password(self) -> str:
+        self._load_secrets()
+        return self._source.reveal(self._password)
+    
+    @password.setter
+    def password(self, value: str):
+        self._load_secrets()
+        self._password = self._source.seal(value)
+    
+    @property
+    def password_length(self) -> int:
+        # Für Tabelle und Sortierung, ohne das Passwort zu entschlüsseln (Länge des UTF-8-Klartexts)
+        if self._is_pending():
+            return self._password
+        return SecretStore.plaintext_size(self._password)
+    
+    @property
+    def notes(self) -> str:
+        self._load_secrets()
+        return self._source.reveal(self._notes)
+    
+    @notes.setter
+    def notes(self, value: str):
+        self._load_secrets()
+        self._notes = self._source.seal(value)
+    
+    @property
+    def notes_token(self) -> bytes:
+        # Wechselt bei jeder Änderung der Notizen, geeignet als Cache-Schlüssel
+        self._load_secrets()
+        return self._notes
+    
+    @property
+    def totp_secret(self) -> str:
+        self._load_secrets()
+        return self._source.reveal(self._totp_secret)
+    
+    @totp_secret.setter
+    def totp_secret(self, value: str):
+        self._load_secrets()
+        self._totp_secret = _seal_totp_secret(self._source, value)
+    
+    @property
+    def otp_params(self) -> str:
+        self._load_secrets()
+        return self._otp_params
+    
+    @otp_params.setter
+    def otp_params(self, value: str):
+        self._load_secrets()
+        self._otp_params = value
+    
+    # Case-gefaltete Felder für Suche, Sortierung und Titel-Index, bei Bedarf berechnet
+    @property
+    def title_folded(self) -> str:
+        return _fold(self.title)
+    
+    @property
+    def username_folded(self) -> str:
+        return _fold(self.username)
+    
+    @property
+    def url_folded(self) -> str:
+        return _fold(self.url)
+    
+    @property
+    def notes_folded(self) -> str:
+        # Notizen werden für die Suche nicht gecacht, sonst verdrängt jede Suche den Cache
+        self._load_secrets()
+        return _fold(self._source.reveal(self._notes, cache=False))
+    
+    # Zeitstempel werden als Epoch-Sekunden gehalten; ISO-Strings nur an den Schnittstellen
+    @property
+    def created(self) -> str:
+        return _timestamp_to_iso(self.created_ts)
+    
+    @created.setter
+    def created(self, value):
+        timestamp = _iso_to_timestamp(value)
+        self.created_ts = time.time() if timestamp is None else timestamp
+    
+    @property
+    def modified(self) -> str:
+        return _timestamp_to_iso(self.modified_ts)
+    
+    @modified.setter
+    def modified(self, value):
+        timestamp = _iso_to_timestamp(value)
+        self.modified_ts = time.time() if timestamp is None else timestamp
     
     def to_dict(self) -> dict:
+        self._load_secrets()
+        reveal = self._source.reveal
         return {
+            'id': self.id,
             'title': self.title,
             'username': self.username,
-            'password': self.password,
+            'password': reveal(self._password, cache=False),
             'url': self.url,
-            'notes': self.notes,
-            'totp_secret': self.totp_secret,
+            'notes': reveal(self._notes, cache=False),
+            'totp_secret': reveal(self._totp_secret, cache=False),
+            'otp_params': self.otp_params,
             'category': self.category,
             'created': self.created,
             'modified': self.modified
         }
     
     @classmethod
-    def from_dict(cls, data: dict):
-        entry = cls(
+    def from_dict(cls, data: dict, secret_store: SecretStore = None):
+        return cls(
             title=data['title'],
             username=data['username'],
-            password=data['password'],
+            password=data.get('password', ''),
             url=data.get('url', ''),
             notes=data.get('notes', ''),
             totp_secret=data.get('totp_secret', ''),
-            category=data.get('category', 'Other')
+            category=data.get('category', 'Other'),
+            otp_params=data.get('otp_params', ''),
+            created_ts=_iso_to_timestamp(data.get('created')),
+            modified_ts=_iso_to_timestamp(data.get('modified')),
+            entry_id=data.get('id'),
+            secret_store=secret_store
         )
-        entry.created = data.get('created', datetime.now().isoformat())
-        entry.modified = data.get('modified', datetime.now().isoformat())
+    
+    @classmethod
+    def from_meta(cls, data: dict, records: '_SecretRecords'):
+        """Eintrag nur aus den Metadaten eines Record-Tresors; die Geheimnisse lädt records beim ersten Zugriff"""
+        # Umgeht __init__ wie from_state: beim Entsperren großer Tresore zählt jeder Aufruf
+        entry = cls.__new__(cls)
+        entry._source = records
+        entry._id = _compact_id(data['id']) if data.get('id') else uuid.uuid4().int
+        entry.title = data['title']
+        entry.username = data['username']
+        entry.url = data.get('url', '')
+        entry.category = sys.intern(data.get('category', 'Other'))
+        entry._password = int(data.get('password_length') or 0)
+        entry._notes = bool(data.get('has_notes'))
+        entry._totp_secret = bool(data.get('has_totp'))
+        entry._otp_params = ''
+        
+        now = None
+        created_ts = _iso_to_timestamp(data.get('created'))
+        modified_ts = _iso_to_timestamp(data.get('modified'))
+        if created_ts is None or modified_ts is None:
+            now = time.time()
+        entry.created_ts = now if created_ts is None else created_ts
+        entry.modified_ts = now if modified_ts is None else modified_ts
+        return entry
+    
+    def _is_pending(self) -> bool:
+        return type(self._source) is _SecretRecords
+    
+    def _load_secrets(self):
+        if self._is_pending():
+            self._source.load_entry(self)
+    
+    def _fill_secrets(self, secrets: dict, store: SecretStore):
+        # Vom Loader aufgerufen; danach verhält sich der Eintrag wie ein vollständig geladener
+        self._source = store
+        self._password = store.seal(secrets.get('password', ''))
+        self._notes = store.seal(secrets.get('notes', ''))
+        self._totp_secret = _seal_totp_secret(store, secrets.get('totp_secret', ''))
+        self._otp_params = secrets.get('otp_params', '')
+    
+    def capture(self) -> tuple:
+        """Alle Felder mit den versiegelten Geheimnissen, ohne zu entschlüsseln (für den Transaktions-Rollback)"""
+        return tuple(getattr(self, name) for name in self.__slots__)
+    
+    def restore(self, captured: tuple):
+        for name, value in zip(self.__slots__, captured):
+            setattr(self, name, value)
+    
+    def to_state(self) -> tuple:
+        """Felder mit den Geheimnissen im Klartext als Tupel, für das Soft-Sperre-Abbild"""
+        data = self.to_dict()
+        return tuple(data[name] if name in data else getattr(self, name) for name in self.STATE_FIELDS)
+    
+    @classmethod
+    def from_state(cls, state: tuple, secret_store: SecretStore = None):
+        # Umgeht __init__: keine erneute Zeitstempel-Umwandlung
+        entry = cls.__new__(cls)
+        entry._source = secret_store or _default_secret_store()
+        entry._password = entry._notes = entry._totp_secret = b''
+        for name, value in zip(cls.STATE_FIELDS, state):
+            setattr(entry, name, value)
+        entry.category = sys.intern(entry.category)
         return entry
     
     def update(self, title: str = None, username: str = None, password: str = None, 
-               url: str = None, notes: str = None, totp_secret: str = None, category: str = None):
+               url: str = None, notes: str = None, totp_secret: str = None, category: str = None,
+               otp_params: str = None):
         if title is not None:
             self.title = title
         if username is not None:
@@ -58,95 +349,640 @@ class PasswordEntry:
             self.notes = notes
         if totp_secret is not None:
             self.totp_secret = totp_secret
+        if otp_params is not None:
+            self.otp_params = otp_params
         if category is not None:
-            self.category = category
-        self.modified = datetime.now().isoformat()
+            self.category = sys.intern(category)
+        self.modified_ts = time.time()
     
     def has_totp(self):
-        return bool(self.totp_secret.strip())
+        return bool(self._totp_secret)
+    
+    def has_notes(self):
+        return bool(self._notes)
     
     def __str__(self):
         return f"🔒 {self.title} ({self.username})"
 
 
+class _SecretRecords:
+    """Geheimnis-Records eines Tresors im Record-Format, gelesen erst beim ersten Zugriff je Gruppe.
+    
+    Vor jedem Lesen wird der Snapshot-Digest (Header und Index) der Datei geprüft: Umbenennen oder
+    ein neuer Zeitstempel stören nicht, ein anderer Inhalt schon.
+    """
+    
+    def __init__(self, database_file: str, body_offset: int, index: dict, encryptor: PasswordEncryption,
+                 compression: str, workers: int, snapshot_digest: str):
+        self.database_file = database_file
+        self.body_offset = body_offset
+        self.index = index
+        self.open_record = encryptor.open_record
+        self.compression = compression
+        self.workers = workers
+        self.snapshot_digest = snapshot_digest
+        # Nimmt die Geheimnisse der geladenen Einträge auf (siehe create_entries)
+        self.secret_store: Optional[SecretStore] = None
+        # Gruppe -> Einträge und Eintrag -> Gruppe; bleiben bestehen, damit zurückgerollte Einträge erneut laden können
+        self.groups: Dict[int, list] = {}
+        self.seqs: Dict['PasswordEntry', int] = {}
+        self.lock = threading.Lock()
+    
+    def create_entries(self, data: dict, secret_store: SecretStore) -> List['PasswordEntry']:
+        self.secret_store = secret_store
+        entries = []
+        position = 0
+        for seq, size in enumerate(data['group_sizes']):
+            group = [PasswordEntry.from_meta(meta, self) for meta in data['entries'][position:position + size]]
+            self.groups[seq] = group
+            self.seqs.update(dict.fromkeys(group, seq))
+            entries.extend(group)
+            position += size
+        return entries
+    
+    def load_entry(self, entry: 'PasswordEntry'):
+        self.load(self.seqs[entry])
+    
+    def load(self, seq: int):
+        with self.lock:
+            group = self.groups.get(seq, ())
+            if not any(entry._is_pending() for entry in group):
+                return
+            
+            with self._open() as f:
+                secrets = read_secret_group(f, self.body_offset, self.index, seq, self.open_record, self.compression)
+            self._fill(group, secrets)
+    
+    def load_all(self):
+        with self.lock:
+            if not any(entry._is_pending() for group in self.groups.values() for entry in group):
+                return
+            
+            # Ein Lesevorgang für alle Geheimnis-Records, entschlüsselt im Thread-Pool
+            with self._open() as f:
+                data = read_records(f, self.body_offset, self.index, self.open_record, (RECORD_SECRET,),
+                                    self.compression, self.workers)
+            position = 0
+            for seq, size in enumerate(data['group_sizes']):
+                self._fill(self.groups.get(seq, ()), data['entries'][position:position + size])
+                position += size
+    
+    def rebase(self, body_offset: int, snapshot_digest: str):
+        # Nach einem Passwortwechsel steht derselbe Inhalt hinter einem neuen Header
+        with self.lock:
+            self.body_offset = body_offset
+            self.snapshot_digest = snapshot_digest
+    
+    def relocate(self, database_file: str):
+        with self.lock:
+            self.database_file = database_file
+    
+    def _open(self):
+        f = open(self.database_file, 'rb')
+        try:
+            header, body_offset = read_vault_header(f)
+            if (body_offset != self.body_offset or header.get('layout') != 'records' or
+                    _digest_record_file(f, body_offset, header['records']['index_offset']) != self.snapshot_digest):
+                raise ValueError("Datenbankdatei wurde seit dem Entsperren verändert")
+        except Exception:
+            f.close()
+            raise
+        return f
+    
+    def _fill(self, group: list, secrets: list):
+        if group and len(group) != len(secrets):
+            raise ValueError("Record-Gruppen passen nicht zusammen")
+        for entry, fields in zip(group, secrets):
+            if entry._is_pending():
+                entry._fill_secrets(fields, self.secret_store)
+
+
 class PasswordManager:
-    def __init__(self, database_file: str = "data/passwords.enc"):
+    JOURNAL_SUFFIX = ".journal"
+    DAMAGED_SUFFIX = ".damaged"
+    
+    def __init__(self, database_file: str = "data/passwords.enc", journal_enabled: bool = False,
+                 journal_threshold: int = 100, compression: str = "none", compression_level: int = 6):
         self.database_file = database_file
+        self.journal_enabled = journal_enabled
+        self.journal_threshold = journal_threshold
+        self.compression = compression
+        self.compression_level = compression_level
+        self.kdf_target_seconds = DEFAULT_KDF_TARGET_SECONDS
+        self.kdf_algorithm = 'pbkdf2-sha256'
+        self.cipher = 'aes-256-gcm'
+        self.chunk_size = DEFAULT_CHUNK_SIZE
+        self.crypto_workers = min(4, os.cpu_count() or 1)
+        # 'records': je Eintrag einzeln authentifizierte Records mit Index, 'blob': ein verschlüsselter Block
+        self.vault_layout = 'records'
+        # 'missing', 'password' oder 'corrupt' nach fehlgeschlagenem Entsperren
+        self.last_unlock_error: Optional[str] = None
+        self.salvage_report: Optional[dict] = None
+        # Aufräumarbeiten nach einem abgebrochenen Schreibvorgang (siehe recover_interrupted_write)
+        self.recovery_actions: List[str] = []
+        # Nicht fatale Speicherprobleme für die GUI (siehe take_storage_warnings)
+        self.storage_warnings: List[str] = []
         self.encryptor = PasswordEncryption()
+        self.secrets = SecretStore()
         self.entries: List[PasswordEntry] = []
+        # Noch nicht gelesene Geheimnis-Records nach einem Entsperren im Record-Format
+        self._secret_records: Optional[_SecretRecords] = None
+        self._title_index: Dict[str, PasswordEntry] = {}
+        # Anzahl der Einträge je Titel-Schlüssel, damit nur bei Duplikaten nachgesucht wird
+        self._title_counts: Dict[str, int] = {}
+        # Schlüssel ist die kompakte ID (siehe _compact_id), dasselbe Objekt wie im Eintrag
+        self._id_index: Dict[object, PasswordEntry] = {}
         self.is_unlocked = False
+        self._transaction_depth = 0
+        self._transaction_dirty = False
+        # Ein Hintergrund-Speichern ist während einer Transaktion aufgelaufen
+        self._save_deferred = False
+        self._pending_records: List[dict] = []
+        self._journal_count = 0
+        # Das letzte Speichern ist fehlgeschlagen, checkpoint versucht es erneut
+        self._save_failed = False
+        self._snapshot_digest = None
+        # Zählt geschriebene Snapshots, damit ein Rollback erkennt, ob zwischendurch gespeichert wurde
+        self._snapshot_generation = 0
+        self._lock = threading.RLock()
+        # Serialisiert alle Schreibvorgänge der Tresordatei (Snapshots und Passwortwechsel);
+        # wer beide Locks braucht, nimmt immer zuerst _file_lock
+        self._file_lock = threading.RLock()
+        self.save_worker: Optional[BackgroundSaveWorker] = None
+        # Verschlüsseltes Abbild des Tresors während einer Soft-Sperre
+        self._soft_lock_image: Optional[dict] = None
         
         os.makedirs(os.path.dirname(database_file), exist_ok=True)
     
-    def create_new_database(self, master_password: str):
-        self.encryptor.setup_encryption(master_password)
+    def create_new_database(self, master_password: str, kdf_params: dict = None, progress: Callable[[str], None] = None):
+        if kdf_params is None:
+            if progress:
+                progress('calibrate')
+            kdf_params = calibrate_kdf(self.kdf_target_seconds, self.kdf_algorithm)
+        
+        if progress:
+            progress('kdf')
+        self.encryptor.create_envelope(master_password, kdf_params)
+        self._soft_lock_image = None
         self.entries = []
+        self._secret_records = None
+        self._rebuild_index()
         self.is_unlocked = True
+        
+        if progress:
+            progress('save')
         self.save_database()
     
-    def unlock_database(self, master_password: str) -> bool:
-        if not os.path.exists(self.database_file):
+    def unlock_database(self, master_password: str, progress: Callable[[str], None] = None,
+                        cancel_event: threading.Event = None, salvage: bool = False) -> bool:
+        """Entsperrt den Tresor; progress(phase) meldet 'read', 'kdf', 'decrypt', 'parse', 'index'.
+        
+        Läuft auch im Worker-Thread: der Zustand wird erst am Ende unter dem Lock übernommen,
+        ein bis dahin gesetztes cancel_event verwirft das Ergebnis. Journal, Umstellungen und
+        Speichern laufen danach im selben Lock zu Ende, ein späterer Abbruch wird ignoriert.
+        salvage=True übernimmt bei einer beschädigten Datei im Record-Format alle intakten
+        Einträge (Bericht in salvage_report).
+        """
+        def report(phase: str):
+            if cancel_event is not None and cancel_event.is_set():
+                raise _UnlockCancelled()
+            if progress:
+                progress(phase)
+        
+        def fail(reason: str) -> bool:
+            # Ein abgebrochener Versuch überschreibt nicht den Zustand eines neueren
+            with self._lock:
+                if cancel_event is None or not cancel_event.is_set():
+                    self._publish_unlock_state(reason, None, recovery_actions)
             return False
         
+        error = 'password'
+        recovery_actions = []
+        database_file = self.database_file
+        
         try:
-            with open(self.database_file, 'rb') as f:
-                salt = f.read(16)
-                encrypted_data = f.read()
+            report('read')
+            soft_unlocked = self._soft_unlock(master_password, report, cancel_event)
+            if soft_unlocked is not None:
+                return soft_unlocked
             
-            self.encryptor.setup_encryption(master_password, salt)
+            with self._file_lock:
+                recovery_actions = recover_interrupted_write(database_file, is_complete_vault_file)
             
-            decrypted_json = self.encryptor.decrypt_data(encrypted_data)
-            data = json.loads(decrypted_json)
+            if not os.path.exists(database_file):
+                return fail('missing')
             
-            self.entries = [PasswordEntry.from_dict(entry_data) for entry_data in data['entries']]
-            self.is_unlocked = True
+            with open(database_file, 'rb') as f:
+                header, body_offset = read_vault_header(f)
+                
+                report('kdf')
+                encryptor = PasswordEncryption()
+                if header.get('key_slots'):
+                    # Der authentifizierte Key-Slot prüft das Passwort: bei Fehleingabe wird der Inhalt gar nicht erst gelesen
+                    encryptor.open_envelope(master_password, header['key_slots'])
+                    error = 'corrupt'
+                else:
+                    encryptor.setup_encryption(master_password, header['salt'], header.get('kdf'))
+                
+                report('decrypt')
+                if header.get('layout') == 'records':
+                    data, secret_records, snapshot_digest, salvage_report = self._read_record_vault(
+                        f, database_file, header, body_offset, encryptor, salvage)
+                else:
+                    f.seek(0)
+                    file_data = f.read()
+                    secret_records = None
+                    salvage_report = None
+                    snapshot_digest = _digest_snapshot(file_data)
+                    decrypted = encryptor.decrypt_payload(file_data[body_offset:], header.get('cipher', 'fernet'),
+                                                          header.get('chunks'), self.crypto_workers)
+                    payload = decompress_payload(decrypted, header.get('compression', 'none'))
+                    data = decode_vault(payload)
             
-            return True
+            report('parse')
+            secrets = SecretStore()
+            if secret_records is not None:
+                entries = secret_records.create_entries(data, secrets)
+            else:
+                entries = [PasswordEntry.from_dict(entry_data, secrets) for entry_data in data['entries']]
             
+            report('index')
+            # Lock-Reihenfolge wie beim Speichern (_write_snapshot): erst _file_lock, dann _lock
+            with self._file_lock, self._lock:
+                if cancel_event is not None and cancel_event.is_set():
+                    return False
+                if self.database_file != database_file:
+                    # Inzwischen wurde eine andere Datenbank gewählt
+                    return False
+                
+                self.encryptor = encryptor
+                self.secrets = secrets
+                self.entries = entries
+                self._secret_records = secret_records
+                self._rebuild_index()
+                self._snapshot_digest = snapshot_digest
+                self._pending_records = []
+                self.is_unlocked = True
+                
+                journal_complete = self._replay_journal()
+                missing_ids = any(not entry_data.get('id') for entry_data in data['entries'])
+                
+                legacy_key = not encryptor.key_slots
+                if legacy_key:
+                    # Erst nach dem Journal umstellen, dessen Einträge noch mit dem alten Schlüssel verschlüsselt sind
+                    encryptor.convert_to_envelope()
+                
+                if salvage_report is not None:
+                    # Beschädigte Datei für eine spätere manuelle Prüfung aufheben
+                    shutil.copy2(database_file, database_file + self.DAMAGED_SUFFIX)
+                
+                if not journal_complete or missing_ids or legacy_key or salvage_report is not None:
+                    # Unvollständiges Journal (z.B. Absturz beim Anhängen), neu vergebene IDs,
+                    # Umstellung auf Key-Slots oder Wiederherstellung: sofort in den Snapshot übernehmen.
+                    # Scheitert das, bleibt der Tresor trotzdem entsperrt und checkpoint versucht es erneut
+                    try:
+                        self.save_database()
+                    except Exception as e:
+                        self.storage_warnings.append(f"Fehler beim Speichern: {str(e)}")
+                
+                self._publish_unlock_state(None, salvage_report, recovery_actions)
+                return True
+        
+        except Exception:
+            return fail(error)
+    
+    def _publish_unlock_state(self, error: Optional[str], salvage_report: Optional[dict], recovery_actions: List[str]):
+        # Nur unter self._lock und nur für einen nicht abgebrochenen Versuch aufrufen
+        self.last_unlock_error = error
+        self.salvage_report = salvage_report
+        self.recovery_actions = recovery_actions
+    
+    def take_storage_warnings(self) -> List[str]:
+        """Gibt die seit dem letzten Aufruf aufgelaufenen Speicherwarnungen zurück und leert die Liste"""
+        with self._lock:
+            warnings, self.storage_warnings = self.storage_warnings, []
+        return warnings
+    
+    def supports_salvage(self) -> bool:
+        """Nur im Record-Format lassen sich intakte Einträge einzeln retten"""
+        try:
+            with open(self.database_file, 'rb') as f:
+                header, _ = read_vault_header(f)
         except Exception:
             return False
+        return header.get('layout') == 'records'
+    
+    def _read_record_vault(self, f, database_file: str, header: dict, body_offset: int,
+                           encryptor: PasswordEncryption, salvage: bool) -> tuple:
+        """Liest Index und Metadaten-Records; die Geheimnis-Records werden nur authentifiziert und erst bei Bedarf gelesen.
+        
+        Gibt (Inhalt, _SecretRecords oder None, Snapshot-Digest, Salvage-Bericht oder None) zurück. Ältere Metadaten ohne
+        abgeleitete Felder (Passwortlänge, Notizen, TOTP) werden sofort vollständig gelesen.
+        """
+        compression = header.get('compression', 'none')
+        index_offset = header['records']['index_offset']
+        try:
+            index = read_index(f, body_offset, index_offset, encryptor.open_record)
+            data = read_records(f, body_offset, index, encryptor.open_record, (RECORD_META,),
+                                compression, self.crypto_workers)
+            lazy = all('password_length' in entry for entry in data['entries'][:1])
+            if lazy:
+                # Geheimnis-Records schon jetzt authentifizieren (Klartext verwerfen): ein beschädigter
+                # Record fällt beim Entsperren auf und führt zur Wiederherstellung, nicht erst beim Zugriff
+                verify_records(f, body_offset, index, encryptor.open_record, RECORD_SECRET, self.crypto_workers)
+            else:
+                data = read_records(f, body_offset, index, encryptor.open_record, (RECORD_META, RECORD_SECRET),
+                                    compression, self.crypto_workers)
+        except Exception:
+            if not salvage:
+                raise
+            
+            f.seek(0)
+            file_data = f.read()
+            data, salvage_report = salvage_records(file_data[body_offset:], encryptor.open_record, compression)
+            if not data['entries']:
+                raise ValueError("Keine intakten Einträge gefunden")
+            return data, None, _digest_snapshot(file_data), salvage_report
+        
+        # Header und Index genügen für den Digest (siehe _digest_snapshot)
+        snapshot_digest = _digest_record_file(f, body_offset, index_offset)
+        
+        secret_records = None
+        if lazy:
+            secret_records = _SecretRecords(database_file, body_offset, index, encryptor, compression,
+                                            self.crypto_workers, snapshot_digest)
+        return data, secret_records, snapshot_digest, None
     
     def save_database(self):
+        """Speichert den Tresor; ein Fehler wird weitergegeben, die Änderungen bleiben im Speicher.
+        
+        Mit Hintergrund-Speichern wird nur angestoßen, Fehler meldet dann flush bzw. get_save_status.
+        """
         if not self.is_unlocked:
             return
         
+        if self._transaction_depth > 0:
+            self._transaction_dirty = True
+            return
+        
+        if self.save_worker is not None:
+            self.save_worker.request_save()
+            return
+        
         try:
-            data = {
-                'version': '1.0',
-                'created': datetime.now().isoformat(),
-                'entries': [entry.to_dict() for entry in self.entries]
-            }
+            self._write_snapshot()
+        except Exception:
+            self._save_failed = True
+            raise
+    
+    def enable_background_save(self, delay: float = 0.5):
+        if self.save_worker is None:
+            self.save_worker = BackgroundSaveWorker(self._write_snapshot, delay)
+        self.save_worker.delay = delay
+    
+    def disable_background_save(self):
+        if self.save_worker is not None:
+            self.save_worker.stop()
+            self.save_worker = None
+    
+    def flush(self):
+        """Wartet auf ausstehende Hintergrund-Speicherungen; ist das letzte fehlgeschlagen, wird es erneut
+        versucht und der Fehler bei erneutem Scheitern ausgelöst"""
+        worker = self.save_worker
+        if worker is None:
+            return
+        
+        if worker.last_error is not None:
+            worker.request_save()
+        if not worker.flush():
+            raise RuntimeError("Hintergrund-Speichern wurde nicht abgeschlossen")
+        if worker.last_error is not None:
+            raise worker.last_error
+    
+    def get_save_status(self) -> dict:
+        worker = self.save_worker
+        return {
+            'pending': worker.has_pending if worker else False,
+            'last_saved': worker.last_saved if worker else None,
+            'error': worker.last_error if worker else None
+        }
+    
+    def build_file_data(self, data: dict, encryptor: PasswordEncryption) -> bytes:
+        # Records sind immer AES-GCM-authentifiziert; mit Fernet bleibt es beim Block-Format
+        if self.vault_layout == 'records' and self.cipher == 'aes-256-gcm':
+            # Jeder Record wird einzeln komprimiert und versiegelt (im Thread-Pool), die Gruppen
+            # ersetzen die Blöcke: chunk_size gilt nur für das Block-Format
+            body, index_offset = encode_records(data, encryptor.seal_record, self.compression,
+                                                self.compression_level, self.crypto_workers)
+            payload_fields = {'compression': self.compression, 'cipher': 'aes-256-gcm', 'layout': 'records',
+                              'records': {'index_offset': index_offset}}
+            return self._build_file(encryptor, body, payload_fields)
+        
+        payload = compress_payload(encode_vault(data), self.compression, self.compression_level)
+        payload_fields = {'compression': self.compression, 'cipher': self.cipher}
+        chunk_size = self.chunk_size if self.cipher == 'aes-256-gcm' else 0
+        if chunk_size:
+            # length macht abgeschnittene Dateien auch ohne Schlüssel erkennbar (is_complete_vault_file)
+            payload_fields['chunks'] = {'size': chunk_size, 'count': chunk_count(len(payload), chunk_size),
+                                        'length': len(payload)}
+        
+        encrypted_data = encryptor.encrypt_payload(payload, self.cipher, chunk_size, self.crypto_workers)
+        return self._build_file(encryptor, encrypted_data, payload_fields)
+    
+    @staticmethod
+    def _build_file(encryptor: PasswordEncryption, body: bytes, payload_fields: dict) -> bytes:
+        # payload_fields beschreiben den Inhalt (compression, cipher, chunks) und bleiben beim Passwortwechsel gleich
+        header_fields = {'kdf': encryptor.get_kdf_params()}
+        header_fields.update(payload_fields)
+        if encryptor.key_slots:
+            header_fields['key_slots'] = encryptor.get_key_slots()
+        return build_vault_file(encryptor.get_salt(), body, **header_fields)
+    
+    def change_master_password(self, current_password: str, new_password: str, kdf_params: dict = None,
+                               progress: Callable[[str], None] = None, cancel_event: threading.Event = None) -> bool:
+        """Wechselt das Master-Passwort, indem nur der Key-Slot im Header neu geschrieben wird.
+        
+        Der verschlüsselte Inhalt wird unverändert übernommen; gibt False bei falschem aktuellen Passwort
+        oder Abbruch über cancel_event zurück.
+        """
+        if not self.is_unlocked:
+            return False
+        
+        self.checkpoint()
+        self.flush()
+        
+        with self._file_lock:
+            if not self.encryptor.key_slots:
+                with self._lock:
+                    self.encryptor.convert_to_envelope()
+                self._write_snapshot()
             
-            json_string = json.dumps(data, indent=2)
-            encrypted_data = self.encryptor.encrypt_data(json_string)
+            with open(self.database_file, 'rb') as f:
+                header, body = parse_vault_file(f.read())
             
-            with open(self.database_file, 'wb') as f:
-                f.write(self.encryptor.get_salt())
-                f.write(encrypted_data)
+            if progress:
+                progress('kdf')
+            checker = PasswordEncryption()
+            try:
+                checker.open_envelope(current_password, header['key_slots'])
+            except ValueError:
+                return False
+            if checker.data_key != self.encryptor.data_key:
+                return False
             
-        except Exception as e:
-            print(f"Fehler beim Speichern: {str(e)}")
+            if kdf_params is None:
+                if progress:
+                    progress('calibrate')
+                kdf_params = calibrate_kdf(self.kdf_target_seconds, self.kdf_algorithm)
+            
+            if progress:
+                progress('kdf')
+            checker.set_key_slots(checker.rewrap_key(new_password, kdf_params))
+            
+            if cancel_event is not None and cancel_event.is_set():
+                return False
+            
+            if progress:
+                progress('save')
+            payload_fields = {'compression': header.get('compression', 'none'), 'cipher': header.get('cipher', 'fernet')}
+            for field in ('chunks', 'layout', 'records'):
+                if field in header:
+                    payload_fields[field] = header[field]
+            file_data = self._build_file(checker, body, payload_fields)
+            atomic_write(self.database_file, file_data)
+            
+            with self._lock:
+                self.encryptor.set_key_slots(checker.get_key_slots(), checker.active_slot)
+                self._snapshot_digest = _digest_snapshot(file_data)
+                if self._secret_records is not None:
+                    self._secret_records.rebase(len(file_data) - len(body), self._snapshot_digest)
+            self._discard_journal()
+        
+        return True
+    
+    def _write_snapshot(self):
+        with self._file_lock:
+            with self._lock:
+                if not self.is_unlocked:
+                    return
+                
+                if self._transaction_depth > 0:
+                    # Während einer Transaktion keinen Zwischenstand schreiben, das Ende speichert
+                    self._save_deferred = True
+                    return
+                
+                self._load_all_secrets()
+                data = {
+                    'version': '1.0',
+                    'created': datetime.now().isoformat(),
+                    'entries': [entry.to_dict() for entry in self.entries]
+                }
+                encryptor = self.encryptor
+            
+            file_data = self.build_file_data(data, encryptor)
+            atomic_write(self.database_file, file_data)
+            
+            self._snapshot_digest = _digest_snapshot(file_data)
+            self._snapshot_generation += 1
+            self._pending_records = []
+            self._save_failed = False
+            self._discard_journal()
     
-    def add_entry(self, title: str, username: str, password: str, url: str = "", notes: str = "", totp_secret: str = "", category: str = "Other") -> bool:
+    @contextmanager
+    def transaction(self):
+        """Bündelt Änderungen zu einem Speichervorgang, Rollback im Speicher bei Exception"""
+        if self._transaction_depth > 0:
+            self._transaction_depth += 1
+            try:
+                yield self
+            finally:
+                self._transaction_depth -= 1
+            return
+        
+        # Ausstehende Hintergrund-Speicherungen vorher abschließen
+        self.flush()
+        snapshot = [(entry, entry.capture()) for entry in self.entries]
+        generation = self._snapshot_generation
+        with self._lock:
+            self._transaction_depth = 1
+            self._transaction_dirty = False
+        try:
+            yield self
+        except BaseException:
+            with self._lock:
+                self._transaction_depth = 0
+                self._transaction_dirty = False
+                deferred, self._save_deferred = self._save_deferred, False
+                self._pending_records = []
+            self._rollback(snapshot)
+            if deferred or self._snapshot_generation != generation:
+                # Die Datei kann einen Zwischenstand enthalten: zurückgerollten Zustand speichern
+                self.save_database()
+            raise
+        
+        with self._lock:
+            self._transaction_depth = 0
+            dirty = self._transaction_dirty or self._save_deferred
+            self._transaction_dirty = False
+            self._save_deferred = False
+        if dirty:
+            self.save_database()
+        elif self._pending_records:
+            self._flush_journal()
+    
+    def add_entry(self, title: str, username: str, password: str, url: str = "", notes: str = "", totp_secret: str = "", category: str = "Other",
+                  otp_params: str = "") -> bool:
         if not self.is_unlocked:
             return False
         
-        if any(entry.title.lower() == title.lower() for entry in self.entries):
+        if self._title_key(title) in self._title_index:
             return False
         
-        new_entry = PasswordEntry(title, username, password, url, notes, totp_secret, category)
-        self.entries.append(new_entry)
-        self.save_database()
+        new_entry = PasswordEntry(title, username, password, url, notes, totp_secret, category, otp_params,
+                                  secret_store=self.secrets)
+        with self._lock:
+            self.entries.append(new_entry)
+            self._index_entry(new_entry)
+        self._record_changes({'op': 'put', 'entry': new_entry.to_dict()})
         return True
     
     def get_entry(self, title: str) -> Optional[PasswordEntry]:
         if not self.is_unlocked:
             return None
         
-        for entry in self.entries:
-            if entry.title.lower() == title.lower():
-                return entry
-        return None
+        return self._title_index.get(self._title_key(title))
+    
+    def get_by_id(self, entry_id: str) -> Optional[PasswordEntry]:
+        if not self.is_unlocked:
+            return None
+        
+        return self._id_index.get(_compact_id(entry_id)) if entry_id else None
+    
+    def update_by_id(self, entry_id: str, **changes) -> bool:
+        entry = self.get_by_id(entry_id)
+        if entry is None:
+            return False
+        
+        return self.update_entry(entry, **changes)
+    
+    def update_entry(self, entry: PasswordEntry, **changes) -> bool:
+        if not self.is_unlocked:
+            return False
+        
+        new_title = changes.get('title')
+        if new_title is not None and self._title_key(new_title) != self._title_key(entry.title):
+            existing = self._title_index.get(self._title_key(new_title))
+            if existing is not None and existing is not entry:
+                return False
+        
+        with self._lock:
+            old_key = entry.title_folded
+            entry.update(**changes)
+            if entry.title_folded != old_key:
+                self._move_title(entry, old_key)
+        
+        self._record_changes({'op': 'put', 'entry': entry.to_dict()})
+        return True
     
     def list_entries(self) -> List[PasswordEntry]:
         if not self.is_unlocked:
@@ -177,15 +1013,312 @@ class PasswordManager:
         if not self.is_unlocked:
             return False
         
-        for i, entry in enumerate(self.entries):
-            if entry.title.lower() == title.lower():
-                self.entries.pop(i)
-                self.save_database()
-                return True
+        entry = self._title_index.get(self._title_key(title))
+        if entry is None:
+            return False
         
-        return False
+        self._remove_entry(entry)
+        return True
     
-    def lock_database(self):
-        self.entries = []
-        self.is_unlocked = False
-        self.encryptor = PasswordEncryption()
\ No newline at end of file
+    def delete_by_id(self, entry_id: str) -> bool:
+        entry = self.get_by_id(entry_id)
+        if entry is None:
+            return False
+        
+        self._remove_entry(entry)
+        return True
+    
+    def _remove_entry(self, entry: PasswordEntry):
+        with self._lock:
+            self.entries.remove(entry)
+            self._unindex_entry(entry)
+        self._record_changes({'op': 'delete', 'id': entry.id, 'title': entry.title})
+    
+    def set_database_file(self, database_file: str):
+        """Wechselt die Tresordatei; ein entsperrter Tresor wird vorher gespeichert und gesperrt"""
+        while True:
+            if self.is_unlocked:
+                self.lock_database()
+            
+            # Ein noch laufendes Entsperren hält den Lock bis Journal und Speichern abgeschlossen sind
+            with self._lock:
+                if not self.is_unlocked:
+                    self.database_file = database_file
+                    return
+    
+    def move_database(self, database_file: str):
+        """Verschiebt bzw. benennt die Tresordatei um, der Tresor bleibt dabei entsperrt.
+        
+        Ausstehende Änderungen werden vorher gespeichert; noch nicht geladene Geheimnisse werden
+        danach aus der neuen Datei gelesen.
+        """
+        self.checkpoint()
+        
+        with self._file_lock:
+            with self._lock:
+                directory = os.path.dirname(database_file)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                shutil.move(self.database_file, database_file)
+                self.database_file = database_file
+                if self._secret_records is not None:
+                    self._secret_records.relocate(database_file)
+    
+    def checkpoint(self):
+        self.flush()
+        if self.is_unlocked and (self._journal_count > 0 or self._save_failed):
+            self.save_database()
+    
+    def lock_database(self, soft: bool = False):
+        """Sperrt den Tresor; soft=True behält ein mit dem Datenschlüssel verschlüsseltes Abbild für schnelles Entsperren.
+        
+        Schlägt das abschließende Speichern fehl, wird die Exception weitergegeben und der Tresor bleibt entsperrt.
+        """
+        self.checkpoint()
+        
+        with self._lock:
+            soft_lock_image = None
+            if soft and self.is_unlocked and self.encryptor.key_slots:
+                try:
+                    self._load_all_secrets()
+                    states = marshal.dumps([entry.to_state() for entry in self.entries])
+                    soft_lock_image = {
+                        'database_file': self.database_file,
+                        'file_signature': self._file_signature(),
+                        'snapshot_digest': self._snapshot_digest,
+                        'key_slots': self.encryptor.get_key_slots(),
+                        'payload': self.encryptor.encrypt_payload(states)
+                    }
+                except ValueError as e:
+                    # Geheimnisse nicht lesbar (Datei verändert): normal sperren
+                    self.storage_warnings.append(f"Fehler beim Erstellen des Sperr-Abbilds: {str(e)}")
+            
+            self._soft_lock_image = soft_lock_image
+            self.entries = []
+            self._secret_records = None
+            self._title_index.clear()
+            self._title_counts.clear()
+            self._id_index.clear()
+            self._pending_records = []
+            self._journal_count = 0
+            self._save_failed = False
+            self._snapshot_digest = None
+            self.is_unlocked = False
+            self.encryptor = PasswordEncryption()
+            self.secrets.clear()
+            self.secrets = SecretStore()
+    
+    def _soft_unlock(self, master_password: str, report: Callable[[str], None],
+                     cancel_event: Optional[threading.Event]) -> Optional[bool]:
+        # None: kein (gültiges) Abbild vorhanden, normal aus der Datei entsperren
+        image = self._soft_lock_image
+        if image is None:
+            return None
+        
+        if image['database_file'] != self.database_file or image['file_signature'] != self._file_signature():
+            self._soft_lock_image = None
+            return None
+        
+        report('kdf')
+        encryptor = PasswordEncryption()
+        encryptor.open_envelope(master_password, image['key_slots'])
+        
+        report('decrypt')
+        payload = encryptor.decrypt_payload(image['payload'], 'aes-256-gcm')
+        
+        report('parse')
+        secrets = SecretStore()
+        entries = [PasswordEntry.from_state(state, secrets) for state in marshal.loads(payload)]
+        
+        report('index')
+        with self._lock:
+            if cancel_event is not None and cancel_event.is_set():
+                return False
+            if self.database_file != image['database_file']:
+                return False
+            
+            self.encryptor = encryptor
+            self.secrets = secrets
+            self.entries = entries
+            self._secret_records = None
+            self._rebuild_index()
+            self._snapshot_digest = image['snapshot_digest']
+            self._pending_records = []
+            self._soft_lock_image = None
+            self.is_unlocked = True
+            self._publish_unlock_state(None, None, [])
+        
+        return True
+    
+    def _file_signature(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.database_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    @property
+    def journal_file(self) -> str:
+        return self.database_file + self.JOURNAL_SUFFIX
+    
+    def _record_changes(self, *records: dict):
+        # Hintergrund-Speichern fasst ohnehin zu Snapshots zusammen, das Journal wird dann nicht genutzt
+        if not self.journal_enabled or self._snapshot_digest is None or self.save_worker is not None:
+            self.save_database()
+            return
+        
+        self._pending_records.extend(records)
+        if self._transaction_depth == 0:
+            self._flush_journal()
+    
+    def _flush_journal(self):
+        records, self._pending_records = self._pending_records, []
+        
+        if self._journal_count + len(records) >= self.journal_threshold:
+            self.save_database()
+            return
+        
+        try:
+            lines = []
+            if self._journal_count == 0:
+                records.insert(0, {'op': 'base', 'snapshot': self._snapshot_digest})
+            for record in records:
+                lines.append(self.encryptor.encrypt_data(json.dumps(record, separators=(',', ':'))) + b'\n')
+            
+            mode = 'ab' if self._journal_count > 0 else 'wb'
+            with open(self.journal_file, mode) as f:
+                f.write(b''.join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            
+            self._journal_count += len(records)
+        
+        except Exception as e:
+            # Ersatzweise den ganzen Tresor speichern; scheitert auch das, meldet save_database den Fehler
+            self.storage_warnings.append(f"Fehler beim Schreiben des Journals: {str(e)}")
+            self.save_database()
+    
+    def _replay_journal(self) -> bool:
+        self._journal_count = 0
+        if not os.path.exists(self.journal_file):
+            return True
+        
+        with open(self.journal_file, 'rb') as f:
+            lines = f.read().splitlines()
+        
+        for count, line in enumerate(lines):
+            try:
+                record = json.loads(self.encryptor.decrypt_data(line))
+            except ValueError:
+                return False
+            
+            if count == 0:
+                # Journal gehört zu einem anderen Snapshot (z.B. nach Wiederherstellung eines Backups)
+                if record.get('op') != 'base' or record.get('snapshot') != self._snapshot_digest:
+                    self._discard_journal()
+                    return True
+            else:
+                self._apply_record(record)
+            self._journal_count = count + 1
+        
+        return True
+    
+    def _find_record_target(self, entry_id: Optional[str], title: str) -> Optional[PasswordEntry]:
+        # Ältere Journal-Einträge kennen noch keine IDs und werden über den Titel zugeordnet
+        entry = self._id_index.get(_compact_id(entry_id)) if entry_id else None
+        if entry is None and not entry_id:
+            entry = self._title_index.get(self._title_key(title))
+        return entry
+    
+    def _apply_record(self, record: dict):
+        if record['op'] == 'put':
+            state = record['entry']
+            entry = self._find_record_target(state.get('id'), state['title'])
+            if entry is None:
+                entry = PasswordEntry.from_dict(state, self.secrets)
+                self.entries.append(entry)
+                self._index_entry(entry)
+            else:
+                old_key = entry.title_folded
+                self._apply_state(entry, state)
+                if entry.title_folded != old_key:
+                    self._move_title(entry, old_key)
+        elif record['op'] == 'delete':
+            entry = self._find_record_target(record.get('id'), record['title'])
+            if entry is not None:
+                self.entries.remove(entry)
+                self._unindex_entry(entry)
+    
+    def _discard_journal(self):
+        self._journal_count = 0
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+    
+    @staticmethod
+    def _title_key(title: str) -> str:
+        return title.casefold()
+    
+    def _index_entry(self, entry: PasswordEntry):
+        self._id_index[entry._id] = entry
+        self._add_title(entry, entry.title_folded)
+    
+    def _unindex_entry(self, entry: PasswordEntry):
+        if self._id_index.get(entry._id) is entry:
+            del self._id_index[entry._id]
+            self._drop_title(entry, entry.title_folded)
+    
+    def _move_title(self, entry: PasswordEntry, old_key: str):
+        self._drop_title(entry, old_key)
+        self._add_title(entry, entry.title_folded)
+    
+    def _add_title(self, entry: PasswordEntry, key: str):
+        self._title_counts[key] = self._title_counts.get(key, 0) + 1
+        self._title_index.setdefault(key, entry)
+    
+    def _drop_title(self, entry: PasswordEntry, key: str):
+        count = self._title_counts.get(key, 0) - 1
+        if count > 0:
+            self._title_counts[key] = count
+        else:
+            self._title_counts.pop(key, None)
+        
+        if self._title_index.get(key) is not entry:
+            return
+        
+        del self._title_index[key]
+        if count > 0:
+            # Alte Datenbanken können Titel-Duplikate enthalten: nächsten Treffer nachrücken lassen
+            for other in self.entries:
+                if other is not entry and other.title_folded == key:
+                    self._title_index[key] = other
+                    break
+    
+    def _rollback(self, snapshot):
+        with self._lock:
+            self.entries = [entry for entry, _ in snapshot]
+            for entry, captured in snapshot:
+                entry.restore(captured)
+            self._rebuild_index()
+    
+    def _load_all_secrets(self):
+        # Vor dem Speichern oder einer Soft-Sperre werden alle Geheimnisse gebraucht
+        if self._secret_records is not None:
+            self._secret_records.load_all()
+            self._secret_records = None
+    
+    @staticmethod
+    def _apply_state(entry: PasswordEntry, state: dict):
+        entry.update(**{field: state[field] for field in PasswordEntry.EDITABLE_FIELDS if field in state})
+        if 'created' in state:
+            entry.created = state['created']
+        if 'modified' in state:
+            entry.modified = state['modified']
+    
+    def _rebuild_index(self):
+        self._title_index = {}
+        self._title_counts = {}
+        self._id_index = {}
+        for entry in self.entries:
+            if entry._id in self._id_index:
+                entry._id = uuid.uuid4().int
+            self._index_entry(entry)
\ No newline at end of file
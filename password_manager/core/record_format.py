@@ -0,0 +1,259 @@
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Callable
+from core.compression import compress_payload, decompress_payload
+from core.encryption import GCM_NONCE_SIZE, GCM_TAG_SIZE, run_parallel
+from core.vault_format import decode_vault, encode_vault
+
+RECORD_MAGIC = b"PMRC"
+RECORD_META = 1
+RECORD_SECRET = 2
+RECORD_INDEX = 3
+
+# Magic, Art, laufende Nummer, Länge des verschlüsselten Inhalts; dient zugleich als Associated Data
+FRAME = struct.Struct('<4sBII')
+
+META_FIELDS = ('id', 'title', 'username', 'url', 'category', 'created', 'modified')
+SECRET_FIELDS = ('password', 'notes', 'totp_secret', 'otp_params')
+# Aus den Geheimnissen abgeleitet und in den Metadaten gespeichert: Listenansichten brauchen keine Geheimnis-Records
+DERIVED_FIELDS = ('password_length', 'has_notes', 'has_totp')
+# Einträge pro Record: kleiner heißt feinere Wiederherstellung, größer weniger Overhead pro Eintrag
+ENTRIES_PER_RECORD = 32
+
+Seal = Callable[[bytes, bytes], bytes]
+Open = Callable[[bytes, bytes], bytes]
+
+
+def encode_records(data: dict, seal: Seal, compression: str = 'none', level: int = 6,
+                   workers: int = 1) -> tuple[bytes, int]:
+    """Schreibt die Einträge gruppenweise als Metadaten- und Geheimnis-Records, einzeln authentifiziert.
+    
+    Aufbau: alle Metadaten-Records, alle Geheimnis-Records, zuletzt der Index mit den Offsets.
+    Jeder Record wird für sich komprimiert und versiegelt, verteilt auf workers Threads.
+    Gibt den Inhalt und den Offset des Index-Records zurück.
+    """
+    entries = data['entries']
+    groups = [entries[start:start + ENTRIES_PER_RECORD] for start in range(0, len(entries), ENTRIES_PER_RECORD)]
+    meta_groups = [[dict(entry, **_derived_fields(entry)) for entry in group] for group in groups]
+    
+    items = [(RECORD_META, seq, encode_vault({'entries': group}, META_FIELDS + DERIVED_FIELDS))
+             for seq, group in enumerate(meta_groups)]
+    items += [(RECORD_SECRET, seq, encode_vault({'entries': group}, SECRET_FIELDS))
+              for seq, group in enumerate(groups)]
+    
+    def seal_item(item):
+        kind, seq, plaintext = item
+        return _frame(kind, seq, compress_payload(plaintext, compression, level), seal)
+    
+    records = run_parallel(seal_item, items, workers)
+    parts = []
+    offset = 0
+    meta_offsets = array('Q')
+    secret_offsets = array('Q')
+    for (kind, _, _), record in zip(items, records):
+        (meta_offsets if kind == RECORD_META else secret_offsets).append(offset)
+        parts.append(record)
+        offset += len(record)
+    
+    if sys.byteorder == 'big':
+        meta_offsets.byteswap()
+        secret_offsets.byteswap()
+    
+    created = str(data.get('created', '')).encode('utf-8')
+    index = (struct.pack('<IH', len(groups), len(created)) + created +
+             meta_offsets.tobytes() + secret_offsets.tobytes())
+    parts.append(_frame(RECORD_INDEX, 0, index, seal))
+    return b''.join(parts), offset
+
+
+def read_index(f: BinaryIO, body_offset: int, index_offset: int, open_: Open) -> dict:
+    f.seek(body_offset + index_offset)
+    kind, _, payload = _read_frame(f.read(FRAME.size), f, open_)
+    if kind != RECORD_INDEX:
+        raise ValueError("Record-Index fehlt")
+    
+    count, created_length = struct.unpack_from('<IH', payload)
+    position = struct.calcsize('<IH')
+    created = payload[position:position + created_length].decode('utf-8')
+    position += created_length
+    
+    offsets = array('Q')
+    offsets.frombytes(payload[position:position + 2 * count * offsets.itemsize])
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+    
+    return {'created': created, 'count': count, 'index_offset': index_offset,
+            'meta_offsets': offsets[:count], 'secret_offsets': offsets[count:]}
+
+
+def read_records(f: BinaryIO, body_offset: int, index: dict, open_: Open, kinds=(RECORD_META, RECORD_SECRET),
+                 compression: str = 'none', workers: int = 1) -> dict:
+    """Liest die gewünschten Record-Arten über den Index; nur Metadaten lesen überspringt alle Geheimnisse.
+    
+    'group_sizes' im Ergebnis enthält die Anzahl Einträge je Record-Gruppe (für read_secret_group).
+    """
+    count = index['count']
+    groups = [[] for _ in range(count)]
+    
+    for kind, key in ((RECORD_META, 'meta_offsets'), (RECORD_SECRET, 'secret_offsets')):
+        if kind not in kinds or count == 0:
+            continue
+        
+        offsets = index[key]
+        region_start, region = _read_region(f, body_offset, index, kind)
+        
+        def open_item(seq):
+            return _open_record(region, offsets[seq] - region_start, kind, seq, open_, compression)
+        
+        for seq, payload in enumerate(run_parallel(open_item, range(count), workers)):
+            _merge_group(groups, seq, decode_vault(payload)['entries'])
+    
+    entries = [entry for group in groups for entry in group]
+    return {'version': '1.0', 'created': index['created'], 'entries': entries,
+            'group_sizes': [len(group) for group in groups]}
+
+
+def verify_records(f: BinaryIO, body_offset: int, index: dict, open_: Open, kind: int = RECORD_SECRET,
+                   workers: int = 1):
+    """Authentifiziert alle Records einer Art, ohne sie zu dekomprimieren oder zu dekodieren.
+    
+    Der Klartext wird sofort verworfen; ein beschädigter Record löst ValueError aus.
+    """
+    if index['count'] == 0:
+        return
+    
+    offsets = index['meta_offsets' if kind == RECORD_META else 'secret_offsets']
+    region_start, region = _read_region(f, body_offset, index, kind)
+    
+    def verify_item(seq):
+        record_kind, record_seq, _ = _parse_frame(region, offsets[seq] - region_start, open_)
+        if record_kind != kind or record_seq != seq:
+            raise ValueError("Record-Index passt nicht zum Inhalt")
+    
+    run_parallel(verify_item, range(index['count']), workers)
+
+
+def read_secret_group(f: BinaryIO, body_offset: int, index: dict, seq: int, open_: Open,
+                      compression: str = 'none') -> list:
+    """Liest nur den Geheimnis-Record einer Gruppe, z.B. beim ersten Zugriff auf ein Passwort"""
+    offsets = index['secret_offsets']
+    end = offsets[seq + 1] if seq + 1 < len(offsets) else index['index_offset']
+    f.seek(body_offset + offsets[seq])
+    record = f.read(end - offsets[seq])
+    return decode_vault(_open_record(record, 0, RECORD_SECRET, seq, open_, compression))['entries']
+
+
+def salvage_records(body: bytes, open_: Open, compression: str = 'none') -> tuple[dict, dict]:
+    """Sucht alle intakten Records ohne Index; Einträge ohne Metadaten-Record sind verloren"""
+    metas = {}
+    secrets = {}
+    damaged = 0
+    position = body.find(RECORD_MAGIC)
+    
+    while position != -1:
+        try:
+            kind, seq, payload = _parse_frame(body, position, open_)
+        except ValueError:
+            damaged += 1
+            position = body.find(RECORD_MAGIC, position + 1)
+            continue
+        
+        try:
+            if kind == RECORD_META:
+                metas[seq] = decode_vault(decompress_payload(payload, compression))['entries']
+            elif kind == RECORD_SECRET:
+                secrets[seq] = decode_vault(decompress_payload(payload, compression))['entries']
+        except Exception:
+            damaged += 1
+        length = FRAME.unpack_from(body, position)[3]
+        position = body.find(RECORD_MAGIC, position + FRAME.size + length)
+    
+    entries = []
+    missing_secrets = 0
+    for seq in sorted(metas):
+        group = metas[seq]
+        if seq in secrets and len(secrets[seq]) == len(group):
+            for entry, secret in zip(group, secrets[seq]):
+                entry.update(secret)
+        else:
+            # Metadaten sind intakt, die Geheimnisse nicht: Eintrag ohne Passwort übernehmen
+            missing_secrets += len(group)
+            for entry in group:
+                entry.setdefault('password', '')
+        entries.extend(group)
+    
+    report = {
+        'recovered': len(entries),
+        'missing_secrets': missing_secrets,
+        'lost': sum(len(group) for seq, group in secrets.items() if seq not in metas),
+        'damaged_records': damaged
+    }
+    return {'version': '1.0', 'entries': entries}, report
+
+
+def _derived_fields(entry: dict) -> dict:
+    return {
+        'password_length': len(entry.get('password', '')),
+        'has_notes': '1' if entry.get('notes') else '',
+        'has_totp': '1' if str(entry.get('totp_secret', '')).strip() else ''
+    }
+
+
+def _open_record(buffer: bytes, position: int, kind: int, seq: int, open_: Open, compression: str) -> bytes:
+    record_kind, record_seq, payload = _parse_frame(buffer, position, open_)
+    if record_kind != kind or record_seq != seq:
+        raise ValueError("Record-Index passt nicht zum Inhalt")
+    return decompress_payload(payload, compression)
+
+
+def _merge_group(groups: list, seq: int, entries: list):
+    if not groups[seq]:
+        groups[seq] = entries
+        return
+    
+    if len(groups[seq]) != len(entries):
+        raise ValueError("Record-Gruppen passen nicht zusammen")
+    for entry, fields in zip(groups[seq], entries):
+        entry.update(fields)
+
+
+def _frame(kind: int, seq: int, plaintext: bytes, seal: Seal) -> bytes:
+    # Die Länge des Chiffretexts steht vor der Verschlüsselung fest (Nonce + Klartext + Tag)
+    frame = FRAME.pack(RECORD_MAGIC, kind, seq, GCM_NONCE_SIZE + len(plaintext) + GCM_TAG_SIZE)
+    return frame + seal(plaintext, frame)
+
+
+def _parse_frame(buffer: bytes, position: int, open_: Open) -> tuple[int, int, bytes]:
+    if position + FRAME.size > len(buffer):
+        raise ValueError("Record abgeschnitten")
+    
+    magic, kind, seq, length = FRAME.unpack_from(buffer, position)
+    start = position + FRAME.size
+    if magic != RECORD_MAGIC or start + length > len(buffer):
+        raise ValueError("Record beschädigt")
+    
+    return kind, seq, open_(buffer[start:start + length], buffer[position:start])
+
+
+def _read_frame(frame: bytes, f: BinaryIO, open_: Open) -> tuple[int, int, bytes]:
+    if len(frame) < FRAME.size:
+        raise ValueError("Record abgeschnitten")
+    
+    length = FRAME.unpack(frame)[3]
+    return _parse_frame(frame + f.read(length), 0, open_)
+
+
+def _read_region(f: BinaryIO, body_offset: int, index: dict, kind: int) -> tuple[int, bytes]:
+    # Records einer Art liegen zusammenhängend: ein einziger Lesevorgang für den ganzen Bereich
+    offsets = index['meta_offsets' if kind == RECORD_META else 'secret_offsets']
+    region_start = offsets[0]
+    f.seek(body_offset + region_start)
+    return region_start, f.read(_region_end(index, kind) - region_start)
+
+
+def _region_end(index: dict, kind: int) -> int:
+    # Metadaten enden am ersten Geheimnis-Record, Geheimnisse am Index
+    if kind == RECORD_META:
+        return index['secret_offsets'][0]
+    return index['index_offset']
@@ -0,0 +1,74 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class BackgroundSaveWorker:
+    """Speichert im Hintergrund-Thread und fasst schnell aufeinanderfolgende Anforderungen zusammen"""
+    
+    def __init__(self, save_callback: Callable[[], None], delay: float = 0.5):
+        self.save_callback = save_callback
+        self.delay = delay
+        self.last_saved: Optional[float] = None
+        self.last_error: Optional[Exception] = None
+        
+        self._condition = threading.Condition()
+        self._pending = False
+        self._saving = False
+        self._flush_requested = False
+        self._stopping = False
+        
+        self._thread = threading.Thread(target=self._run, name="BackgroundSaveWorker", daemon=True)
+        self._thread.start()
+    
+    def request_save(self):
+        with self._condition:
+            self._pending = True
+            self._condition.notify_all()
+    
+    def flush(self, timeout: float = None) -> bool:
+        with self._condition:
+            if not self._thread.is_alive():
+                return not self._pending
+            
+            self._flush_requested = True
+            self._condition.notify_all()
+            done = self._condition.wait_for(lambda: not self._pending and not self._saving, timeout)
+            self._flush_requested = False
+            return done
+    
+    def stop(self):
+        self.flush()
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join()
+    
+    @property
+    def has_pending(self) -> bool:
+        with self._condition:
+            return self._pending or self._saving
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._stopping)
+                if self._stopping and not self._pending:
+                    return
+                
+                # Weitere Änderungen innerhalb der Verzögerung landen im selben Schreibvorgang
+                self._condition.wait_for(lambda: self._flush_requested or self._stopping, self.delay)
+                self._pending = False
+                self._saving = True
+            
+            try:
+                self.save_callback()
+                self.last_error = None
+                self.last_saved = time.time()
+            except Exception as e:
+                self.last_error = e
+                print(f"Fehler beim Speichern im Hintergrund: {str(e)}")
+            finally:
+                with self._condition:
+                    self._saving = False
+                    self._condition.notify_all()
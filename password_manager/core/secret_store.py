@@ -0,0 +1,78 @@
+import itertools
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_CACHE_TTL = 60.0
+
+
+class SecretStore:
+    """Hält geheime Felder im Speicher verschlüsselt (AES-GCM mit Sitzungsschlüssel).
+    
+    Entschlüsselte Werte liegen nur in einem kleinen LRU-Cache, der nach cache_ttl Sekunden verfällt.
+    """
+    
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE, cache_ttl: float = DEFAULT_CACHE_TTL):
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._gcm = AESGCM(AESGCM.generate_key(bit_length=256))
+        # Zähler-Nonces sind je Sitzungsschlüssel eindeutig und sparen os.urandom pro Feld
+        self._nonce_prefix = os.urandom(4)
+        self._counter = itertools.count()
+        self._cache: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def seal(self, value: str) -> bytes:
+        if not value:
+            return b''
+        
+        nonce = self._nonce_prefix + struct.pack('<Q', next(self._counter))
+        return nonce + self._gcm.encrypt(nonce, value.encode('utf-8'), None)
+    
+    def reveal(self, token: bytes, cache: bool = True) -> str:
+        if not token:
+            return ''
+        
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(token)
+            if cached is not None and cached[1] > now:
+                self._cache.move_to_end(token)
+                return cached[0]
+        
+        value = self._gcm.decrypt(token[:12], token[12:], None).decode('utf-8')
+        if not cache:
+            return value
+        
+        with self._lock:
+            self._cache[token] = (value, now + self.cache_ttl)
+            self._cache.move_to_end(token)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return value
+    
+    @staticmethod
+    def plaintext_size(token: bytes) -> int:
+        """Länge des UTF-8-Klartexts, ohne zu entschlüsseln (Nonce und Tag abgezogen)"""
+        return len(token) - 28 if token else 0
+    
+    def purge_expired(self):
+        with self._lock:
+            self._purge_expired(time.monotonic())
+    
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+    
+    @property
+    def cached_count(self) -> int:
+        return len(self._cache)
+    
+    def _purge_expired(self, now: float):
+        for token, (_, expires) in list(self._cache.items()):
+            if expires <= now:
+                del self._cache[token]
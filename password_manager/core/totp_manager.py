@@ -2,62 +2,327 @@ import pyotp
 import qrcode
 from io import BytesIO
 import base64
+import binascii
+import hashlib
+import hmac
+import struct
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlparse
 from PIL import Image, ImageTk
 import secrets
+import time
+
+TOTP_INTERVAL = 30
+TOTP_DIGITS = 6
+MIN_SECRET_LENGTH = 16
+# Sekunden vor dem Fensterwechsel, ab denen die Codes des nächsten Fensters vorberechnet werden
+PRECOMPUTE_LEAD = 3
+QR_CACHE_SIZE = 16
+# Geparste otp_params; HOTP-Zähler und verify_totp erzeugen laufend neue Texte
+PARAMS_CACHE_SIZE = 256
+# Puffer, damit ein Refresh sicher nach dem Sekunden- bzw. Fensterwechsel läuft
+REFRESH_SLACK_MS = 20
+# Refresh-Abstand, wenn keine zeitbasierten Codes angezeigt werden
+TOTP_IDLE_REFRESH_MS = 5000
+
+OTP_TYPES = ('totp', 'hotp')
+OTP_ALGORITHMS = {'SHA1': hashlib.sha1, 'SHA256': hashlib.sha256, 'SHA512': hashlib.sha512}
+# Parameter wie in otpauth-URIs; leere otp_params eines Eintrags bedeuten genau diese Werte
+DEFAULT_OTP_PARAMS = {'type': 'totp', 'period': TOTP_INTERVAL, 'digits': TOTP_DIGITS, 'algorithm': 'SHA1', 'counter': 0}
+
+
+def parse_otp_params(text):
+    """Liest otp_params ("type=hotp&counter=3&digits=8"); ungültige Werte lösen ValueError aus"""
+    params = dict(DEFAULT_OTP_PARAMS)
+    for key, value in parse_qsl(text or ''):
+        key = key.lower()
+        if key == 'type':
+            value = value.lower()
+            if value not in OTP_TYPES:
+                raise ValueError(f"Unbekannter OTP-Typ: {value}")
+        elif key == 'algorithm':
+            value = value.upper()
+            if value not in OTP_ALGORITHMS:
+                raise ValueError(f"Nicht unterstützter OTP-Algorithmus: {value}")
+        elif key in ('period', 'digits', 'counter'):
+            value = int(value)
+        else:
+            # issuer, image usw. betreffen die Codeberechnung nicht
+            continue
+        params[key] = value
+    
+    if params['period'] < 1 or params['counter'] < 0 or not 6 <= params['digits'] <= 10:
+        raise ValueError("Ungültige OTP-Parameter")
+    return params
+
+
+def format_otp_params(params):
+    """Gegenstück zu parse_otp_params; Standardwerte werden weggelassen"""
+    hotp = params['type'] == 'hotp'
+    items = []
+    for key, default in DEFAULT_OTP_PARAMS.items():
+        if (key == 'period' and hotp) or (key == 'counter' and not hotp):
+            continue
+        if params[key] != default:
+            items.append((key, params[key]))
+    return urlencode(items)
+
+
+def parse_otpauth_uri(uri):
+    """Zerlegt eine otpauth://-URI in Secret und otp_params"""
+    parsed = urlparse(uri.strip())
+    otp_type = parsed.netloc.lower()
+    if parsed.scheme.lower() != 'otpauth' or otp_type not in OTP_TYPES:
+        raise ValueError("Keine gültige otpauth-URI")
+    
+    query = dict(parse_qsl(parsed.query))
+    secret = query.get('secret', '').strip()
+    if not secret:
+        raise ValueError("otpauth-URI enthält kein Secret")
+    
+    fields = [('type', otp_type)] + [(key, value) for key, value in query.items()
+                                     if key in ('period', 'digits', 'algorithm', 'counter')]
+    return secret, format_otp_params(parse_otp_params(urlencode(fields)))
 
 
 class TOTPManager:
     def __init__(self):
-        pass
+        # Dekodierte Schlüssel je Secret; None markiert ungültige Secrets
+        self._keys = {}
+        # Geparste otp_params je Text (LRU); None markiert ungültige Parameter
+        self._params = OrderedDict()
+        # Codetabellen je Periode: innerhalb eines Zeitschritts nur Nachschlagen
+        self._windows = {}
+        # Je Secret nur der Code zum aktuellen Zähler: (otp_params, Code), ältere Zähler werden ersetzt
+        self._hotp_codes = {}
+        # Fertig skalierte QR-Bilder, Schlüssel ist ein Hash aus Provisioning-URI und Größe
+        self._qr_cache = OrderedDict()
     
     def generate_secret(self):
         return pyotp.random_base32()
     
-    def generate_qr_code(self, secret, account_name, issuer="Password Manager"):
-        totp = pyotp.TOTP(secret)
-        provisioning_uri = totp.provisioning_uri(
+    def generate_qr_code(self, secret, account_name, issuer="Password Manager", params=''):
+        return self._render_qr(self._provisioning_uri(secret, account_name, issuer, params))
+    
+    def get_qr_image(self, secret, account_name, size, issuer="Password Manager", params=''):
+        """QR-Code als auf size x size skaliertes PIL-Bild für ImageTk; wiederholte Aufrufe kommen aus dem LRU-Cache"""
+        provisioning_uri = self._provisioning_uri(secret, account_name, issuer, params)
+        key = hashlib.sha256(f"{provisioning_uri}\0{size}".encode('utf-8')).digest()
+        
+        img = self._qr_cache.get(key)
+        if img is not None:
+            self._qr_cache.move_to_end(key)
+            return img
+        
+        img = self._render_qr(provisioning_uri).resize((size, size), Image.Resampling.LANCZOS)
+        self._qr_cache[key] = img
+        while len(self._qr_cache) > QR_CACHE_SIZE:
+            self._qr_cache.popitem(last=False)
+        return img
+    
+    def _provisioning_uri(self, secret, account_name, issuer, params=''):
+        p = parse_otp_params(params)
+        digest = OTP_ALGORITHMS[p['algorithm']]
+        if p['type'] == 'hotp':
+            return pyotp.HOTP(secret, digits=p['digits'], digest=digest).provisioning_uri(
+                name=account_name,
+                initial_count=p['counter'],
+                issuer_name=issuer
+            )
+        
+        return pyotp.TOTP(secret, digits=p['digits'], digest=digest, interval=p['period']).provisioning_uri(
             name=account_name,
             issuer_name=issuer
         )
-        
+    
+    def _render_qr(self, provisioning_uri):
         qr = qrcode.QRCode(version=1, box_size=10, border=5)
         qr.add_data(provisioning_uri)
         qr.make(fit=True)
         
-        img = qr.make_image(fill_color="black", back_color="white")
-        return img
+        return qr.make_image(fill_color="black", back_color="white")
     
-    def get_current_totp(self, secret):
-        """✅ FIXED: Entfernte alle Debug-Ausgaben"""
+    def get_current_totp(self, secret, params=''):
+        """Code und Restsekunden (None bei HOTP); jeder Code wird nur einmal pro Zeitschritt berechnet"""
         if not secret or not secret.strip():
             return None, 0
         
-        try:
-            secret = secret.strip().replace(' ', '').upper()
-            
-            if len(secret) < 16:
-                return None, 0
-            
-            totp = pyotp.TOTP(secret)
-            current_code = totp.now()
-            
-            import time
-            remaining_time = 30 - int(time.time() % 30)
-            
-            return current_code, remaining_time
-            
-        except Exception:
-            # ✅ FIXED: Keine Debug-Ausgaben mehr
+        p = self._get_params(params)
+        if p is None:
+            return None, 0
+        
+        if p['type'] == 'hotp':
+            cached = self._hotp_codes.get(secret)
+            if cached is None or cached[0] != params:
+                cached = self._hotp_codes[secret] = (params, self.compute_batch([secret], params=params)[secret])
+            current_code = cached[1]
+            return (current_code, None) if current_code else (None, 0)
+        
+        period = p['period']
+        now = time.time()
+        step = int(now // period)
+        window = self._windows.get(period)
+        if window is None or window['step'] != step:
+            window = self._advance(period, step)
+        
+        codes = window['codes']
+        key = (secret, params)
+        if key not in codes:
+            codes[key] = self.compute_batch([secret], now, params)[secret]
+        current_code = codes[key]
+        
+        if not current_code:
             return None, 0
+        
+        remaining_time = period - int(now % period)
+        if remaining_time <= PRECOMPUTE_LEAD and window['next_step'] != step + 1:
+            # Nächstes Fenster vorab berechnen, damit der Wechsel selbst nichts kostet
+            window['next_codes'] = self._compute_window(codes, (step + 1) * period)
+            window['next_step'] = step + 1
+        
+        return current_code, remaining_time
+    
+    def take_code(self, entry, password_manager):
+        """Code zum Verwenden (Kopieren); bei HOTP wird danach der Zähler des Eintrags weitergezählt"""
+        current_code, remaining_time = self.get_current_totp(entry.totp_secret, entry.otp_params)
+        if current_code and remaining_time is None:
+            password_manager.update_entry(entry, otp_params=self.next_hotp_params(entry.otp_params))
+        return current_code, remaining_time
+    
+    def next_hotp_params(self, params):
+        p = parse_otp_params(params)
+        p['counter'] += 1
+        return format_otp_params(p)
+    
+    def next_refresh_ms(self, params_list, countdown=True):
+        """Millisekunden bis zur nächsten sichtbaren Änderung, None wenn nur HOTP/keine Codes angezeigt werden.
+        
+        Mit countdown ändert sich die Anzeige jede Sekunde, sonst erst beim Wechsel der jeweiligen Periode.
+        """
+        now = time.time()
+        delays = []
+        for params in set(params_list):
+            p = self._get_params(params)
+            if p is None or p['type'] != 'totp':
+                continue
+            unit = 1 if countdown else p['period']
+            delays.append(unit - now % unit)
+        
+        if not delays:
+            return None
+        return int(min(delays) * 1000) + REFRESH_SLACK_MS
+    
+    def compute_batch(self, secrets, timestamp=None, params=''):
+        """Codes für viele Secrets mit denselben otp_params; ungültige Secrets ergeben None"""
+        p = self._get_params(params)
+        if p is None:
+            return dict.fromkeys(secrets)
+        
+        if p['type'] == 'hotp':
+            moving_factor = p['counter']
+        else:
+            if timestamp is None:
+                timestamp = time.time()
+            moving_factor = int(timestamp // p['period'])
+        
+        counter = struct.pack('>Q', moving_factor)
+        digestmod = OTP_ALGORITHMS[p['algorithm']]
+        digits = p['digits']
+        modulus = 10 ** digits
+        keys = self._keys
+        codes = {}
+        
+        # Schlüssel sind einmal dekodiert, pro Secret bleibt nur ein HMAC (RFC 4226/6238)
+        for secret in secrets:
+            key = keys[secret] if secret in keys else self._decode_secret(secret)
+            if key is None:
+                codes[secret] = None
+                continue
+            
+            digest = hmac.digest(key, counter, digestmod)
+            offset = digest[-1] & 0x0F
+            value = int.from_bytes(digest[offset:offset + 4], 'big') & 0x7FFFFFFF
+            codes[secret] = str(value % modulus).zfill(digits)
+        
+        return codes
     
-    def verify_totp(self, secret, token):
+    def clear_cache(self):
+        """Verwirft zwischengespeicherte Secrets, Codes und QR-Bilder (beim Sperren)"""
+        self._keys.clear()
+        self._params.clear()
+        self._qr_cache.clear()
+        self._windows = {}
+        self._hotp_codes = {}
+    
+    def _compute_window(self, keys, timestamp):
+        # Schlüssel sind (Secret, otp_params); berechnet wird gruppenweise je Parametersatz
+        groups = {}
+        for secret, params in keys:
+            groups.setdefault(params, []).append(secret)
+        
+        codes = {}
+        for params, group in groups.items():
+            for secret, code in self.compute_batch(group, timestamp, params).items():
+                codes[(secret, params)] = code
+        return codes
+    
+    def _advance(self, period, step):
+        window = self._windows.get(period)
+        codes = window['next_codes'] if window is not None and window['next_step'] == step else {}
+        window = {'step': step, 'codes': codes, 'next_step': None, 'next_codes': {}}
+        self._windows[period] = window
+        return window
+    
+    def _get_params(self, params):
+        if params in self._params:
+            self._params.move_to_end(params)
+            return self._params[params]
+        
+        try:
+            p = parse_otp_params(params)
+        except ValueError:
+            p = None
+        self._params[params] = p
+        while len(self._params) > PARAMS_CACHE_SIZE:
+            self._params.popitem(last=False)
+        return p
+    
+    def _decode_secret(self, secret):
+        normalized = secret.strip().replace(' ', '').upper()
+        key = None
+        if len(normalized) >= MIN_SECRET_LENGTH:
+            try:
+                key = base64.b32decode(normalized + '=' * (-len(normalized) % 8))
+            except (binascii.Error, ValueError):
+                key = None
+        
+        self._keys[secret] = key
+        return key
+    
+    def verify_totp(self, secret, token, params='', window=0):
+        """Prüft einen Code mit den otp_params des Eintrags (Typ, Periode, Stellen, Algorithmus).
+        
+        window erlaubt bei TOTP so viele Zeitschritte Abweichung, bei HOTP so viele Zählerstände voraus.
+        """
         if not secret or not token:
             return False
-        try:
-            totp = pyotp.TOTP(secret)
-            return totp.verify(token)
-        except:
+        
+        p = self._get_params(params)
+        if p is None:
             return False
+        
+        if p['type'] == 'hotp':
+            candidates = [(None, format_otp_params(dict(p, counter=p['counter'] + i))) for i in range(window + 1)]
+        else:
+            now = time.time()
+            candidates = [(now + i * p['period'], params) for i in range(-window, window + 1)]
+        
+        token = str(token).strip().replace(' ', '').encode('utf-8')
+        for timestamp, candidate_params in candidates:
+            code = self.compute_batch([secret], timestamp, candidate_params)[secret]
+            if code and hmac.compare_digest(code.encode('utf-8'), token):
+                return True
+        return False
     
     def generate_backup_codes(self, count=10):
         codes = []
@@ -0,0 +1,85 @@
+import base64
+import binascii
+import io
+import json
+import os
+import struct
+from typing import BinaryIO
+from core.encryption import GCM_NONCE_SIZE, GCM_TAG_SIZE
+from core.record_format import FRAME
+
+FILE_MAGIC = b"PMGR"
+FILE_VERSION = 2
+LEGACY_SALT_SIZE = 16
+# Fernet-Token: Version, Zeitstempel, IV, mindestens ein AES-Block, HMAC
+FERNET_OVERHEAD = 1 + 8 + 16 + 32
+
+
+def build_vault_file(salt: bytes, body: bytes, **header_fields) -> bytes:
+    """Setzt Datei-Header (Magic, Version, JSON-Header) und verschlüsselten Inhalt zusammen"""
+    header = {'salt': base64.b64encode(salt).decode('ascii')}
+    header.update(header_fields)
+    raw_header = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    return FILE_MAGIC + struct.pack('<BI', FILE_VERSION, len(raw_header)) + raw_header + body
+
+
+def read_vault_header(f: BinaryIO) -> tuple[dict, int]:
+    """Liest nur den Header aus einer geöffneten Datei und gibt ihn mit dem Offset des Inhalts zurück"""
+    if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+        f.seek(0)
+        header = {'salt': f.read(LEGACY_SALT_SIZE), 'compression': 'none', 'legacy': True}
+        return header, LEGACY_SALT_SIZE
+    
+    prefix_size = struct.calcsize('<BI')
+    version, header_length = struct.unpack('<BI', f.read(prefix_size))
+    if version > FILE_VERSION:
+        raise ValueError(f"Unbekannte Dateiversion: {version}")
+    
+    header = json.loads(f.read(header_length).decode('utf-8'))
+    header['salt'] = base64.b64decode(header['salt'])
+    return header, len(FILE_MAGIC) + prefix_size + header_length
+
+
+def parse_vault_file(file_data: bytes) -> tuple[dict, bytes]:
+    """Trennt Header und Inhalt; Dateien ohne Header (16 Byte Salt + Fernet) werden als Legacy erkannt"""
+    header, body_offset = read_vault_header(io.BytesIO(file_data))
+    return header, file_data[body_offset:]
+
+
+def is_complete_vault_file(path: str) -> bool:
+    """Prüft ohne Schlüssel, ob eine Datei vollständig geschrieben wurde (Header lesbar, Länge passt zum Inhalt).
+    
+    Dateien, deren Länge sich nicht prüfen lässt (AES-GCM ohne Blöcke), gelten als unvollständig.
+    """
+    try:
+        with open(path, 'rb') as f:
+            header, body_offset = read_vault_header(f)
+            body_length = os.fstat(f.fileno()).st_size - body_offset
+            
+            if header.get('layout') == 'records':
+                # Der Index-Record steht am Ende, seine Länge steht im Frame davor
+                index_offset = header['records']['index_offset']
+                f.seek(body_offset + index_offset)
+                frame = f.read(FRAME.size)
+                if len(frame) < FRAME.size:
+                    return False
+                return body_length == index_offset + FRAME.size + FRAME.unpack(frame)[3]
+            
+            if header.get('cipher', 'fernet') == 'fernet':
+                token = base64.urlsafe_b64decode(f.read())
+                return len(token) >= FERNET_OVERHEAD + 16 and (len(token) - FERNET_OVERHEAD) % 16 == 0
+        
+        chunks = header.get('chunks')
+        if not chunks:
+            return False
+        
+        overhead = int(chunks['count']) * (GCM_NONCE_SIZE + GCM_TAG_SIZE)
+        if 'length' in chunks:
+            return body_length == int(chunks['length']) + overhead
+        
+        # Ältere Dateien ohne Länge: alle Blöcke bis auf den letzten sind voll, der letzte enthält höchstens size Bytes
+        stride = int(chunks['size']) + GCM_NONCE_SIZE + GCM_TAG_SIZE
+        last_chunk = body_length - (int(chunks['count']) - 1) * stride
+        return GCM_NONCE_SIZE + GCM_TAG_SIZE <= last_chunk <= stride
+    except (OSError, ValueError, KeyError, TypeError, struct.error, binascii.Error):
+        return False
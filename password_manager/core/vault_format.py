@@ -0,0 +1,93 @@
+import json
+import struct
+import sys
+from array import array
+from itertools import accumulate
+
+MAGIC = b"PMVB"
+FORMAT_VERSION = 1
+
+ENTRY_FIELDS = ('id', 'title', 'username', 'password', 'url', 'notes', 'totp_secret', 'otp_params', 'category', 'created', 'modified')
+
+
+def encode_vault(data: dict, fields: tuple = ENTRY_FIELDS) -> bytes:
+    """Kodiert den Tresor-Inhalt im kompakten Binärformat.
+    
+    Aufbau: MAGIC, Version, Feldliste, Anzahl Einträge, eine Längentabelle
+    (Zeichen pro Feld) und ein einziger UTF-8-Block mit allen Feldwerten.
+    """
+    entries = data['entries']
+    # None (z.B. aus kurzen CSV-Zeilen) wird zum leeren Feld, nicht zum Text 'None'
+    values = [_field_text(entry.get(field)) for entry in entries for field in fields]
+    
+    lengths = array('I', map(len, values))
+    if sys.byteorder == 'big':
+        lengths.byteswap()
+    
+    blob = ''.join(values).encode('utf-8')
+    
+    parts = [MAGIC, struct.pack('<BH', FORMAT_VERSION, len(fields))]
+    for field in fields:
+        name = field.encode('utf-8')
+        parts.append(struct.pack('<B', len(name)))
+        parts.append(name)
+    
+    created = str(data.get('created', '')).encode('utf-8')
+    parts.append(struct.pack('<H', len(created)))
+    parts.append(created)
+    parts.append(struct.pack('<I', len(entries)))
+    parts.append(lengths.tobytes())
+    parts.append(struct.pack('<Q', len(blob)))
+    parts.append(blob)
+    return b''.join(parts)
+
+
+def _field_text(value) -> str:
+    return '' if value is None else str(value)
+
+
+def decode_vault(payload: bytes) -> dict:
+    """Dekodiert Binär- oder (ältere) JSON-Tresore"""
+    if not payload.startswith(MAGIC):
+        return json.loads(payload.decode('utf-8'))
+    
+    offset = len(MAGIC)
+    version, field_count = struct.unpack_from('<BH', payload, offset)
+    offset += 3
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Unbekannte Tresor-Formatversion: {version}")
+    
+    fields = []
+    for _ in range(field_count):
+        (name_length,) = struct.unpack_from('<B', payload, offset)
+        offset += 1
+        fields.append(payload[offset:offset + name_length].decode('utf-8'))
+        offset += name_length
+    
+    (created_length,) = struct.unpack_from('<H', payload, offset)
+    offset += 2
+    created = payload[offset:offset + created_length].decode('utf-8')
+    offset += created_length
+    
+    (entry_count,) = struct.unpack_from('<I', payload, offset)
+    offset += 4
+    
+    lengths = array('I')
+    table_size = entry_count * field_count * lengths.itemsize
+    lengths.frombytes(payload[offset:offset + table_size])
+    if sys.byteorder == 'big':
+        lengths.byteswap()
+    offset += table_size
+    
+    (blob_length,) = struct.unpack_from('<Q', payload, offset)
+    offset += 8
+    text = payload[offset:offset + blob_length].decode('utf-8')
+    
+    # Längen sind in Zeichen gespeichert, daher reicht ein einziges decode() für alle Werte
+    ends = list(accumulate(lengths))
+    values = [text[start:end] for start, end in zip([0] + ends, ends)]
+    
+    entries = [dict(zip(fields, values[i:i + field_count]))
+               for i in range(0, len(values), field_count)]
+    
+    return {'version': str(version), 'created': created, 'entries': entries}
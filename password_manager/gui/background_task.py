@@ -0,0 +1,92 @@
+import queue
+import threading
+import tkinter as tk
+from typing import Callable, Optional
+
+# Phasen von PasswordManager.unlock_database in Reihenfolge
+UNLOCK_PHASES = ('read', 'kdf', 'decrypt', 'parse', 'index')
+
+PHASE_LABELS = {
+    'read': "Datenbank wird gelesen...",
+    'calibrate': "Schlüsselableitung wird kalibriert...",
+    'kdf': "Schlüssel wird abgeleitet...",
+    'decrypt': "Daten werden entschlüsselt...",
+    'parse': "Einträge werden geladen...",
+    'index': "Index wird aufgebaut...",
+    'encrypt': "Daten werden verschlüsselt...",
+    'save': "Datenbank wird gespeichert...",
+}
+
+
+class BackgroundTask:
+    """Führt eine blockierende Funktion im Worker-Thread aus und meldet Fortschritt/Ergebnis per root.after im Tk-Thread"""
+    
+    def __init__(self, root, work: Callable, on_done: Callable,
+                 on_progress: Optional[Callable[[str], None]] = None,
+                 on_error: Optional[Callable[[Exception], None]] = None, poll_ms: int = 50,
+                 on_cancelled: Optional[Callable[[object], None]] = None):
+        # work(progress, cancel_event) läuft im Worker; alle Callbacks laufen im Tk-Hauptthread
+        self.root = root
+        self.work = work
+        self.on_done = on_done
+        self.on_progress = on_progress
+        self.on_error = on_error
+        # Erhält das Ergebnis einer abgebrochenen Aufgabe, die trotzdem fertig geworden ist
+        self.on_cancelled = on_cancelled
+        self.poll_ms = poll_ms
+        self.cancel_event = threading.Event()
+        self.finished = False
+        
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="BackgroundTask", daemon=True)
+        self._thread.start()
+        self.root.after(self.poll_ms, self._poll)
+    
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+    
+    def cancel(self):
+        self.cancel_event.set()
+    
+    def _run(self):
+        try:
+            result = self.work(self._report_progress, self.cancel_event)
+            self._queue.put(('done', result))
+        except Exception as e:
+            self._queue.put(('error', e))
+    
+    def _report_progress(self, phase: str):
+        self._queue.put(('progress', phase))
+    
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    kind, value = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                
+                if kind == 'progress':
+                    if self.on_progress and not self.cancelled:
+                        self.on_progress(value)
+                    continue
+                
+                self.finished = True
+                if self.cancelled:
+                    # Abgebrochene Aufgaben liefern kein Ergebnis mehr, nur zum Aufräumen
+                    if kind == 'done' and self.on_cancelled:
+                        self.on_cancelled(value)
+                    return
+                if kind == 'done':
+                    self.on_done(value)
+                elif self.on_error:
+                    self.on_error(value)
+                else:
+                    print(f"Fehler in Hintergrundaufgabe: {str(value)}")
+                return
+            
+            self.root.after(self.poll_ms, self._poll)
+        except tk.TclError:
+            # Fenster wurde inzwischen geschlossen
+            pass
@@ -43,6 +43,7 @@ class BackupManager:
                 backup_path = self.backup_dir / f"{db_name}_backup_{timestamp}.bak"
             
             # Kopiere die aktuelle Datenbank-Datei
+            self.pm.checkpoint()
             if os.path.exists(self.pm.database_file):
                 shutil.copy2(self.pm.database_file, backup_path)
                 
@@ -197,6 +198,7 @@ class BackupManager:
         try:
             with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
                 # Datenbank hinzufügen
+                self.pm.checkpoint()
                 if os.path.exists(self.pm.database_file):
                     zipf.write(self.pm.database_file, 'database.enc')
                 
@@ -232,38 +234,39 @@ class BackupManager:
             with open(csv_path, 'r', encoding='utf-8') as csvfile:
                 reader = csv.DictReader(csvfile)
                 
-                for row in reader:
-                    title = row.get('title', '').strip()
-                    if not title:
-                        continue
-                    
-                    # Prüfe auf Konflikte
-                    existing_entry = self.pm.get_entry(title)
-                    if existing_entry and not merge_mode:
-                        conflicts.append({
-                            'title': title,
-                            'action': 'skipped',
-                            'reason': 'Eintrag existiert bereits'
-                        })
-                        continue
-                    
-                    # Importiere Eintrag
-                    success = self.pm.add_entry(
-                        title=title,
-                        username=row.get('username', ''),
-                        password=row.get('password', ''),
-                        url=row.get('url', ''),
-                        notes=row.get('notes', '')
-                    )
-                    
-                    if success:
-                        imported_entries.append(row)
-                    else:
-                        conflicts.append({
-                            'title': title,
-                            'action': 'failed',
-                            'reason': 'Konnte nicht hinzugefügt werden'
-                        })
+                with self.pm.transaction():
+                    for row in reader:
+                        title = row.get('title', '').strip()
+                        if not title:
+                            continue
+                        
+                        # Prüfe auf Konflikte
+                        existing_entry = self.pm.get_entry(title)
+                        if existing_entry and not merge_mode:
+                            conflicts.append({
+                                'title': title,
+                                'action': 'skipped',
+                                'reason': 'Eintrag existiert bereits'
+                            })
+                            continue
+                        
+                        # Importiere Eintrag
+                        success = self.pm.add_entry(
+                            title=title,
+                            username=row.get('username', ''),
+                            password=row.get('password', ''),
+                            url=row.get('url', ''),
+                            notes=row.get('notes', '')
+                        )
+                        
+                        if success:
+                            imported_entries.append(row)
+                        else:
+                            conflicts.append({
+                                'title': title,
+                                'action': 'failed',
+                                'reason': 'Konnte nicht hinzugefügt werden'
+                            })
             
             result_msg = f"CSV-Import: {len(imported_entries)} Einträge importiert"
             if conflicts:
@@ -6,12 +6,16 @@ from gui.modern_styles import (
     create_classic_frame, create_classic_label_frame, 
     create_classic_entry, ClassicSpacing
 )
+from gui.background_task import BackgroundTask, PHASE_LABELS
 
 
 class ChangePasswordDialog:
     def __init__(self, parent, password_manager):
         self.pm = password_manager
         self.result = None
+        self.change_task = None
+        # Eigenes Abbruch-Signal: das Ergebnis der Aufgabe wird auch nach einem Abbruch noch gemeldet
+        self.cancel_event = None
         self.password_visible = [False, False, False]
         
         WindowsClassicStyles.setup_windows_classic_theme()
@@ -34,7 +38,8 @@ class ChangePasswordDialog:
 
         self.create_change_password_ui()
         
-        self.dialog.bind('<Escape>', lambda e: self.dialog.destroy())
+        self.dialog.bind('<Escape>', lambda e: self.cancel())
+        self.dialog.protocol("WM_DELETE_WINDOW", self.cancel)
         
         self.dialog.wait_window()
     
@@ -121,11 +126,11 @@ class ChangePasswordDialog:
         button_frame = create_classic_frame(content_frame, WindowsClassicColors.DIALOG_BG)
         button_frame.pack(fill='x')
         
-        cancel_btn = tk.Button(button_frame, text="Abbrechen",
-                              command=self.dialog.destroy,
-                              bg="#666666", fg="white", font=('Segoe UI', 11, 'normal'),
-                              relief='flat', bd=0, padx=25, pady=12)
-        cancel_btn.pack(side='left')
+        self.cancel_btn = tk.Button(button_frame, text="Abbrechen",
+                                   command=self.cancel,
+                                   bg="#666666", fg="white", font=('Segoe UI', 11, 'normal'),
+                                   relief='flat', bd=0, padx=25, pady=12)
+        self.cancel_btn.pack(side='left')
         
         self.change_btn = tk.Button(button_frame, text="🔐 Passwort ändern",
                                    command=self.change_password,
@@ -144,7 +149,7 @@ class ChangePasswordDialog:
             button.bind('<Enter>', on_enter)
             button.bind('<Leave>', on_leave)
         
-        create_hover_effect(cancel_btn, "#666666", "#555555")
+        create_hover_effect(self.cancel_btn, "#666666", "#555555")
         create_hover_effect(self.change_btn, "#6ba644", "#5a9137")
         
         self.current_password_entry.focus_set()
@@ -402,48 +407,78 @@ class ChangePasswordDialog:
             messagebox.showerror("Fehler", "Das neue Passwort muss sich vom aktuellen unterscheiden!")
             return
         
-        try:
-            temp_pm = type(self.pm)(self.pm.database_file)
-            
-            if not temp_pm.unlock_database(current_password):
-                messagebox.showerror("Fehler", "Das aktuelle Master-Passwort ist falsch!")
-                return
-            
-            from core.encryption import PasswordEncryption
-            import json
-            import os
-            
-            entries_data = []
-            for entry in temp_pm.list_entries():
-                entries_data.append(entry.to_dict())
-            
-            data = {
-                'version': '1.0',
-                'entries': entries_data
-            }
-            
-            new_encryptor = PasswordEncryption()
-            new_encryptor.setup_encryption(new_password)
-            
-            json_string = json.dumps(data, indent=2)
-            encrypted_data = new_encryptor.encrypt_data(json_string)
-            
-            backup_file = self.pm.database_file + '.backup_before_password_change'
-            import shutil
-            shutil.copy2(self.pm.database_file, backup_file)
-            
-            with open(self.pm.database_file, 'wb') as f:
-                f.write(new_encryptor.get_salt())
-                f.write(encrypted_data)
-            
-            self.result = True
-            
-            messagebox.showinfo("Erfolg", 
-                               "Master-Passwort wurde erfolgreich geändert!\n\n"
-                               f"Ein Backup der alten Datei wurde erstellt:\n{backup_file}\n\n"
-                               "Sie müssen sich jetzt mit dem neuen Passwort anmelden.")
-            
+        if self.change_task is not None:
+            return
+        
+        self.change_btn.config(state='disabled', bg="#cccccc")
+        self.dialog.config(cursor='watch')
+        cancel_event = self.cancel_event = threading.Event()
+        self.change_task = BackgroundTask(
+            self.dialog,
+            lambda progress, _: self.pm.change_master_password(current_password, new_password,
+                                                               progress=progress, cancel_event=cancel_event),
+            on_done=self._on_change_done,
+            on_progress=self._on_change_progress,
+            on_error=self._on_change_failed
+        )
+    
+    def _on_change_progress(self, phase):
+        self.change_btn.config(text=f"⏳ {PHASE_LABELS.get(phase, '')}")
+        if phase == 'save':
+            # Ab dem Schreiben der Datei lässt sich der Wechsel nicht mehr abbrechen
+            self.cancel_btn.config(state='disabled', bg="#cccccc")
+    
+    def _on_change_done(self, changed):
+        self.change_task = None
+        self.dialog.config(cursor='')
+        
+        if self.cancel_event.is_set():
+            if changed:
+                # Der Abbruch kam erst nach dem Schreiben der Datei
+                self.result = True
+                messagebox.showinfo("Abgebrochen",
+                                    "Der Abbruch kam zu spät: Das Master-Passwort wurde bereits geändert.\n\n"
+                                    "Sie müssen sich jetzt mit dem neuen Passwort anmelden.")
+            else:
+                messagebox.showinfo("Abgebrochen", "Das Master-Passwort wurde nicht geändert.")
             self.dialog.destroy()
-            
-        except Exception as e:
-            messagebox.showerror("Fehler", f"Konnte Master-Passwort nicht ändern:\n{str(e)}")
\ No newline at end of file
+            return
+        
+        if not changed:
+            self._reset_change_button()
+            messagebox.showerror("Fehler", "Das aktuelle Master-Passwort ist falsch!")
+            return
+        
+        self.result = True
+        
+        messagebox.showinfo("Erfolg", 
+                           "Master-Passwort wurde erfolgreich geändert!\n\n"
+                           "Sie müssen sich jetzt mit dem neuen Passwort anmelden.")
+        
+        self.dialog.destroy()
+    
+    def _on_change_failed(self, error):
+        self.change_task = None
+        self.dialog.config(cursor='')
+        messagebox.showerror("Fehler", f"Konnte Master-Passwort nicht ändern:\n{str(error)}")
+        if self.cancel_event.is_set():
+            self.dialog.destroy()
+            return
+        self.cancel_btn.config(state='normal', bg="#666666")
+        self._reset_change_button()
+    
+    def _reset_change_button(self):
+        self.change_btn.config(text="🔐 Passwort ändern")
+        self._update_button_state(self.new_password_entry.get(), self.confirm_password_entry.get())
+    
+    def cancel(self):
+        if self.change_task is None:
+            self.dialog.destroy()
+            return
+        if self.cancel_btn.cget('state') == 'disabled':
+            # Die Datei wird gerade geschrieben (auch Escape und Schließen warten auf das Ergebnis)
+            return
+        # Der Dialog bleibt offen, bis die Aufgabe meldet, ob der Wechsel noch übernommen wurde
+        self.cancel_event.set()
+        self.cancel_btn.config(state='disabled', bg="#cccccc")
+        self.change_btn.config(text="⏳ Wird abgebrochen...")
\ No newline at end of file
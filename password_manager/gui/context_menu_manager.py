@@ -261,7 +261,7 @@ class ContextMenuManager:
         details = [
             ("📝 Titel:", self.selected_entry.title),
             ("👤 Benutzername:", self.selected_entry.username or "(nicht angegeben)"),
-            ("🔑 Passwort:", "•" * len(self.selected_entry.password) if self.selected_entry.password else "(leer)"),
+            ("🔑 Passwort:", "•" * self.selected_entry.password_length if self.selected_entry.password_length else "(leer)"),
             ("🌐 URL:", self.selected_entry.url or "(nicht angegeben)"),
             ("📅 Erstellt:", self.selected_entry.created[:19].replace('T', ' ') if self.selected_entry.created else "Unbekannt"),
             ("✏️ Geändert:", self.selected_entry.modified[:19].replace('T', ' ') if self.selected_entry.modified else "Unbekannt"),
@@ -4,6 +4,7 @@ import os
 import shutil
 from pathlib import Path
 from gui.modern_styles import WindowsClassicStyles, WindowsClassicColors, create_classic_frame, create_classic_label_frame, create_status_bar, ClassicSpacing
+from gui.background_task import BackgroundTask, PHASE_LABELS
 
 
 class DatabaseSelector:
@@ -11,6 +12,7 @@ class DatabaseSelector:
         self.root = root
         self.on_database_selected = on_database_selected
         self.selected_database = None
+        self.create_task = None
         
         self.databases_dir = Path("data")
         self.databases_dir.mkdir(exist_ok=True)
@@ -397,6 +399,9 @@ class DatabaseSelector:
             messagebox.showinfo("Info", "Klicken Sie auf eine Datenbank-Karte zum Öffnen!")
     
     def create_new_database(self):
+        if self.create_task is not None:
+            return
+        
         db_name = self._ask_string_with_focus("Neue Datenbank", 
                                              "Name für die neue Datenbank:",
                                              initialvalue="Meine_Passwoerter")
@@ -434,19 +439,38 @@ class DatabaseSelector:
             messagebox.showerror("Fehler", "Passwörter stimmen nicht überein!")
             return
         
-        try:
-            from core.password_storage import PasswordManager
-            temp_pm = PasswordManager(str(db_file))
-            temp_pm.create_new_database(password)
-            
+        from core.password_storage import PasswordManager
+        from gui.settings_manager import SettingsManager
+        temp_pm = PasswordManager(str(db_file))
+        # Neue Tresore mit den eingestellten KDF-, Cipher- und Format-Optionen anlegen
+        warning = SettingsManager().apply_vault_settings(temp_pm)
+        if warning:
+            messagebox.showwarning("Hinweis", warning)
+        
+        def on_done(_):
+            self.create_task = None
+            self.root.config(cursor='')
             messagebox.showinfo("Erfolg", f"Datenbank '{db_name}' erfolgreich erstellt!")
             self.refresh_database_list()
             
             self.selected_database = str(db_file)
             self.on_database_selected(str(db_file))
-            
-        except Exception as e:
+        
+        def on_error(e):
+            self.create_task = None
+            self.root.config(cursor='')
+            self.status_label.config(text="Bereit")
             messagebox.showerror("Fehler", f"Datenbank konnte nicht erstellt werden:\n{str(e)}")
+        
+        # Kalibrierung und Schlüsselableitung dauern spürbar, daher im Worker-Thread
+        self.root.config(cursor='watch')
+        self.create_task = BackgroundTask(
+            self.root,
+            lambda progress, cancel_event: temp_pm.create_new_database(password, progress=progress),
+            on_done=on_done,
+            on_progress=lambda phase: self.status_label.config(text=PHASE_LABELS.get(phase, "")),
+            on_error=on_error
+        )
     
     def import_backup(self):
         file_path = filedialog.askopenfilename(
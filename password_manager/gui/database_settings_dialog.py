@@ -402,6 +402,7 @@ class DatabaseSettingsDialog:
         
         if target_path:
             try:
+                self.pm.checkpoint()
                 shutil.copy2(self.pm.database_file, target_path)
                 messagebox.showinfo("Erfolg", f"Datenbank kopiert nach:\n{target_path}")
             except Exception as e:
@@ -419,7 +420,7 @@ class DatabaseSettingsDialog:
                                   f"Datenbank nach '{target_path}' verschieben?\n\n"
                                   "Die Anwendung wird danach beendet."):
                 try:
-                    shutil.move(self.pm.database_file, target_path)
+                    self.pm.move_database(target_path)
                     messagebox.showinfo("Erfolg", f"Datenbank verschoben nach:\n{target_path}\n\nAnwendung wird beendet.")
                     self.dialog.destroy()
                     self.pm.root.quit()
@@ -442,8 +443,7 @@ class DatabaseSettingsDialog:
                 return
             
             try:
-                shutil.move(str(current_path), str(new_path))
-                self.pm.database_file = str(new_path)
+                self.pm.move_database(str(new_path))
                 messagebox.showinfo("Erfolg", f"Datenbank umbenannt zu '{new_name}'")
                 self.load_database_info()
             except Exception as e:
@@ -482,7 +482,7 @@ class DatabaseSettingsDialog:
             
             for entry in entries:
                 if entry.title in seen_titles:
-                    duplicates.append(entry.title)
+                    duplicates.append(entry.id)
                 else:
                     seen_titles.add(entry.title)
             
@@ -491,8 +491,9 @@ class DatabaseSettingsDialog:
                                       f"{len(duplicates)} doppelte Einträge gefunden.\n\n"
                                       "Duplikate entfernen? (Kann nicht rückgängig gemacht werden)"):
                     
-                    for title in duplicates:
-                        self.pm.delete_entry(title)
+                    with self.pm.transaction():
+                        for entry_id in duplicates:
+                            self.pm.delete_by_id(entry_id)
                     
                     messagebox.showinfo("Erfolg", f"{len(duplicates)} doppelte Einträge entfernt.")
                     self.load_database_info()
@@ -508,6 +509,7 @@ class DatabaseSettingsDialog:
                               "Dies erstellt eine bereinigte Version der Datenbank."):
             try:
                 self.pm.save_database()
+                self.pm.flush()
                 messagebox.showinfo("Erfolg", "Datenbank wurde komprimiert und optimiert.")
                 self.load_database_info()
             except Exception as e:
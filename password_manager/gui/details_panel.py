@@ -216,19 +216,24 @@ class DetailsPanel:
             self.general_widgets['password']['label'].config(text="••••••••")
             self.general_widgets['password']['toggle'].config(text="👁️")
         
+        self._update_totp_label(entry)
+        
+        self.open_url_btn.config(state='normal' if entry.url.strip() else 'disabled')
+    
+    def _update_totp_label(self, entry):
         if entry.has_totp():
             if hasattr(self.main_window, 'totp_manager'):
-                current_code, remaining_time = self.main_window.totp_manager.get_current_totp(entry.totp_secret)
+                current_code, remaining_time = self.main_window.totp_manager.get_current_totp(entry.totp_secret,
+                                                                                              entry.otp_params)
                 if current_code:
-                    self.general_widgets['totp']['label'].config(text=f"{current_code} ({remaining_time}s)")
+                    validity = f"{remaining_time}s" if remaining_time is not None else "HOTP"
+                    self.general_widgets['totp']['label'].config(text=f"{current_code} ({validity})")
                 else:
                     self.general_widgets['totp']['label'].config(text="Error generating code")
             else:
                 self.general_widgets['totp']['label'].config(text="Enabled")
         else:
             self.general_widgets['totp']['label'].config(text="Disabled")
-        
-        self.open_url_btn.config(state='normal' if entry.url.strip() else 'disabled')
     
     def _update_security_tab(self, entry):
         if hasattr(self.main_window, 'password_generator'):
@@ -327,7 +332,7 @@ class DetailsPanel:
             value = self.current_entry.password
         elif field_name == "totp":
             if self.current_entry.has_totp() and hasattr(self.main_window, 'totp_manager'):
-                current_code, _ = self.main_window.totp_manager.get_current_totp(self.current_entry.totp_secret)
+                current_code, _ = self.main_window.take_otp_code(self.current_entry)
                 value = current_code or ""
         
         if value:
@@ -410,5 +415,11 @@ class DetailsPanel:
                 self.panel_frame.pack_forget()
     
     def refresh_totp_codes(self):
-        if self.current_entry and self.current_entry.has_totp():
-            self._update_general_tab(self.current_entry)
\ No newline at end of file
+        """Aktualisiert nur die 2FA-Zeile; liefert ms bis zur nächsten Änderung oder None"""
+        if not (self.current_entry and self.current_entry.has_totp()):
+            return None
+        
+        self._update_totp_label(self.current_entry)
+        if not hasattr(self.main_window, 'totp_manager'):
+            return None
+        return self.main_window.totp_manager.next_refresh_ms([self.current_entry.otp_params])
\ No newline at end of file
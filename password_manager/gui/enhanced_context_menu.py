@@ -173,11 +173,11 @@ class EnhancedContextMenu:
     def _copy_totp_code(self):
         if self.selected_entry and self.selected_entry.has_totp():
             if hasattr(self.main_window, 'totp_manager'):
-                current_code, remaining_time = self.main_window.totp_manager.get_current_totp(
-                    self.selected_entry.totp_secret)
+                current_code, remaining_time = self.main_window.take_otp_code(self.selected_entry)
                 if current_code:
                     pyperclip.copy(current_code)
-                    self._update_status(f"2FA code copied ({remaining_time}s remaining)", "info")
+                    validity = f"{remaining_time}s remaining" if remaining_time is not None else "counter advanced"
+                    self._update_status(f"2FA code copied ({validity})", "info")
                 else:
                     self._update_status("Could not generate 2FA code", "error")
     
@@ -220,14 +220,20 @@ class EnhancedContextMenu:
                 "Duplicate Entry",
                 self.selected_entry,
                 self.main_window.password_generator,
-                self.main_window.category_manager
+                self.main_window.category_manager,
+                totp_manager=self.main_window.totp_manager
             )
             
             if dialog.result:
                 original_title = dialog.result['title']
                 dialog.result['title'] = f"{original_title} (Copy)"
                 
-                success = self.main_window.pm.add_entry(**dialog.result)
+                try:
+                    success = self.main_window.pm.add_entry(**dialog.result)
+                except Exception as e:
+                    self.main_window.refresh_password_list()
+                    self.main_window.show_save_error(e)
+                    return
                 if success:
                     if hasattr(self.main_window, 'refresh_password_list'):
                         self.main_window.refresh_password_list()
@@ -392,8 +398,12 @@ class EnhancedContextMenu:
     
     def _change_category(self, new_category):
         if self.selected_entry and self.selected_entry.category != new_category:
-            self.selected_entry.category = new_category
-            self.main_window.pm.save_database()
+            try:
+                self.main_window.pm.update_entry(self.selected_entry, category=new_category)
+            except Exception as e:
+                self.main_window.refresh_password_list()
+                self.main_window.show_save_error(e)
+                return
             
             if hasattr(self.main_window, 'refresh_password_list'):
                 self.main_window.refresh_password_list()
@@ -13,6 +13,9 @@ class EnhancedSearchManager:
             'url': True,
             'notes': True
         }
+        # Gefaltete Felder je Eintrag, nur solange eine Suche aktiv ist:
+        # Eintrag -> [modified_ts, Titel, Benutzer, URL, Notizen oder None bis zur ersten Notizsuche]
+        self._fold_cache = {}
         
     def perform_search(self, search_term):
         self.current_search_term = search_term.strip()
@@ -32,35 +35,44 @@ class EnhancedSearchManager:
         if not self.all_entries:
             return []
         
-        search_term_lower = search_term.lower()
+        search_term_lower = search_term.casefold()
+        title, username, url, notes = (self.search_filters.get(name, True)
+                                       for name in ('title', 'username', 'url', 'notes'))
         filtered_entries = []
+        cached_fields = self._fold_cache.get
         
         for entry in self.all_entries:
-            if self._entry_matches_search(entry, search_term_lower):
+            # Die Einträge halten keine gefalteten Felder: einmal je Suche falten, nicht bei jedem
+            # Tastendruck; jede Änderung setzt modified_ts neu
+            folded = cached_fields(entry)
+            if folded is None or folded[0] != entry.modified_ts:
+                folded = self._fold_entry(entry)
+            if ((title and search_term_lower in folded[1])
+                    or (username and search_term_lower in folded[2])
+                    or (url and search_term_lower in folded[3])
+                    or (notes and search_term_lower in (folded[4] if folded[4] is not None
+                                                        else self._fold_notes(entry, folded)))):
                 filtered_entries.append(entry)
         
         return filtered_entries
     
-    def _entry_matches_search(self, entry, search_term_lower):
-        if self.search_filters.get('title', True):
-            if search_term_lower in entry.title.lower():
-                return True
-        
-        if self.search_filters.get('username', True):
-            if search_term_lower in entry.username.lower():
-                return True
-        
-        if self.search_filters.get('url', True):
-            if search_term_lower in entry.url.lower():
-                return True
-        
-        if self.search_filters.get('notes', True):
-            if search_term_lower in entry.notes.lower():
-                return True
-        
-        return False
+    def _fold_entry(self, entry):
+        folded = [entry.modified_ts, entry.title_folded, entry.username_folded, entry.url_folded, None]
+        self._fold_cache[entry] = folded
+        return folded
+    
+    @staticmethod
+    def _fold_notes(entry, folded):
+        # Notizen erst bei der ersten Notizsuche entschlüsseln
+        folded[4] = entry.notes_folded if entry.has_notes() else ''
+        return folded[4]
+    
+    def clear_cache(self):
+        self._fold_cache = {}
     
     def show_all_entries(self):
+        # Ohne aktive Suche werden die Klartext-Notizen nicht mehr gebraucht
+        self.clear_cache()
         if hasattr(self.main_window, 'table_manager'):
             self.main_window.table_manager.update_table(self.all_entries)
         
@@ -120,16 +132,16 @@ class EnhancedSearchManager:
             return []
         
         suggestions = set()
-        partial_lower = partial_term.lower()
+        partial_lower = partial_term.casefold()
         
         for entry in self.all_entries:
-            title_words = entry.title.lower().split()
+            title_words = entry.title_folded.split()
             for word in title_words:
                 if word.startswith(partial_lower) and len(word) > len(partial_term):
                     suggestions.add(word)
             
-            if entry.username and entry.username.lower().startswith(partial_lower):
-                suggestions.add(entry.username.lower())
+            if entry.username and entry.username_folded.startswith(partial_lower):
+                suggestions.add(entry.username_folded)
         
         return sorted(list(suggestions))[:5]
     
@@ -126,7 +126,8 @@ class KeyboardShortcutManager:
                     "Duplicate Entry",
                     entry,
                     self.main_window.password_generator,
-                    getattr(self.main_window, 'category_manager', None)
+                    getattr(self.main_window, 'category_manager', None),
+                    totp_manager=getattr(self.main_window, 'totp_manager', None)
                 )
         
                 if hasattr(self.main_window, 'auto_lock_timer') and self.main_window.auto_lock_timer:
@@ -136,7 +137,12 @@ class KeyboardShortcutManager:
                     original_title = dialog.result['title']
                     dialog.result['title'] = f"{original_title} (Copy)"
                 
-                    success = self.main_window.pm.add_entry(**dialog.result)
+                    try:
+                        success = self.main_window.pm.add_entry(**dialog.result)
+                    except Exception as e:
+                        self.main_window.refresh_password_list()
+                        self.main_window.show_save_error(e)
+                        return
                     if success:
                         if hasattr(self.main_window, 'refresh_password_list'):
                             self.main_window.refresh_password_list()
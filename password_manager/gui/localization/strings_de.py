@@ -123,6 +123,12 @@ STRINGS = {
     "status_entry_updated": "Eintrag aktualisiert",
     "status_entry_deleted": "Eintrag gelöscht",
     "status_database_saved": "Datenbank gespeichert",
+    "status_save_pending": "Änderungen werden gespeichert...",
+    "status_save_failed": "Speichern fehlgeschlagen",
+    "error_lock_save_failed": "Die Datenbank konnte vor dem Sperren nicht gespeichert werden und bleibt entsperrt.",
+    "warning_records_cipher": "Das Record-Format unterstützt nur AES-256-GCM. Für die eingestellte Verschlüsselung wird das Block-Format verwendet.",
+    "warning_storage_problems": "Beim Speichern der Datenbank ist ein Problem aufgetreten:",
+    "error_save_failed": "Die Änderung konnte nicht gespeichert werden. Sie bleibt bis zum nächsten erfolgreichen Speichern nur im Arbeitsspeicher.",
     "status_search_cleared": "Suche gelöscht",
     "status_auto_backup": "Auto-Backup erstellt",
     "status_will_clear_in": "wird gelöscht in",
@@ -155,6 +161,7 @@ STRINGS = {
     "confirm_logout": "Wirklich abmelden?",
     "confirm_switch_database": "Datenbank wechseln? Aktuelle Sitzung wird beendet.",
     "confirm_exit_application": "Anwendung wirklich beenden?",
+    "confirm_quit_unsaved": "Die letzten Änderungen konnten nicht gespeichert werden.\nTrotzdem beenden? Nicht gespeicherte Änderungen gehen verloren.",
     "confirm_overwrite_database": "Datenbank existiert bereits.\nTrotzdem überschreiben?",
     "confirm_delete_database": "Datenbank wirklich löschen",
     "confirm_import_backup": "Daten importieren aus",
@@ -199,6 +206,7 @@ STRINGS = {
     "settings_auto_lock_enable": "Auto-Lock aktivieren",
     "settings_timeout_minutes": "Timeout (Minuten):",
     "settings_warning_seconds": "Warnung (Sekunden):",
+    "settings_soft_lock_enable": "Schnelles Entsperren (verschlüsseltes Abbild im Speicher behalten)",
     "settings_clipboard": "📋 Zwischenablage",
     "settings_clipboard_enable": "Automatisches Löschen aktivieren",
     "settings_clear_after_seconds": "Löschen nach (Sekunden):",
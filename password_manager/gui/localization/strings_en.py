@@ -123,6 +123,12 @@ STRINGS = {
     "status_entry_updated": "Entry updated",
     "status_entry_deleted": "Entry deleted",
     "status_database_saved": "Database saved",
+    "status_save_pending": "Saving changes...",
+    "status_save_failed": "Saving failed",
+    "error_lock_save_failed": "The database could not be saved before locking and stays unlocked.",
+    "warning_records_cipher": "The record layout only supports AES-256-GCM. The blob layout is used for the configured cipher.",
+    "warning_storage_problems": "A problem occurred while saving the database:",
+    "error_save_failed": "The change could not be saved. It is only kept in memory until the next successful save.",
     "status_search_cleared": "Search cleared",
     "status_auto_backup": "Auto-backup created",
     "status_will_clear_in": "will clear in",
@@ -155,6 +161,7 @@ STRINGS = {
     "confirm_logout": "Really logout?",
     "confirm_switch_database": "Switch database? Current session will be ended.",
     "confirm_exit_application": "Really exit application?",
+    "confirm_quit_unsaved": "The latest changes could not be saved.\nQuit anyway? Unsaved changes will be lost.",
     "confirm_overwrite_database": "Database already exists.\nOverwrite anyway?",
     "confirm_delete_database": "Really delete database",
     "confirm_import_backup": "Import data from",
@@ -199,6 +206,7 @@ STRINGS = {
     "settings_auto_lock_enable": "Enable auto lock",
     "settings_timeout_minutes": "Timeout (minutes):",
     "settings_warning_seconds": "Warning (seconds):",
+    "settings_soft_lock_enable": "Fast re-unlock (keep encrypted image in memory)",
     "settings_clipboard": "📋 Clipboard",
     "settings_clipboard_enable": "Enable automatic clearing",
     "settings_clear_after_seconds": "Clear after (seconds):",
@@ -4,6 +4,9 @@ from gui.modern_styles import (
     WindowsClassicStyles, WindowsClassicColors, create_classic_entry,
     create_classic_frame, ClassicSpacing
 )
+from gui.background_task import BackgroundTask, PHASE_LABELS, UNLOCK_PHASES
+
+INFO_TEXT = "Gib das Master-Passwort für diese Datenbank ein"
 
 
 class LoginWindow:
@@ -14,10 +17,13 @@ class LoginWindow:
         self.database_path = database_path
         self.master_pw_entry = None
         self.login_btn = None
+        self.info_label = None
+        self.progress_bar = None
+        self.unlock_task = None
         self.password_visible = False
 
-        if database_path:
-            self.pm.database_file = database_path
+        if database_path and database_path != self.pm.database_file:
+            self.pm.set_database_file(database_path)
 
         WindowsClassicStyles.setup_windows_classic_theme()
         self.setup_login_screen()
@@ -156,11 +162,15 @@ class LoginWindow:
         info_frame = create_classic_frame(content_frame)
         info_frame.pack(side='bottom', pady=(20, 0))
         
-        info_label = tk.Label(info_frame, text="Gib das Master-Passwort für diese Datenbank ein",
-                              bg=WindowsClassicColors.WINDOW_BG,
-                              fg=WindowsClassicColors.TEXT_SECONDARY,
-                              font=('Segoe UI', 9, 'italic'))
-        info_label.pack()
+        self.info_label = tk.Label(info_frame, text=INFO_TEXT,
+                                   bg=WindowsClassicColors.WINDOW_BG,
+                                   fg=WindowsClassicColors.TEXT_SECONDARY,
+                                   font=('Segoe UI', 9, 'italic'))
+        self.info_label.pack()
+        
+        # Fortschrittsbalken wird erst während des Entsperrens eingeblendet
+        self.progress_bar = ttk.Progressbar(info_frame, mode='determinate',
+                                            maximum=len(UNLOCK_PHASES), length=300)
 
         self.master_pw_entry.focus()
     
@@ -175,6 +185,9 @@ class LoginWindow:
             self.password_visible = True
 
     def on_key_release(self, event=None):
+        if self.unlock_task is not None:
+            return
+        
         pw = self.master_pw_entry.get()
         if pw.strip():
             self.login_btn.configure(state='normal', bg="#6ba644")
@@ -182,18 +195,110 @@ class LoginWindow:
             self.login_btn.configure(state='disabled', bg="#cccccc")
 
     def login(self):
+        if self.unlock_task is not None:
+            return
+        
         master_password = self.master_pw_entry.get()
 
         if not master_password:
             messagebox.showerror("Fehler", "Bitte Master-Passwort eingeben!")
             return
 
-        if self.pm.unlock_database(master_password):
+        self.start_unlock(master_password)
+
+    def start_unlock(self, master_password, salvage=False):
+        # KDF und Entschlüsselung laufen im Worker, damit das Fenster bedienbar bleibt
+        self.set_unlocking(True)
+        self.unlock_task = BackgroundTask(
+            self.root,
+            lambda progress, cancel_event: self.pm.unlock_database(master_password, progress, cancel_event, salvage),
+            on_done=lambda success: self.on_unlock_done(success, master_password, salvage),
+            on_progress=self.on_unlock_progress,
+            on_error=lambda e: self.on_unlock_done(False, master_password, salvage),
+            on_cancelled=self.on_unlock_discarded
+        )
+
+    def on_unlock_progress(self, phase):
+        if phase in UNLOCK_PHASES:
+            self.progress_bar['value'] = UNLOCK_PHASES.index(phase)
+        self.info_label.config(text=PHASE_LABELS.get(phase, INFO_TEXT))
+
+    def on_unlock_done(self, success, master_password, salvage=False):
+        self.unlock_task = None
+        
+        if success:
+            report = self.pm.salvage_report
+            if report is not None:
+                messagebox.showwarning("Wiederherstellung",
+                                       f"{report['recovered']} Einträge wiederhergestellt.\n"
+                                       f"Ohne Passwort übernommen: {report['missing_secrets']}\n"
+                                       f"Verloren: {report['lost']}\n\n"
+                                       f"Die beschädigte Datei wurde aufbewahrt:\n"
+                                       f"{self.pm.database_file}{self.pm.DAMAGED_SUFFIX}")
+            if self.pm.recovery_actions:
+                messagebox.showinfo("Wiederherstellung",
+                                    "Ein abgebrochener Speichervorgang wurde bereinigt:\n\n" +
+                                    "\n".join(self.pm.recovery_actions))
             self.on_login_success()
-        else:
-            messagebox.showerror("Fehler", "Falsches Master-Passwort oder keine Datenbank gefunden!")
-            self.master_pw_entry.delete(0, tk.END)
+            return
+        
+        self.set_unlocking(False)
+        if self.pm.is_unlocked:
+            # Ein zuvor abgebrochener Versuch hat den Tresor noch entsperrt
+            self.pm.lock_database()
+        
+        if self.pm.last_unlock_error == 'corrupt' and not salvage:
+            # Passwort stimmt, aber der Inhalt ist beschädigt: intakte Records retten,
+            # das Block-Format lässt sich nur als Ganzes entschlüsseln
+            if not self.pm.supports_salvage():
+                messagebox.showerror("Datenbank beschädigt",
+                                     "Die Datenbank ist beschädigt und kann nicht gelesen werden.\n\n"
+                                     "Bitte eine Sicherung wiederherstellen.")
+            elif messagebox.askyesno("Datenbank beschädigt",
+                                     "Die Datenbank ist beschädigt und konnte nicht vollständig gelesen werden.\n\n"
+                                     "Sollen alle intakten Einträge wiederhergestellt werden?"):
+                self.start_unlock(master_password, salvage=True)
+            return
+        
+        if self.pm.recovery_actions:
+            # z.B. eine unvollständige Temp-Datei, die nicht übernommen wurde
+            messagebox.showwarning("Wiederherstellung",
+                                   "Ein abgebrochener Speichervorgang wurde gefunden:\n\n" +
+                                   "\n".join(self.pm.recovery_actions))
+        
+        messagebox.showerror("Fehler", "Falsches Master-Passwort oder keine Datenbank gefunden!")
+        self.master_pw_entry.delete(0, tk.END)
+        self.login_btn.configure(state='disabled', bg="#cccccc")
+
+    def on_unlock_discarded(self, success):
+        # Der Abbruch kam erst nach der Übernahme des Zustands: Tresor wieder sperren,
+        # sofern nicht schon ein neuer Versuch läuft (dessen Ergebnis entscheidet dann)
+        if success is True and self.unlock_task is None and self.pm.is_unlocked:
+            self.pm.lock_database()
+
+    def cancel_unlock(self):
+        if self.unlock_task is not None:
+            # Die laufende Schlüsselableitung endet im Hintergrund, ihr Ergebnis wird verworfen
+            self.unlock_task.cancel()
+            self.unlock_task = None
+        self.set_unlocking(False)
+
+    def set_unlocking(self, active):
+        if active:
+            self.master_pw_entry.config(state='disabled')
             self.login_btn.configure(state='disabled', bg="#cccccc")
+            self.back_btn.config(text="✖ Abbrechen", command=self.cancel_unlock)
+            self.progress_bar['value'] = 0
+            self.progress_bar.pack(pady=(5, 0))
+            self.root.config(cursor='watch')
+        else:
+            self.master_pw_entry.config(state='normal')
+            self.back_btn.config(text="⬅️ Zurück", command=self.go_back)
+            self.progress_bar.pack_forget()
+            self.info_label.config(text=INFO_TEXT)
+            self.root.config(cursor='')
+            self.on_key_release()
+            self.master_pw_entry.focus()
 
     def go_back(self):
         from gui.database_selector import DatabaseSelector
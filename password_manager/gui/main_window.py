@@ -2,10 +2,11 @@ import tkinter as tk
 from tkinter import messagebox
 import pyperclip
 import threading
+from datetime import datetime
 
 from core.password_storage import PasswordManager
 from core.password_generator import PasswordGenerator
-from core.totp_manager import TOTPManager
+from core.totp_manager import TOTPManager, TOTP_IDLE_REFRESH_MS
 
 from gui.login_window import LoginWindow
 from gui.password_dialog import PasswordDialog
@@ -40,17 +41,21 @@ class PasswordManagerGUI:
         self.root.title(_("app_title"))
         self.root.configure(bg=ModernColors.WINDOW_BG)
         
+        self.settings_manager = SettingsManager()
+        
         self.pm = PasswordManager()
+        self._apply_persistence_settings()
         self.password_generator = PasswordGenerator()
         self.totp_manager = TOTPManager()
         self.current_database_path = None
         
-        self.settings_manager = SettingsManager()
         self.backup_manager = BackupManager(self.pm, self.settings_manager)
         self.security_dashboard = None
         
         self.clipboard_timer = None
         self.totp_timer = None
+        self.save_status_timer = None
+        self.last_save_status = None
         self.status_label = None
         
         self.toolbar_manager = ToolbarManager(self)
@@ -101,7 +106,7 @@ class PasswordManagerGUI:
     
     def on_database_selected(self, database_path):
         self.current_database_path = database_path
-        self.pm.database_file = database_path
+        self.pm.set_database_file(database_path)
         self.show_login_screen()
     
     def show_login_screen(self):
@@ -118,13 +123,82 @@ class PasswordManagerGUI:
         if hasattr(self, 'auto_lock_timer'):
             self.auto_lock_timer.start()
         self._start_totp_timer()
+        self._update_save_status()
+    
+    def _apply_persistence_settings(self):
+        warning = self.settings_manager.apply_vault_settings(self.pm)
+        if warning:
+            messagebox.showwarning(_("error_warning"), warning)
+        
+        if self.settings_manager.get("background_save_enabled", False):
+            delay_ms = self.settings_manager.get("background_save_delay_ms", 500)
+            self.pm.enable_background_save(delay_ms / 1000)
+        else:
+            self.pm.disable_background_save()
+    
+    def _update_save_status(self):
+        if not self.pm.is_unlocked or not self.pm.save_worker:
+            self.save_status_timer = None
+            return
+        
+        status = self.pm.get_save_status()
+        if status['error']:
+            current = ('error', None)
+        elif status['pending']:
+            current = ('pending', None)
+        else:
+            current = ('saved', status['last_saved'])
+        
+        if current != self.last_save_status and self.status_label:
+            if current[0] == 'error':
+                update_status_bar(self.status_label, f"❌ {_('status_save_failed')}: {status['error']}", "error")
+            elif current[0] == 'pending':
+                update_status_bar(self.status_label, f"💾 {_('status_save_pending')}", "info")
+            elif current[1]:
+                saved_at = datetime.fromtimestamp(current[1]).strftime("%H:%M:%S")
+                update_status_bar(self.status_label, f"💾 {_('status_database_saved')} ({saved_at})", "success")
+        
+        self.last_save_status = current
+        self.save_status_timer = self.root.after(500, self._update_save_status)
+    
+    def show_save_error(self, error):
+        """Meldet ein fehlgeschlagenes Speichern nach einer Änderung (die Änderung bleibt im Speicher)"""
+        if self.status_label:
+            update_status_bar(self.status_label, f"❌ {_('status_save_failed')}: {str(error)}", "error")
+        messagebox.showerror(_("error_title"), f"{_('error_save_failed')}\n\n{str(error)}")
+    
+    def show_storage_warnings(self):
+        """Zeigt Speicherprobleme, die der PasswordManager ohne Exception aufgefangen hat"""
+        warnings = self.pm.take_storage_warnings()
+        if not warnings:
+            return
+        if self.status_label:
+            update_status_bar(self.status_label, f"⚠️ {warnings[-1]}", "warning")
+        messagebox.showwarning(_("error_warning"), _("warning_storage_problems") + "\n\n" + "\n".join(warnings))
+    
+    def _lock_vault(self, soft=False):
+        """Sperrt den Tresor; schlägt das abschließende Speichern fehl, bleibt er entsperrt und es gibt False"""
+        try:
+            self.pm.lock_database(soft=soft)
+            self.show_storage_warnings()
+            return True
+        except Exception as e:
+            if self.status_label:
+                update_status_bar(self.status_label, f"❌ {_('status_save_failed')}: {str(e)}", "error")
+            messagebox.showerror(_("error_title"), f"{_('error_lock_save_failed')}\n\n{str(e)}")
+            return False
     
     def _handle_auto_lock(self):
-        self.pm.lock_database()
+        if not self._lock_vault(soft=self.settings_manager.get("soft_lock_enabled", False)):
+            # Entsperrt weiterarbeiten, die automatische Sperre beginnt von vorn
+            self.auto_lock_timer.start()
+            return
         if self.clipboard_timer:
             self.clipboard_timer.cancel()
         if self.totp_timer:
             self.root.after_cancel(self.totp_timer)
+        self.totp_manager.clear_cache()
+        self.search_manager.clear_cache()
         pyperclip.copy("")
         self.show_login_screen()
         messagebox.showinfo("🔒 Auto-Lock", _("info_auto_lock"))
@@ -205,6 +279,8 @@ class PasswordManagerGUI:
         elif len(selection) == 1:
             entry = self.get_selected_entry()
             self.details_panel.update_entry(entry)
+            if entry is not None and entry.has_totp():
+                self.schedule_totp_refresh()
         else:
             self.details_panel.show_multiple_selection(len(selection))
     
@@ -218,17 +294,44 @@ class PasswordManagerGUI:
     def _start_totp_timer(self):
         self._update_totp_codes()
     
+    def schedule_totp_refresh(self, delay_ms=0):
+        """Plant den nächsten 2FA-Refresh neu, z.B. wenn neue Codes sichtbar werden"""
+        if self.totp_timer:
+            self.root.after_cancel(self.totp_timer)
+        self.totp_timer = self.root.after(delay_ms, self._update_totp_codes)
+    
     def _update_totp_codes(self):
+        self.totp_timer = None
         if not self.pm.is_unlocked:
             return
         
+        # Jede Anzeige meldet, wann sich ihr Inhalt das nächste Mal ändert (Countdown bzw. Periodenwechsel);
+        # reine HOTP-Ansichten oder Ansichten ohne 2FA brauchen kein sekündliches Polling
+        delays = []
         if hasattr(self.table_manager, 'refresh_totp_codes'):
-            self.table_manager.refresh_totp_codes()
+            delays.append(self.table_manager.refresh_totp_codes())
         
         if hasattr(self.details_panel, 'refresh_totp_codes'):
-            self.details_panel.refresh_totp_codes()
+            delays.append(self.details_panel.refresh_totp_codes())
+        
+        self.pm.secrets.purge_expired()
         
-        self.totp_timer = self.root.after(1000, self._update_totp_codes)
+        delay = min((d for d in delays if d is not None), default=TOTP_IDLE_REFRESH_MS)
+        self.totp_timer = self.root.after(delay, self._update_totp_codes)
+    
+    def take_otp_code(self, entry):
+        """Code zum Kopieren; bei HOTP zählt der Zähler weiter und die Anzeige wird aktualisiert.
+        
+        Lässt sich der weitergezählte Zähler nicht speichern, gibt es keinen Code (None, None).
+        """
+        try:
+            current_code, remaining_time = self.totp_manager.take_code(entry, self.pm)
+        except Exception as e:
+            self.show_save_error(e)
+            return None, None
+        if current_code and remaining_time is None:
+            self.schedule_totp_refresh()
+        return current_code, remaining_time
     
     def refresh_password_list(self):
         current_category = self.category_manager.get_current_category()
@@ -255,6 +358,7 @@ class PasswordManagerGUI:
             self.security_dashboard.refresh_metrics()
         
         self.details_panel.show_empty_state()
+        self.show_storage_warnings()
     
     def perform_search(self, search_term):
         current_category = self.category_manager.get_current_category()
@@ -284,7 +388,8 @@ class PasswordManagerGUI:
         
         dialog = PasswordDialog(self.root, _("dialog_add_password"), 
                                password_generator=self.password_generator,
-                               category_manager=self.category_manager)
+                               category_manager=self.category_manager,
+                               totp_manager=self.totp_manager)
         
         if dialog.result:
             dialog.result['category'] = dialog.result.get('category', default_category)
@@ -293,7 +398,12 @@ class PasswordManagerGUI:
             self.auto_lock_timer.register_dialog(dialog.dialog)
         
         if dialog.result:
-            success = self.pm.add_entry(**dialog.result)
+            try:
+                success = self.pm.add_entry(**dialog.result)
+            except Exception as e:
+                self.refresh_password_list()
+                self.show_save_error(e)
+                return
             if success:
                 self.refresh_password_list()
                 self.create_auto_backup()
@@ -313,14 +423,24 @@ class PasswordManagerGUI:
         
         dialog = PasswordDialog(self.root, _("dialog_edit_password"), entry, 
                                password_generator=self.password_generator,
-                               category_manager=self.category_manager)
+                               category_manager=self.category_manager,
+                               totp_manager=self.totp_manager)
         
         if hasattr(self.auto_lock_timer, 'register_dialog'):
             self.auto_lock_timer.register_dialog(dialog.dialog)
         
         if dialog.result:
-            entry.update(**dialog.result)
-            self.pm.save_database()
+            try:
+                updated = self.pm.update_entry(entry, **dialog.result)
+            except Exception as e:
+                self.refresh_password_list()
+                self.show_save_error(e)
+                return
+            if not updated:
+                messagebox.showerror(_("error_title"), 
+                                   f"{_('error_title_exists')}")
+                return
+            
             self.refresh_password_list()
             self.create_auto_backup()
             
@@ -336,7 +456,13 @@ class PasswordManagerGUI:
         
         if messagebox.askyesno(_("confirm_delete_entry"), 
                               f"{_('confirm_delete_entry')} '{entry.title}'?\n\n{_('confirm_cannot_be_undone')}"):
-            if self.pm.delete_entry(entry.title):
+            try:
+                deleted = self.pm.delete_by_id(entry.id)
+            except Exception as e:
+                self.refresh_password_list()
+                self.show_save_error(e)
+                return
+            if deleted:
                 self.refresh_password_list()
                 self.create_auto_backup()
                 
@@ -412,6 +538,10 @@ class PasswordManagerGUI:
             self.auto_lock_timer.register_dialog(settings_dialog.dialog)
     
     def on_settings_changed(self):
+        self._apply_persistence_settings()
+        if self.pm.save_worker and not self.save_status_timer:
+            self._update_save_status()
+        
         if hasattr(self, 'auto_lock_timer'):
             was_running = self.auto_lock_timer.is_running
             self.auto_lock_timer.stop()
@@ -440,21 +570,27 @@ class PasswordManagerGUI:
                 update_status_bar(self.status_label, _("settings_saved"), "success")
     
     def switch_database(self):
-        self.pm.lock_database()
+        if not self._lock_vault():
+            return
         if self.clipboard_timer:
             self.clipboard_timer.cancel()
         if self.totp_timer:
             self.root.after_cancel(self.totp_timer)
+        self.totp_manager.clear_cache()
+        self.search_manager.clear_cache()
         pyperclip.copy("")
         self.show_database_selector()
     
     def logout(self):
         current_db = self.pm.database_file
-        self.pm.lock_database()
+        if not self._lock_vault(soft=self.settings_manager.get("soft_lock_enabled", False)):
+            return
         if self.clipboard_timer:
             self.clipboard_timer.cancel()
         if self.totp_timer:
             self.root.after_cancel(self.totp_timer)
+        self.totp_manager.clear_cache()
+        self.search_manager.clear_cache()
         pyperclip.copy("")
         
         if current_db:
@@ -465,6 +601,13 @@ class PasswordManagerGUI:
             self.show_database_selector()
     
     def on_closing(self):
+        try:
+            self.pm.lock_database()
+        except Exception as e:
+            # Letztes Speichern fehlgeschlagen: nur auf ausdrücklichen Wunsch ohne Speichern beenden
+            if not messagebox.askyesno(_("error_title"), f"{_('confirm_quit_unsaved')}\n\n{str(e)}", icon='warning'):
+                return
+        
         if hasattr(self, 'auto_lock_timer'):
             self.auto_lock_timer.stop()
         
@@ -473,9 +616,14 @@ class PasswordManagerGUI:
         if self.totp_timer:
             self.root.after_cancel(self.totp_timer)
         
+        if self.save_status_timer:
+            self.root.after_cancel(self.save_status_timer)
+        
         if hasattr(self, 'security_dashboard') and self.security_dashboard:
             self.security_dashboard.destroy()
         
+        self.pm.disable_background_save()
+        
         pyperclip.copy("")
         self.root.destroy()
     
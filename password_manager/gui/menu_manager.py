@@ -127,7 +127,13 @@ class MenuManager:
     
     def _save_database(self):
         if hasattr(self.main_window, 'pm') and self.main_window.pm.is_unlocked:
-            self.main_window.pm.save_database()
+            try:
+                self.main_window.pm.save_database()
+                # Mit Hintergrund-Speichern erst nach dem Schreiben als gespeichert melden
+                self.main_window.pm.flush()
+            except Exception as e:
+                self.main_window.show_save_error(e)
+                return
             if hasattr(self.main_window, 'status_label') and self.main_window.status_label:
                 from gui.modern_styles import update_status_bar
                 update_status_bar(self.main_window.status_label, "Database saved", "success")
@@ -145,6 +151,7 @@ class MenuManager:
         if file_path:
             import shutil
             try:
+                self.main_window.pm.checkpoint()
                 shutil.copy2(self.main_window.pm.database_file, file_path)
                 messagebox.showinfo("Success", f"Database saved as:\n{file_path}")
             except Exception as e:
@@ -221,7 +228,8 @@ class MenuManager:
             "Duplicate Entry",
             entry,
             self.main_window.password_generator,
-            getattr(self.main_window, 'category_manager', None)
+            getattr(self.main_window, 'category_manager', None),
+            totp_manager=getattr(self.main_window, 'totp_manager', None)
         )
     
         if hasattr(self.main_window, 'auto_lock_timer') and self.main_window.auto_lock_timer:
@@ -231,7 +239,12 @@ class MenuManager:
             original_title = dialog.result['title']
             dialog.result['title'] = f"{original_title} (Copy)"
         
-            success = self.main_window.pm.add_entry(**dialog.result)
+            try:
+                success = self.main_window.pm.add_entry(**dialog.result)
+            except Exception as e:
+                self.main_window.refresh_password_list()
+                self.main_window.show_save_error(e)
+                return
             if success:
                 if hasattr(self.main_window, 'refresh_password_list'):
                     self.main_window.refresh_password_list()
@@ -279,14 +292,15 @@ class MenuManager:
             return
         
         if entry.has_totp() and hasattr(self.main_window, 'totp_manager'):
-            current_code, remaining_time = self.main_window.totp_manager.get_current_totp(entry.totp_secret)
+            current_code, remaining_time = self.main_window.take_otp_code(entry)
             if current_code:
                 import pyperclip
                 pyperclip.copy(current_code)
                 if hasattr(self.main_window, 'status_label') and self.main_window.status_label:
                     from gui.modern_styles import update_status_bar
+                    validity = f"{remaining_time}s remaining" if remaining_time is not None else "counter advanced"
                     update_status_bar(self.main_window.status_label, 
-                                    f"2FA code copied: {current_code} ({remaining_time}s remaining)", "info")
+                                    f"2FA code copied: {current_code} ({validity})", "info")
             else:
                 messagebox.showerror("Error", "Could not generate 2FA code!")
         else:
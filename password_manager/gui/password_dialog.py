@@ -1,20 +1,24 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
+from PIL import ImageTk
 from gui.modern_styles import (
     WindowsClassicStyles, WindowsClassicColors, create_classic_frame,
     create_classic_entry, create_classic_text, ClassicSpacing
 )
-from core.totp_manager import TOTPManager
+from core.totp_manager import TOTPManager, parse_otpauth_uri
 
 class PasswordDialog:
-    def __init__(self, parent, title, entry=None, password_generator=None, category_manager=None):
+    def __init__(self, parent, title, entry=None, password_generator=None, category_manager=None,
+                 totp_manager=None):
         self.result = None
         self.password_generator = password_generator
         self.category_manager = category_manager
         self.password_visible = False
-        self.totp_manager = TOTPManager()
+        # Gemeinsamer Manager des Hauptfensters, damit dessen QR-Cache genutzt und beim Sperren geleert wird
+        self.totp_manager = totp_manager or TOTPManager()
         self.totp_secret = ""
+        # Periode/Stellen/Algorithmus/HOTP-Zähler bleiben beim Bearbeiten erhalten (siehe PasswordEntry.otp_params)
+        self.otp_params = ""
         self.qr_image = None
 
         WindowsClassicStyles.setup_windows_classic_theme()
@@ -112,7 +116,7 @@ class PasswordDialog:
         left_frame = create_classic_frame(totp_info_frame)
         left_frame.pack(side='left', fill='both', expand=True)
 
-        tk.Label(left_frame, text="Secret Key:",
+        tk.Label(left_frame, text="Secret Key oder otpauth://-URI:",
                 bg=WindowsClassicColors.WINDOW_BG, fg=WindowsClassicColors.TEXT_PRIMARY,
                 font=('Segoe UI', 9, 'normal')).pack(anchor='w')
         
@@ -177,6 +181,7 @@ class PasswordDialog:
             self.category_var.set(entry.category or "Other")
             if entry.has_totp():
                 self.totp_secret = entry.totp_secret
+                self.otp_params = entry.otp_params
                 self.secret_entry.insert(0, self.totp_secret)
                 self.totp_enabled.set(True)
                 self.toggle_totp()
@@ -192,22 +197,24 @@ class PasswordDialog:
         else:
             self.totp_content.pack_forget()
             self.totp_secret = ""
+            self.otp_params = ""
             self.secret_entry.delete(0, tk.END)
 
     def generate_new_secret(self):
         self.totp_secret = self.totp_manager.generate_secret()
+        self.otp_params = ""
         self.secret_entry.delete(0, tk.END)
         self.secret_entry.insert(0, self.totp_secret)
         self.show_qr_code()
 
     def show_qr_code(self):
-        if not self.totp_secret:
+        if not self.secret_entry.get().strip():
             return
 
         account_name = self.title_entry.get() or "Account"
         try:
-            qr_img = self.totp_manager.generate_qr_code(self.totp_secret, account_name)
-            qr_img = qr_img.resize((120, 120), Image.Resampling.LANCZOS)
+            secret, otp_params = self._read_secret_field()
+            qr_img = self.totp_manager.get_qr_image(secret, account_name, 120, params=otp_params)
             
             self.qr_image = ImageTk.PhotoImage(qr_img)
             self.qr_label.configure(image=self.qr_image, text="")
@@ -238,7 +245,13 @@ class PasswordDialog:
         url = self.url_entry.get().strip()
         notes = self.notes_entry.get('1.0', tk.END).strip()
         category = self.category_var.get()
-        totp_secret = self.secret_entry.get().strip() if self.totp_enabled.get() else ""
+        totp_secret, otp_params = "", ""
+        if self.totp_enabled.get():
+            try:
+                totp_secret, otp_params = self._read_secret_field()
+            except ValueError as e:
+                messagebox.showerror("Fehler", f"Ungültige 2FA-Angabe: {e}")
+                return
 
         if not title:
             messagebox.showerror("Fehler", "Titel ist erforderlich!")
@@ -254,9 +267,17 @@ class PasswordDialog:
             'url': url,
             'notes': notes,
             'category': category,
-            'totp_secret': totp_secret
+            'totp_secret': totp_secret,
+            'otp_params': otp_params
         }
         self.dialog.destroy()
 
+    def _read_secret_field(self):
+        # Eine eingefügte otpauth://-URI liefert Secret und Parameter, ein reines Secret behält die bisherigen
+        value = self.secret_entry.get().strip()
+        if value.lower().startswith('otpauth://'):
+            return parse_otpauth_uri(value)
+        return value, self.otp_params if value else ""
+
     def cancel(self):
         self.dialog.destroy()
\ No newline at end of file
@@ -122,6 +122,16 @@ class SettingsDialog:
                                     fg=WindowsClassicColors.TEXT_PRIMARY)
         warning_spinbox.pack(side='right')
         
+        self.soft_lock_enabled = tk.BooleanVar()
+        soft_lock_cb = tk.Checkbutton(autolock_container, text=_("settings_soft_lock_enable"),
+                                     variable=self.soft_lock_enabled,
+                                     bg=WindowsClassicColors.WINDOW_BG,
+                                     fg=WindowsClassicColors.TEXT_PRIMARY,
+                                     font=('Segoe UI', 9, 'normal'),
+                                     activebackground=WindowsClassicColors.WINDOW_BG,
+                                     selectcolor=WindowsClassicColors.INPUT_BG)
+        soft_lock_cb.pack(anchor='w', pady=(8, 0))
+        
         clipboard_frame = create_classic_label_frame(security_frame, _("settings_clipboard"))
         clipboard_frame.pack(fill='x', padx=8, pady=8)
         
@@ -334,6 +344,7 @@ class SettingsDialog:
         self.autolock_enabled.set(self.temp_settings.get("auto_lock_enabled", True))
         self.autolock_timeout.set(self.temp_settings.get("auto_lock_timeout_minutes", 0.75))
         self.autolock_warning.set(self.temp_settings.get("auto_lock_warning_seconds", 15))
+        self.soft_lock_enabled.set(self.temp_settings.get("soft_lock_enabled", False))
         
         self.clipboard_enabled.set(self.temp_settings.get("clipboard_clear_enabled", True))
         self.clipboard_timer.set(self.temp_settings.get("clipboard_clear_seconds", 10))
@@ -352,6 +363,7 @@ class SettingsDialog:
             "auto_lock_enabled": self.autolock_enabled.get(),
             "auto_lock_timeout_minutes": self.autolock_timeout.get(),
             "auto_lock_warning_seconds": self.autolock_warning.get(),
+            "soft_lock_enabled": self.soft_lock_enabled.get(),
             "clipboard_clear_enabled": self.clipboard_enabled.get(),
             "clipboard_clear_seconds": self.clipboard_timer.get(),
             
@@ -2,6 +2,8 @@ import json
 import os
 from pathlib import Path
 
+from gui.localization import _
+
 
 class SettingsManager:
     def __init__(self):
@@ -24,6 +26,17 @@ class SettingsManager:
             "show_password_strength": True,
             "require_password_confirmation": True,
             "backup_on_save": False,
+            "journal_mode_enabled": False,
+            "journal_checkpoint_threshold": 100,
+            "background_save_enabled": False,
+            "background_save_delay_ms": 500,
+            "soft_lock_enabled": False,
+            "vault_compression": "none",
+            "vault_compression_level": 6,
+            "kdf_target_ms": 500,
+            "kdf_algorithm": "pbkdf2-sha256",
+            "vault_cipher": "aes-256-gcm",
+            "vault_layout": "records",
             "window_width": 800,
             "window_height": 600,
             "show_status_bar": True,
@@ -55,6 +68,25 @@ class SettingsManager:
     def get_auto_lock_timeout_seconds(self):
         return self.get("auto_lock_timeout_minutes") * 60
     
+    def apply_vault_settings(self, pm):
+        """Überträgt Journal-, Kompressions-, KDF- und Format-Einstellungen auf einen PasswordManager.
+        
+        Gibt einen Warnungstext für die GUI zurück, wenn eine Einstellung angepasst werden musste, sonst None.
+        """
+        pm.journal_enabled = self.get("journal_mode_enabled", False)
+        pm.journal_threshold = self.get("journal_checkpoint_threshold", 100)
+        pm.compression = self.get("vault_compression", "none")
+        pm.compression_level = self.get("vault_compression_level", 6)
+        pm.kdf_target_seconds = self.get("kdf_target_ms", 500) / 1000
+        pm.kdf_algorithm = self.get("kdf_algorithm", "pbkdf2-sha256")
+        pm.cipher = self.get("vault_cipher", "aes-256-gcm")
+        pm.vault_layout = self.get("vault_layout", "records")
+        if pm.vault_layout == "records" and pm.cipher != "aes-256-gcm":
+            # Records werden immer mit AES-GCM versiegelt; Fernet gibt es nur im Block-Format
+            pm.vault_layout = "blob"
+            return _("warning_records_cipher")
+        return None
+    
     def reset_to_defaults(self):
         self.settings = self._load_default_settings()
         self.save_settings()
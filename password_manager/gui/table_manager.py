@@ -1,4 +1,6 @@
+import math
 import tkinter as tk
+from bisect import bisect_left, bisect_right
 from tkinter import ttk
 from gui.modern_styles import ModernColors, ModernSpacing
 from gui.localization import _
@@ -11,7 +13,12 @@ class TableManager:
         self.tree_container = None
         self.sort_column = None
         self.sort_reverse = False
-        self.entry_item_mapping = {}
+        self.row_count = 0
+        # Zeilennummern und Item-IDs der Einträge mit 2FA, aufsteigend nach Zeile
+        self.totp_rows = []
+        self.totp_items = []
+        # Zuletzt geschriebener 2FA-Text je Item, um unveränderte Zellen nicht neu zu setzen
+        self.totp_texts = {}
         
     def create_table(self, parent):
         table_frame = tk.Frame(parent, bg=ModernColors.PANEL_BG)
@@ -79,7 +86,15 @@ class TableManager:
         scrollbar_h = ttk.Scrollbar(self.tree_container, orient='horizontal', 
                                    command=self.tree.xview)
         
-        self.tree.configure(yscrollcommand=scrollbar_v.set, 
+        def on_yscroll(first, last):
+            scrollbar_v.set(first, last)
+            # Neu sichtbare Zeilen sofort aktualisieren statt erst beim nächsten Tick
+            if hasattr(self.main_window, 'schedule_totp_refresh'):
+                self.main_window.schedule_totp_refresh()
+            else:
+                self.refresh_totp_codes()
+        
+        self.tree.configure(yscrollcommand=on_yscroll, 
                            xscrollcommand=scrollbar_h.set)
         
         self.tree.grid(row=0, column=0, sticky='nsew')
@@ -109,17 +124,17 @@ class TableManager:
             return
         
         if column == '#0':
-            entries.sort(key=lambda x: x.title.lower(), reverse=self.sort_reverse)
+            entries.sort(key=lambda x: x.title_folded, reverse=self.sort_reverse)
         elif column == 'username':
-            entries.sort(key=lambda x: x.username.lower(), reverse=self.sort_reverse)
+            entries.sort(key=lambda x: x.username_folded, reverse=self.sort_reverse)
         elif column == 'password':
-            entries.sort(key=lambda x: len(x.password), reverse=self.sort_reverse)
+            entries.sort(key=lambda x: x.password_length, reverse=self.sort_reverse)
         elif column == 'url':
-            entries.sort(key=lambda x: x.url.lower(), reverse=self.sort_reverse)
+            entries.sort(key=lambda x: x.url_folded, reverse=self.sort_reverse)
         elif column == 'totp':
             entries.sort(key=lambda x: x.has_totp(), reverse=self.sort_reverse)
         elif column == 'modified':
-            entries.sort(key=lambda x: x.modified, reverse=self.sort_reverse)
+            entries.sort(key=lambda x: x.modified_ts, reverse=self.sort_reverse)
         
         self.update_table(entries)
         self._update_sort_indicators()
@@ -142,42 +157,47 @@ class TableManager:
         return []
     
     def update_table(self, entries):
-        selected_title = self.get_selected_entry_title()
+        selected_id = self.get_selected_entry_id()
         
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self._reset_rows()
         
-        self.entry_item_mapping.clear()
-        
-        for entry in entries:
+        for row, entry in enumerate(entries):
             item_id = self._insert_entry(entry)
-            self.entry_item_mapping[entry.title] = item_id
+            if entry.has_totp():
+                self.totp_rows.append(row)
+                self.totp_items.append(item_id)
+        self.row_count = len(entries)
         
         self.header_count_label.config(text=f"({len(entries)})")
         
-        if selected_title and selected_title in self.entry_item_mapping:
-            item_id = self.entry_item_mapping[selected_title]
-            self.tree.selection_set(item_id)
-            self.tree.focus(item_id)
-            self.tree.see(item_id)
+        if selected_id and self.tree.exists(selected_id):
+            self.tree.selection_set(selected_id)
+            self.tree.focus(selected_id)
+            self.tree.see(selected_id)
         
         if hasattr(self.main_window, 'status_label') and self.main_window.status_label:
             from gui.modern_styles import update_status_bar
             update_status_bar(self.main_window.status_label, 
                             f"{_('status_showing')} {len(entries)} {_('status_entries')}", "normal")
+        
+        # Neue 2FA-Zeilen können einen schnelleren Refresh brauchen als bisher geplant
+        if hasattr(self.main_window, 'schedule_totp_refresh'):
+            self.main_window.schedule_totp_refresh()
     
     def _insert_entry(self, entry):
         title_with_icon = f"🔒 {entry.title}"
         
-        password_display = "•" * min(len(entry.password), 8) if entry.password else ""
+        password_display = "•" * min(entry.password_length, 8)
         
         url_display = self._format_url(entry.url)
         
         totp_display = "🔐" if entry.has_totp() else ""
         
-        modified_display = self._format_date(entry.modified)
+        modified_display = self._format_timestamp(entry.modified_ts)
         
+        # Die Treeview-Item-ID ist die Eintrags-ID, dadurch ist die Zuordnung Zeile -> Eintrag O(1)
         item_id = self.tree.insert('', 'end', 
+                                  iid=entry.id,
                                   text=title_with_icon,
                                   values=(entry.username, 
                                          password_display,
@@ -185,8 +205,6 @@ class TableManager:
                                          totp_display,
                                          modified_display))
         
-        self._update_totp_display(item_id, entry)
-        
         return item_id
     
     def _format_url(self, url):
@@ -222,18 +240,26 @@ class TableManager:
         except:
             return date_str[:10] if len(date_str) >= 10 else date_str
     
+    def _format_timestamp(self, timestamp):
+        try:
+            from datetime import datetime
+            return datetime.fromtimestamp(timestamp).strftime("%d.%m.%Y")
+        except (OverflowError, OSError, ValueError):
+            return ""
+    
     def _update_totp_display(self, item_id, entry):
         if not entry.has_totp():
             return
         
         if hasattr(self.main_window, 'totp_manager'):
-            current_code, remaining_time = self.main_window.totp_manager.get_current_totp(entry.totp_secret)
+            current_code, remaining_time = self.main_window.totp_manager.get_current_totp(entry.totp_secret,
+                                                                                          entry.otp_params)
             if current_code:
-                totp_display = f"🔐 {current_code[:3]}•••• ({remaining_time}s)"
-                values = list(self.tree.item(item_id)['values'])
-                if len(values) >= 4:
-                    values[3] = totp_display
-                    self.tree.item(item_id, values=values)
+                validity = f"{remaining_time}s" if remaining_time is not None else "HOTP"
+                totp_display = f"🔐 {current_code[:3]}•••• ({validity})"
+                if self.totp_texts.get(item_id) != totp_display:
+                    self.tree.set(item_id, 'totp', totp_display)
+                    self.totp_texts[item_id] = totp_display
     
     def _on_double_click(self, event):
         if hasattr(self.main_window, 'edit_password'):
@@ -253,51 +279,73 @@ class TableManager:
             if hasattr(self.main_window, 'delete_password'):
                 self.main_window.delete_password()
     
-    def get_selected_entry_title(self):
+    def get_selected_entry_id(self):
         selection = self.tree.selection()
         if not selection:
             return None
         
-        item = self.tree.item(selection[0])
-        title_with_icon = item['text']
-        
-        return title_with_icon.replace('🔒 ', '')
+        return selection[0]
+    
+    def get_selected_entry_title(self):
+        entry = self.get_selected_entry()
+        return entry.title if entry else None
     
     def get_selected_entry(self):
-        title = self.get_selected_entry_title()
-        if not title:
+        entry_id = self.get_selected_entry_id()
+        if not entry_id:
             return None
         
         if hasattr(self.main_window, 'pm') and self.main_window.pm.is_unlocked:
-            return self.main_window.pm.get_entry(title)
+            return self.main_window.pm.get_by_id(entry_id)
         return None
     
     def refresh_totp_codes(self):
+        """Aktualisiert die sichtbaren 2FA-Zeilen; liefert ms bis zur nächsten Änderung oder None"""
         if not hasattr(self.main_window, 'totp_manager'):
-            return
+            return None
         
-        for item in self.tree.get_children():
-            title_with_icon = self.tree.item(item)['text']
-            title = title_with_icon.replace('🔒 ', '')
-            
-            if hasattr(self.main_window, 'pm') and self.main_window.pm.is_unlocked:
-                entry = self.main_window.pm.get_entry(title)
-                if entry and entry.has_totp():
-                    self._update_totp_display(item, entry)
+        if not (hasattr(self.main_window, 'pm') and self.main_window.pm.is_unlocked):
+            return None
+        
+        if not self.totp_items:
+            return None
+        
+        # Nur 2FA-Zeilen im sichtbaren Bereich; yview liefert den Ausschnitt als Anteil aller Zeilen
+        first, last = self.tree.yview()
+        start = bisect_left(self.totp_rows, int(first * self.row_count))
+        end = bisect_right(self.totp_rows, math.ceil(last * self.row_count))
+        
+        get_by_id = self.main_window.pm.get_by_id
+        visible_params = set()
+        for item in self.totp_items[start:end]:
+            entry = get_by_id(item)
+            if entry and entry.has_totp():
+                self._update_totp_display(item, entry)
+                visible_params.add(entry.otp_params)
+        
+        return self.main_window.totp_manager.next_refresh_ms(visible_params)
     
     def clear_table(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        self.entry_item_mapping.clear()
+        self._reset_rows()
         self.header_count_label.config(text="(0)")
     
+    def _reset_rows(self):
+        self.tree.delete(*self.tree.get_children())
+        self.row_count = 0
+        self.totp_rows = []
+        self.totp_items = []
+        self.totp_texts = {}
+    
+    def select_entry_by_id(self, entry_id):
+        if self.tree.exists(entry_id):
+            self.tree.selection_set(entry_id)
+            self.tree.focus(entry_id)
+            self.tree.see(entry_id)
+    
     def select_entry_by_title(self, title):
-        if title in self.entry_item_mapping:
-            item_id = self.entry_item_mapping[title]
-            self.tree.selection_set(item_id)
-            self.tree.focus(item_id)
-            self.tree.see(item_id)
+        entry = self.main_window.pm.get_entry(title)
+        if entry:
+            self.select_entry_by_id(entry.id)
     
     def get_entry_count(self):
         return len(self.tree.get_children())
\ No newline at end of file
@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import pyperclip
-from PIL import Image, ImageTk
+from PIL import ImageTk
 from gui.modern_styles import (
     WindowsClassicStyles, WindowsClassicColors, create_classic_frame,
     create_classic_label_frame, ClassicSpacing
@@ -13,6 +13,9 @@ class TOTPDialog:
         self.pm = password_manager
         self.totp_manager = totp_manager
         self.totp_entries = []
+        # Treeview-Zeile je Eintrag und zuletzt angezeigte Werte (Code, Zeit), damit nur Änderungen gesetzt werden
+        self.totp_items = []
+        self.cell_texts = {}
         self.update_timer = None
         self.selected_index = -1
         
@@ -163,6 +166,8 @@ class TOTPDialog:
             self.totp_tree.delete(item)
         
         self.totp_entries = []
+        self.totp_items = []
+        self.cell_texts = {}
         all_entries = self.pm.list_entries()
         
         for entry in all_entries:
@@ -174,6 +179,9 @@ class TOTPDialog:
                                  values=("", "Füge 2FA zu deinen Passwörtern hinzu", ""))
             return
         
+        for entry in self.totp_entries:
+            self.totp_items.append(self.totp_tree.insert('', 'end', text=entry.title,
+                                                         values=(entry.username, "", "")))
         self.update_codes()
         
         if 0 <= old_selection < len(self.totp_entries):
@@ -186,31 +194,33 @@ class TOTPDialog:
         if not self.totp_entries:
             return
         
-        current_selection = self.totp_tree.selection()
-        selected_item_id = current_selection[0] if current_selection else None
-        
-        for item in self.totp_tree.get_children():
-            self.totp_tree.delete(item)
-        
-        for i, entry in enumerate(self.totp_entries):
-            current_code, remaining_time = self.totp_manager.get_current_totp(entry.totp_secret)
+        # Die Zeilen bleiben stehen (Auswahl und Scrollposition auch), gesetzt werden nur geänderte Zellen
+        for item_id, entry in zip(self.totp_items, self.totp_entries):
+            current_code, remaining_time = self.totp_manager.get_current_totp(entry.totp_secret, entry.otp_params)
             
             if current_code:
-                formatted_code = f"{current_code[:3]} {current_code[3:]}"
-                time_display = f"{remaining_time}s"
+                half = len(current_code) // 2
+                formatted_code = f"{current_code[:half]} {current_code[half:]}"
+                time_display = f"{remaining_time}s" if remaining_time is not None else "HOTP"
             else:
                 formatted_code = "Fehler"
                 time_display = "0s"
             
-            item_id = self.totp_tree.insert('', 'end', text=entry.title,
-                                           values=(entry.username, formatted_code, time_display))
-            
-            if i == self.selected_index:
-                self.totp_tree.selection_set(item_id)
+            old_code, old_time = self.cell_texts.get(item_id, (None, None))
+            if formatted_code != old_code:
+                self.totp_tree.set(item_id, 'current_code', formatted_code)
+            if time_display != old_time:
+                self.totp_tree.set(item_id, 'remaining', time_display)
+            self.cell_texts[item_id] = (formatted_code, time_display)
     
     def start_update_timer(self):
+        self.update_timer = None
         self.update_codes()
-        self.update_timer = self.dialog.after(1000, self.start_update_timer)
+        
+        # Nächster Refresh zum nächsten Countdown-Schritt; enthält die Liste nur HOTP-Einträge, ist keiner nötig
+        delay = self.totp_manager.next_refresh_ms(entry.otp_params for entry in self.totp_entries)
+        if delay is not None:
+            self.update_timer = self.dialog.after(delay, self.start_update_timer)
     
     def copy_selected_code(self, event=None):
         if self.selected_index < 0 or self.selected_index >= len(self.totp_entries):
@@ -218,14 +228,25 @@ class TOTPDialog:
             return
         
         entry = self.totp_entries[self.selected_index]
-        current_code, remaining_time = self.totp_manager.get_current_totp(entry.totp_secret)
+        try:
+            current_code, remaining_time = self.totp_manager.take_code(entry, self.pm)
+        except Exception as e:
+            # HOTP: ohne gespeicherten Zähler würde derselbe Code erneut angeboten
+            messagebox.showerror("Fehler", f"Der HOTP-Zähler konnte nicht gespeichert werden:\n{str(e)}")
+            return
         
         if current_code:
             pyperclip.copy(current_code)
+            if remaining_time is None:
+                # HOTP: der Zähler wurde weitergezählt, die Liste zeigt den nächsten Code
+                self.update_codes()
+                validity = "Einmalcode (HOTP), der Zähler wurde weitergezählt."
+            else:
+                validity = f"Gültig für weitere {remaining_time} Sekunden."
             messagebox.showinfo("Code kopiert", 
                                f"2FA-Code für '{entry.title}' wurde kopiert!\n"
                                f"Code: {current_code}\n"
-                               f"Gültig für weitere {remaining_time} Sekunden.")
+                               f"{validity}")
         else:
             messagebox.showerror("Fehler", "Konnte 2FA-Code nicht generieren!")
     
@@ -261,8 +282,8 @@ class TOTPDialog:
         title_label.pack(pady=(0, 16))
         
         try:
-            qr_img = self.totp_manager.generate_qr_code(entry.totp_secret, entry.title)
-            qr_img = qr_img.resize((200, 200), Image.Resampling.LANCZOS)
+            qr_img = self.totp_manager.get_qr_image(entry.totp_secret, entry.title, 200,
+                                                  params=entry.otp_params)
             
             qr_photo = ImageTk.PhotoImage(qr_img)
             
@@ -0,0 +1,74 @@
+import os
+import sys
+
+import pytest
+
+# Die Module werden wie in main.py relativ zum Projektordner importiert (core.*, gui.*)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Schnelle Schlüsselableitung, die Tests prüfen Format und Abläufe, nicht die KDF-Stärke
+FAST_KDF = {'algorithm': 'pbkdf2-sha256', 'iterations': 1000}
+FAST_KDFS = {'pbkdf2-sha256': FAST_KDF, 'scrypt': {'algorithm': 'scrypt', 'n': 2 ** 10, 'r': 8, 'p': 1}}
+
+
+@pytest.fixture
+def fast_kdf(request):
+    # Mit indirect=True lässt sich der Algorithmus wählen, sonst PBKDF2
+    return dict(FAST_KDFS[getattr(request, 'param', 'pbkdf2-sha256')])
+
+
+@pytest.fixture
+def entry_rows():
+    # Eintrags-Dicts wie aus PasswordEntry.to_dict, für Tests der Formate ohne PasswordManager
+    def rows(count):
+        return [{'id': f"id{i}", 'title': f"Eintrag {i} ü", 'username': f"user{i}", 'password': f"pw-{i}",
+                 'url': "https://example.com", 'notes': "Notiz\nmit Umbruch" if i % 2 else "",
+                 'totp_secret': "JBSWY3DPEHPK3PXP" if i % 3 == 0 else "", 'otp_params': "",
+                 'category': "Work", 'created': "2024-01-01T10:00:00", 'modified': "2024-01-02T10:00:00"}
+                for i in range(count)]
+    
+    return rows
+
+
+@pytest.fixture
+def encryptor(fast_kdf):
+    from core.encryption import PasswordEncryption
+    
+    encryption = PasswordEncryption()
+    encryption.create_envelope("master", fast_kdf)
+    return encryption
+
+
+@pytest.fixture
+def vault_path(tmp_path):
+    return str(tmp_path / "vault.enc")
+
+
+@pytest.fixture
+def make_manager(vault_path):
+    from core.password_storage import PasswordManager
+    
+    def make(password="master", entries=0, **settings):
+        pm = PasswordManager(vault_path)
+        for name, value in settings.items():
+            setattr(pm, name, value)
+        pm.create_new_database(password, FAST_KDF)
+        with pm.transaction():
+            for i in range(entries):
+                pm.add_entry(f"Entry {i}", f"user{i}", f"secret-{i}", notes=f"note {i}" if i % 2 else "",
+                             totp_secret="JBSWY3DPEHPK3PXP" if i % 5 == 0 else "")
+        return pm
+    
+    return make
+
+
+@pytest.fixture
+def reopen(vault_path):
+    from core.password_storage import PasswordManager
+    
+    def reopen_(password="master", **settings):
+        pm = PasswordManager(vault_path, **settings)
+        assert pm.unlock_database(password)
+        return pm
+    
+    return reopen_
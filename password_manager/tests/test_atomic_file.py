@@ -0,0 +1,157 @@
+import os
+
+import pytest
+
+from core import atomic_file
+from core.atomic_file import atomic_write, find_temp_files, recover_interrupted_write
+from core.password_storage import PasswordManager
+from core.vault_file import is_complete_vault_file
+
+
+def _fail(*args, **kwargs):
+    raise OSError("simulierter Fehler")
+
+
+def test_atomic_write_replaces_content(tmp_path):
+    path = str(tmp_path / "vault.enc")
+    atomic_write(path, b"first")
+    atomic_write(path, b"second")
+    
+    with open(path, 'rb') as f:
+        assert f.read() == b"second"
+    assert find_temp_files(path) == []
+
+
+@pytest.mark.parametrize("failing", ["fsync", "replace"])
+def test_failed_write_keeps_original(tmp_path, monkeypatch, failing):
+    path = str(tmp_path / "vault.enc")
+    atomic_write(path, b"original")
+    
+    monkeypatch.setattr(atomic_file.os, failing, _fail)
+    with pytest.raises(OSError):
+        atomic_write(path, b"partial")
+    monkeypatch.undo()
+    
+    with open(path, 'rb') as f:
+        assert f.read() == b"original"
+    assert find_temp_files(path) == []
+
+
+def test_failed_first_write_leaves_nothing(tmp_path, monkeypatch):
+    path = str(tmp_path / "vault.enc")
+    monkeypatch.setattr(atomic_file.os, "replace", _fail)
+    
+    with pytest.raises(OSError):
+        atomic_write(path, b"data")
+    
+    assert os.listdir(tmp_path) == []
+
+
+def test_directory_sync_failure_is_ignored(tmp_path, monkeypatch):
+    # z.B. Windows: Verzeichnisse lassen sich nicht öffnen, die Datei ist trotzdem geschrieben
+    path = str(tmp_path / "vault.enc")
+    real_open = os.open
+    
+    def open_files_only(name, flags, *args):
+        if os.path.isdir(name):
+            raise OSError("simulierter Fehler")
+        return real_open(name, flags, *args)
+    
+    monkeypatch.setattr(atomic_file.os, "open", open_files_only)
+    atomic_write(path, b"data")
+    
+    with open(path, 'rb') as f:
+        assert f.read() == b"data"
+
+
+def test_recover_restores_newest_temp_when_target_missing(tmp_path):
+    path = str(tmp_path / "vault.enc")
+    older = tmp_path / "vault.enc.a.tmp"
+    newer = tmp_path / "vault.enc.b.tmp"
+    older.write_bytes(b"old")
+    newer.write_bytes(b"new")
+    os.utime(older, (1, 1))
+    
+    actions = recover_interrupted_write(path)
+    
+    with open(path, 'rb') as f:
+        assert f.read() == b"new"
+    assert find_temp_files(path) == []
+    assert len(actions) == 2
+
+
+def test_recover_removes_leftovers_when_target_exists(tmp_path):
+    path = str(tmp_path / "vault.enc")
+    atomic_write(path, b"complete")
+    (tmp_path / "vault.enc.x.tmp").write_bytes(b"partial")
+    
+    actions = recover_interrupted_write(path)
+    
+    with open(path, 'rb') as f:
+        assert f.read() == b"complete"
+    assert find_temp_files(path) == []
+    assert actions and actions[0].startswith("Entfernt")
+
+
+def test_recover_without_temp_files_does_nothing(tmp_path):
+    assert recover_interrupted_write(str(tmp_path / "vault.enc")) == []
+
+
+def test_unlock_reports_recovery_actions(make_manager, vault_path):
+    pm = make_manager(entries=3)
+    pm.lock_database()
+    with open(vault_path + ".leftover.tmp", 'wb') as f:
+        f.write(b"partial")
+    
+    pm = PasswordManager(vault_path)
+    assert pm.unlock_database("master")
+    assert len(pm.recovery_actions) == 1
+    assert pm.get_entry("Entry 2").password == "secret-2"
+
+
+@pytest.mark.parametrize("layout, cipher", [("records", "aes-256-gcm"), ("blob", "aes-256-gcm"), ("blob", "fernet")])
+def test_truncated_vault_file_is_incomplete(make_manager, vault_path, layout, cipher):
+    make_manager(entries=40, vault_layout=layout, cipher=cipher).lock_database()
+    assert is_complete_vault_file(vault_path)
+    
+    with open(vault_path, 'rb') as f:
+        data = f.read()
+    with open(vault_path, 'wb') as f:
+        f.write(data[:-10])
+    assert not is_complete_vault_file(vault_path)
+
+
+def test_recover_skips_truncated_temp(make_manager, vault_path):
+    make_manager(entries=5).lock_database()
+    with open(vault_path, 'rb') as f:
+        data = f.read()
+    os.remove(vault_path)
+    
+    complete = vault_path + ".a.tmp"
+    truncated = vault_path + ".b.tmp"
+    with open(complete, 'wb') as f:
+        f.write(data)
+    with open(truncated, 'wb') as f:
+        f.write(data[:len(data) // 2])
+    os.utime(complete, (1, 1))
+    
+    actions = recover_interrupted_write(vault_path, is_complete_vault_file)
+    
+    assert actions[0].startswith("Unvollständig")
+    assert find_temp_files(vault_path) == [truncated]
+    pm = PasswordManager(vault_path)
+    assert pm.unlock_database("master")
+    assert pm.get_entry("Entry 4").password == "secret-4"
+
+
+def test_unlock_leaves_incomplete_temp_alone(make_manager, vault_path):
+    make_manager(entries=5).lock_database()
+    os.replace(vault_path, vault_path + ".x.tmp")
+    with open(vault_path + ".x.tmp", 'r+b') as f:
+        f.truncate(100)
+    
+    pm = PasswordManager(vault_path)
+    assert not pm.unlock_database("master")
+    assert pm.last_unlock_error == 'missing'
+    assert len(pm.recovery_actions) == 1
+    assert os.path.exists(vault_path + ".x.tmp")
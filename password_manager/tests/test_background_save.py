@@ -0,0 +1,69 @@
+import pytest
+
+from core import password_storage
+
+
+def _fail(*args, **kwargs):
+    raise OSError("simulierter Fehler")
+
+
+def test_background_save_waits_for_transaction(make_manager, reopen):
+    pm = make_manager(entries=2)
+    pm.enable_background_save(0.01)
+    try:
+        with pm.transaction():
+            pm.add_entry("Inside", "user", "secret")
+            pm.save_worker.request_save()
+            pm.save_worker.flush()
+            assert reopen().get_entry("Inside") is None
+        pm.flush()
+        assert reopen().get_entry("Inside") is not None
+    finally:
+        pm.disable_background_save()
+
+
+def test_switching_database_locks_first(make_manager, tmp_path, reopen):
+    pm = make_manager(entries=1, journal_enabled=True)
+    pm.update_entry(pm.get_entry("Entry 0"), password="changed")
+    
+    pm.set_database_file(str(tmp_path / "other.enc"))
+    
+    assert not pm.is_unlocked
+    assert reopen().get_entry("Entry 0").password == "changed"
+
+
+def test_background_save_coalesces_requests(make_manager, reopen, monkeypatch):
+    pm = make_manager(entries=1)
+    saves = []
+    write_snapshot = pm._write_snapshot
+    pm.enable_background_save(0.05)
+    monkeypatch.setattr(pm.save_worker, 'save_callback', lambda: saves.append(1) or write_snapshot())
+    try:
+        for i in range(20):
+            pm.add_entry(f"Burst {i}", "user", "secret")
+        pm.flush()
+        assert len(saves) < 20
+        assert reopen().get_entry("Burst 19") is not None
+    finally:
+        pm.disable_background_save()
+
+
+def test_failed_final_save_keeps_vault_unlocked(make_manager, reopen, monkeypatch):
+    pm = make_manager(entries=2)
+    pm.enable_background_save(0.01)
+    try:
+        monkeypatch.setattr(password_storage, 'atomic_write', _fail)
+        pm.add_entry("Unsaved", "user", "secret")
+        
+        with pytest.raises(OSError):
+            pm.lock_database()
+        assert pm.is_unlocked
+        assert pm.get_entry("Unsaved").password == "secret"
+        
+        # Sobald das Speichern wieder gelingt, wird der fehlgeschlagene Stand nachgeholt
+        monkeypatch.undo()
+        pm.lock_database()
+        assert not pm.is_unlocked
+        assert reopen().get_entry("Unsaved") is not None
+    finally:
+        pm.disable_background_save()
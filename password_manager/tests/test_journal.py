@@ -0,0 +1,73 @@
+import os
+
+
+def test_journal_replay_restores_unsaved_changes(make_manager, reopen):
+    pm = make_manager(entries=10, journal_enabled=True)
+    pm.update_entry(pm.get_entry("Entry 1"), password="changed")
+    pm.update_entry(pm.get_entry("Entry 2"), title="Renamed")
+    pm.delete_entry("Entry 3")
+    pm.add_entry("Added", "user", "new-secret")
+    assert os.path.exists(pm.journal_file)
+    
+    # Ohne Checkpoint: die Änderungen stehen nur im Journal
+    reopened = reopen(journal_enabled=True)
+    
+    assert reopened.get_entry("Entry 1").password == "changed"
+    assert reopened.get_entry("Renamed").password == "secret-2"
+    assert reopened.get_entry("Entry 3") is None
+    assert reopened.get_entry("Added").password == "new-secret"
+    assert len(reopened.entries) == 10
+
+
+def test_journal_for_other_snapshot_is_discarded(make_manager, reopen):
+    pm = make_manager(entries=3, journal_enabled=True)
+    pm.update_entry(pm.get_entry("Entry 0"), password="changed")
+    with open(pm.journal_file, 'rb') as f:
+        journal = f.read()
+    
+    pm.checkpoint()
+    with open(pm.journal_file, 'wb') as f:
+        f.write(journal)
+    
+    reopened = reopen(journal_enabled=True)
+    assert reopened.get_entry("Entry 0").password == "changed"
+    assert not os.path.exists(reopened.journal_file)
+
+
+def test_checkpoint_removes_journal(make_manager, reopen):
+    pm = make_manager(entries=3, journal_enabled=True)
+    pm.update_entry(pm.get_entry("Entry 0"), notes="x")
+    pm.checkpoint()
+    
+    assert not os.path.exists(pm.journal_file)
+    assert reopen().get_entry("Entry 0").notes == "x"
+
+
+def test_journal_threshold_writes_snapshot(make_manager, reopen):
+    pm = make_manager(entries=3, journal_enabled=True, journal_threshold=4)
+    pm.checkpoint()
+    pm.update_entry(pm.get_entry("Entry 0"), password="a")
+    pm.update_entry(pm.get_entry("Entry 1"), password="b")
+    assert os.path.exists(pm.journal_file)
+    
+    pm.update_entry(pm.get_entry("Entry 2"), password="c")
+    
+    assert not os.path.exists(pm.journal_file)
+    assert reopen().get_entry("Entry 2").password == "c"
+
+
+def test_truncated_journal_keeps_complete_records(make_manager, reopen):
+    pm = make_manager(entries=3, journal_enabled=True)
+    pm.update_entry(pm.get_entry("Entry 0"), password="kept")
+    pm.update_entry(pm.get_entry("Entry 1"), password="lost")
+    
+    # Absturz beim Anhängen: die letzte Zeile ist unvollständig
+    with open(pm.journal_file, 'rb') as f:
+        journal = f.read()
+    with open(pm.journal_file, 'wb') as f:
+        f.write(journal[:-20])
+    
+    reopened = reopen(journal_enabled=True)
+    assert reopened.get_entry("Entry 0").password == "kept"
+    assert reopened.get_entry("Entry 1").password == "secret-1"
+    assert not os.path.exists(reopened.journal_file)
@@ -0,0 +1,102 @@
+import json
+import os
+
+import pytest
+from cryptography.fernet import Fernet
+
+from core import encryption
+from core.encryption import (
+    LEGACY_KDF_PARAMS, MAX_PBKDF2_ITERATIONS, MAX_SCRYPT_MEMORY, MIN_PBKDF2_ITERATIONS, MIN_SCRYPT_N,
+    PasswordEncryption, calibrate_kdf, scrypt_memory_bytes
+)
+from core.password_storage import PasswordManager
+from core.vault_file import build_vault_file, parse_vault_file
+
+ROWS = [{'id': "legacy-1", 'title': "Alt", 'username': "user", 'password': "pw", 'url': "", 'notes': "",
+         'totp_secret': "", 'otp_params': "", 'category': "Other",
+         'created': "2020-01-01T10:00:00", 'modified': "2020-01-01T10:00:00"}]
+
+
+@pytest.fixture
+def kdf_clock(monkeypatch):
+    """Ersetzt die Schlüsselableitung durch eine Uhr, die je Aufruf cost(params) Sekunden vorrückt"""
+    now = [0.0]
+    clock = {'now': now, 'cost': lambda params: 0.0}
+    
+    def derive(master_password, salt, params):
+        now[0] += clock['cost'](params)
+        return bytes(32)
+    
+    monkeypatch.setattr(encryption.time, 'perf_counter', lambda: now[0])
+    monkeypatch.setattr(encryption, 'derive_key', derive)
+    return clock
+
+
+def test_calibrated_kdf_params_round_trip(vault_path):
+    pm = PasswordManager(vault_path)
+    pm.kdf_target_seconds = 0.01
+    pm.create_new_database("master")
+    pm.add_entry("Neu", "user", "pw")
+    pm.lock_database()
+    
+    with open(vault_path, 'rb') as f:
+        header, _ = parse_vault_file(f.read())
+    kdf = header['key_slots'][0]['kdf']
+    assert kdf['algorithm'] == 'pbkdf2-sha256'
+    assert MIN_PBKDF2_ITERATIONS <= kdf['iterations'] <= MAX_PBKDF2_ITERATIONS
+    
+    reopened = PasswordManager(vault_path)
+    assert reopened.unlock_database("master")
+    assert reopened.get_entry("Neu").password == "pw"
+    assert reopened.encryptor.get_kdf_params() == kdf
+
+
+@pytest.mark.parametrize("with_header", [False, True])
+def test_vault_without_kdf_params_uses_legacy_defaults(vault_path, with_header):
+    salt = os.urandom(16)
+    key = PasswordEncryption().generate_key_from_password("master", salt)
+    token = Fernet(key).encrypt(json.dumps({'version': '1.0', 'entries': ROWS}).encode('utf-8'))
+    with open(vault_path, 'wb') as f:
+        # Ohne Header: 16 Byte Salt + Fernet; mit Header: Format ohne 'kdf'-Feld
+        f.write(build_vault_file(salt, token) if with_header else salt + token)
+    
+    pm = PasswordManager(vault_path)
+    assert pm.unlock_database("master")
+    assert pm.get_entry("Alt").password == "pw"
+    assert pm.encryptor.get_kdf_params() == LEGACY_KDF_PARAMS
+    pm.lock_database()
+    assert not PasswordManager(vault_path).unlock_database("falsch")
+    assert PasswordManager(vault_path).unlock_database("master")
+
+
+def test_pbkdf2_calibration_respects_floor(kdf_clock):
+    kdf_clock['cost'] = lambda params: 10.0
+    assert calibrate_kdf(0.5) == {'algorithm': 'pbkdf2-sha256', 'iterations': MIN_PBKDF2_ITERATIONS}
+
+
+def test_pbkdf2_calibration_respects_ceiling(kdf_clock):
+    # Die Probe scheint keine Zeit zu brauchen
+    assert calibrate_kdf(0.5) == {'algorithm': 'pbkdf2-sha256', 'iterations': MAX_PBKDF2_ITERATIONS}
+
+
+def test_pbkdf2_calibration_scales_to_target(kdf_clock):
+    kdf_clock['cost'] = lambda params: params['iterations'] / 1000000
+    assert calibrate_kdf(0.5)['iterations'] == 500000
+
+
+def test_scrypt_calibration_respects_floor(kdf_clock):
+    kdf_clock['cost'] = lambda params: 10.0
+    assert calibrate_kdf(0.5, 'scrypt') == {'algorithm': 'scrypt', 'n': MIN_SCRYPT_N, 'r': 8, 'p': 1}
+
+
+def test_scrypt_calibration_respects_memory_ceiling(kdf_clock):
+    params = calibrate_kdf(0.5, 'scrypt')
+    
+    assert scrypt_memory_bytes(params) <= MAX_SCRYPT_MEMORY
+    assert scrypt_memory_bytes(dict(params, n=params['n'] * 2)) > MAX_SCRYPT_MEMORY
+
+
+def test_scrypt_calibration_stops_at_target(kdf_clock):
+    # Jede Verdopplung von N verdoppelt die Zeit: 2^14 -> 0.1 s, 2^16 -> 0.4 s, 2^17 wäre 0.8 s
+    kdf_clock['cost'] = lambda params: params['n'] / MIN_SCRYPT_N * 0.1
+    assert calibrate_kdf(0.5, 'scrypt')['n'] == 2 ** 16
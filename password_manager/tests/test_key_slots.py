@@ -0,0 +1,41 @@
+import pytest
+
+from core.password_storage import PasswordManager
+from core.vault_file import parse_vault_file
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return parse_vault_file(f.read())
+
+
+def test_change_master_password_keeps_entries(make_manager, vault_path, fast_kdf, reopen):
+    make_manager(entries=10).lock_database()
+    pm = reopen()
+    assert pm.change_master_password("master", "new", fast_kdf)
+    assert pm.get_entry("Entry 7").password == "secret-7"
+    pm.lock_database()
+    
+    assert not PasswordManager(vault_path).unlock_database("master")
+    reopened = PasswordManager(vault_path)
+    assert reopened.unlock_database("new")
+    assert reopened.get_entry("Entry 8").password == "secret-8"
+
+
+@pytest.mark.parametrize("layout", ["records", "blob"])
+def test_change_master_password_only_rewrites_key_slot(make_manager, vault_path, fast_kdf, layout):
+    pm = make_manager(entries=40, vault_layout=layout)
+    header, body = _read(vault_path)
+    
+    assert pm.change_master_password("master", "new", fast_kdf)
+    new_header, new_body = _read(vault_path)
+    assert new_body == body
+    assert new_header['key_slots'] != header['key_slots']
+
+
+def test_change_master_password_rejects_wrong_current_password(make_manager, vault_path, fast_kdf):
+    pm = make_manager(entries=3)
+    before = _read(vault_path)
+    
+    assert not pm.change_master_password("falsch", "new", fast_kdf)
+    assert _read(vault_path) == before
@@ -0,0 +1,23 @@
+import os
+import threading
+
+from core import encryption
+from core.encryption import run_parallel
+
+
+def test_larger_worker_count_grows_shared_pool():
+    run_parallel(lambda item: item, range(4), 2)
+    workers = (os.cpu_count() or 1) + 3
+    # Jeder Abschnitt wartet auf alle anderen: klappt nur, wenn wirklich so viele Threads laufen
+    barrier = threading.Barrier(workers, timeout=5)
+    
+    def wait(item):
+        barrier.wait()
+        return item * 2
+    
+    assert run_parallel(wait, range(workers), workers) == [item * 2 for item in range(workers)]
+    assert encryption._executor_size >= workers
+
+
+def test_results_keep_input_order():
+    assert run_parallel(str, range(100), 3) == [str(item) for item in range(100)]
@@ -0,0 +1,55 @@
+import uuid
+
+from core.password_storage import PasswordEntry
+from core.secret_store import SecretStore
+
+
+def test_uuid_ids_are_stored_compactly(make_manager, reopen):
+    pm = make_manager(entries=3)
+    entry = pm.get_entry("Entry 1")
+    
+    assert isinstance(entry._id, int)
+    assert entry.id == uuid.UUID(int=entry._id).hex
+    assert entry.to_dict()['id'] == entry.id
+    assert pm.get_by_id(entry.id) is entry
+    
+    pm.lock_database()
+    reopened = reopen()
+    assert reopened.get_by_id(entry.id).title == "Entry 1"
+
+
+def test_other_ids_are_kept_as_strings():
+    store = SecretStore()
+    for entry_id in ("id0", "A" * 32, "0x" + "a" * 30, " " + "b" * 31):
+        entry = PasswordEntry.from_dict({'id': entry_id, 'title': "T", 'username': "u"}, store)
+        assert entry._id == entry_id and entry.id == entry_id
+
+
+def test_derived_values_come_from_sealed_fields():
+    store = SecretStore()
+    entry = PasswordEntry("Titel", "User", "passwort", url="HTTPS://Example.com", totp_secret="   ",
+                          secret_store=store)
+    
+    assert not hasattr(entry, '__dict__')
+    assert entry.password_length == len("passwort")
+    assert not entry.has_notes() and not entry.has_totp()
+    assert (entry.title_folded, entry.username_folded, entry.url_folded) == ("titel", "user", "https://example.com")
+    
+    entry.update(notes="notiz", totp_secret="JBSWY3DPEHPK3PXP", password="")
+    assert entry.has_notes() and entry.has_totp()
+    assert entry.password_length == 0
+    assert store.cached_count == 0
+
+
+def test_pending_entries_use_metadata_until_loaded(make_manager, reopen):
+    make_manager(entries=40).lock_database()
+    pm = reopen()
+    entry = pm.get_entry("Entry 5")
+    
+    assert entry._is_pending()
+    assert entry.password_length == len("secret-5")
+    assert entry.has_notes() and entry.has_totp()
+    assert entry.notes == "note 5"
+    assert not entry._is_pending()
+    assert entry.password_length == len("secret-5")
+    assert entry.has_notes() and entry.has_totp()
@@ -0,0 +1,146 @@
+import io
+import os
+
+import pytest
+
+from core.encryption import PasswordEncryption
+from core.password_storage import PasswordManager
+from core.record_format import (
+    ENTRIES_PER_RECORD, RECORD_META, encode_records, read_index, read_records, read_secret_group, salvage_records
+)
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib", "lzma"])
+def test_records_round_trip(encryptor, entry_rows, compression):
+    entries = entry_rows(2 * ENTRIES_PER_RECORD + 5)
+    body, index_offset = encode_records({'created': "heute", 'entries': entries}, encryptor.seal_record,
+                                        compression, workers=2)
+    
+    f = io.BytesIO(body)
+    index = read_index(f, 0, index_offset, encryptor.open_record)
+    data = read_records(f, 0, index, encryptor.open_record, compression=compression, workers=2)
+    
+    assert data['created'] == "heute"
+    assert data['group_sizes'] == [ENTRIES_PER_RECORD, ENTRIES_PER_RECORD, 5]
+    for original, decoded in zip(entries, data['entries']):
+        assert {field: decoded[field] for field in original} == original
+
+
+def test_metadata_records_skip_secrets(encryptor, entry_rows):
+    entries = entry_rows(40)
+    body, index_offset = encode_records({'entries': entries}, encryptor.seal_record)
+    
+    f = io.BytesIO(body)
+    index = read_index(f, 0, index_offset, encryptor.open_record)
+    metas = read_records(f, 0, index, encryptor.open_record, kinds=(RECORD_META,))['entries']
+    
+    assert 'password' not in metas[0]
+    assert metas[3]['password_length'] == str(len("pw-3"))
+    assert metas[1]['has_notes'] and not metas[0]['has_notes']
+    assert metas[0]['has_totp'] and not metas[1]['has_totp']
+    
+    secrets = read_secret_group(f, 0, index, 1, encryptor.open_record)
+    assert secrets[0]['password'] == entries[ENTRIES_PER_RECORD]['password']
+
+
+def test_salvage_keeps_intact_records(encryptor, entry_rows):
+    entries = entry_rows(3 * ENTRIES_PER_RECORD)
+    body, index_offset = encode_records({'entries': entries}, encryptor.seal_record)
+    index = read_index(io.BytesIO(body), 0, index_offset, encryptor.open_record)
+    
+    damaged = bytearray(body)
+    # Ein Byte im Metadaten-Record der zweiten Gruppe und eines im Index zerstören
+    damaged[index['meta_offsets'][1] + 40] ^= 0xFF
+    damaged[index_offset + 30] ^= 0xFF
+    
+    with pytest.raises(ValueError):
+        index = read_index(io.BytesIO(bytes(damaged)), 0, index_offset, encryptor.open_record)
+    
+    data, report = salvage_records(bytes(damaged), encryptor.open_record)
+    assert report['recovered'] == 2 * ENTRIES_PER_RECORD
+    assert report['lost'] == ENTRIES_PER_RECORD
+    assert report['damaged_records'] == 2
+    assert [entry['title'] for entry in data['entries']][ENTRIES_PER_RECORD] == entries[2 * ENTRIES_PER_RECORD]['title']
+
+
+def test_wrong_key_cannot_open_records(encryptor, entry_rows, fast_kdf):
+    body, index_offset = encode_records({'entries': entry_rows(2)}, encryptor.seal_record)
+    other = PasswordEncryption()
+    other.create_envelope("other", fast_kdf)
+    
+    with pytest.raises(ValueError):
+        read_index(io.BytesIO(body), 0, index_offset, other.open_record)
+
+
+def test_secrets_are_loaded_on_demand(make_manager, reopen):
+    make_manager(entries=100).lock_database()
+    pm = reopen()
+    
+    assert pm.secrets.cached_count == 0
+    assert all(entry._is_pending() for entry in pm.entries)
+    assert pm.get_entry("Entry 40").password == "secret-40"
+    assert sum(not entry._is_pending() for entry in pm.entries) == 32
+    
+    pm.update_entry(pm.get_entry("Entry 90"), title="Moved")
+    pm.save_database()
+    assert reopen().get_entry("Moved").password == "secret-90"
+
+
+def test_moved_vault_keeps_loading_secrets(make_manager, reopen, tmp_path):
+    make_manager(entries=100).lock_database()
+    pm = reopen()
+    target = str(tmp_path / "neu" / "umbenannt.enc")
+    
+    pm.move_database(target)
+    assert pm.database_file == target
+    assert pm.get_entry("Entry 70").password == "secret-70"
+    pm.update_entry(pm.get_entry("Entry 5"), username="neu")
+    pm.lock_database()
+    
+    reopened = PasswordManager(target)
+    assert reopened.unlock_database("master")
+    assert reopened.get_entry("Entry 99").password == "secret-99"
+
+
+def test_touched_vault_keeps_loading_secrets(make_manager, reopen, vault_path):
+    make_manager(entries=40).lock_database()
+    pm = reopen()
+    
+    os.utime(vault_path, (0, 0))
+    assert pm.get_entry("Entry 39").password == "secret-39"
+
+
+def test_rewritten_vault_stops_lazy_loading(make_manager, reopen):
+    make_manager(entries=40).lock_database()
+    pm = reopen()
+    
+    other = reopen()
+    other.add_entry("Neu", "user", "pw")
+    other.lock_database()
+    
+    with pytest.raises(ValueError):
+        pm.get_entry("Entry 39").password
+
+
+def test_corrupt_secret_record_fails_unlock_and_salvages(make_manager, vault_path):
+    make_manager(entries=3 * ENTRIES_PER_RECORD).lock_database()
+    pm = PasswordManager(vault_path)
+    assert pm.unlock_database("master")
+    secret_offset = pm._secret_records.body_offset + pm._secret_records.index['secret_offsets'][1]
+    pm.lock_database()
+    
+    with open(vault_path, 'r+b') as f:
+        f.seek(secret_offset + 40)
+        value = f.read(1)
+        f.seek(secret_offset + 40)
+        f.write(bytes([value[0] ^ 0xFF]))
+    
+    pm = PasswordManager(vault_path)
+    assert not pm.unlock_database("master")
+    assert pm.last_unlock_error == 'corrupt'
+    
+    assert pm.unlock_database("master", salvage=True)
+    assert pm.salvage_report['missing_secrets'] == ENTRIES_PER_RECORD
+    assert pm.get_entry(f"Entry {ENTRIES_PER_RECORD}").password == ""
+    assert pm.get_entry("Entry 0").password == "secret-0"
+    assert os.path.exists(vault_path + ".damaged")
@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from core import password_storage
+
+
+def _fail(*args, **kwargs):
+    raise OSError("simulierter Fehler")
+
+
+@pytest.mark.parametrize("change", [
+    lambda pm: pm.add_entry("Neu", "user", "pw"),
+    lambda pm: pm.update_entry(pm.get_entry("Entry 1"), username="geändert"),
+    lambda pm: pm.delete_entry("Entry 2"),
+])
+def test_failed_save_reaches_caller(make_manager, reopen, monkeypatch, change):
+    pm = make_manager(entries=3)
+    monkeypatch.setattr(password_storage, 'atomic_write', _fail)
+    
+    with pytest.raises(OSError):
+        change(pm)
+    assert len(reopen().entries) == 3
+    assert reopen().get_entry("Entry 1").username == "user1"
+
+
+def test_lock_retries_failed_save(make_manager, reopen, monkeypatch):
+    pm = make_manager(entries=1)
+    monkeypatch.setattr(password_storage, 'atomic_write', _fail)
+    with pytest.raises(OSError):
+        pm.add_entry("Neu", "user", "pw")
+    
+    with pytest.raises(OSError):
+        pm.lock_database()
+    assert pm.is_unlocked
+    
+    monkeypatch.undo()
+    pm.lock_database()
+    assert reopen().get_entry("Neu").password == "pw"
+
+
+def test_failed_journal_and_save_reach_caller(make_manager, monkeypatch):
+    pm = make_manager(entries=1, journal_enabled=True)
+    pm.checkpoint()
+    # Ein Verzeichnis an Stelle des Journals: Anhängen schlägt fehl, danach auch das Speichern
+    os.mkdir(pm.journal_file)
+    monkeypatch.setattr(password_storage, 'atomic_write', _fail)
+    
+    with pytest.raises(OSError):
+        pm.add_entry("Neu", "user", "pw")
+
+
+def test_failed_journal_append_is_reported(make_manager, reopen, monkeypatch):
+    pm = make_manager(entries=1, journal_enabled=True)
+    pm.checkpoint()
+    # Nur das Journal scheitert, das ersatzweise Speichern des Tresors gelingt
+    monkeypatch.setattr(pm.encryptor, 'encrypt_data', _fail)
+    
+    pm.add_entry("Neu", "user", "pw")
+    warnings = pm.take_storage_warnings()
+    assert len(warnings) == 1 and "Journal" in warnings[0]
+    assert pm.take_storage_warnings() == []
+    assert reopen().get_entry("Neu").password == "pw"
+
+
+def test_failed_save_after_unlock_is_reported(make_manager, vault_path, monkeypatch):
+    make_manager(entries=2).lock_database()
+    # Unlesbares Journal: das Entsperren speichert sofort einen neuen Snapshot
+    with open(vault_path + password_storage.PasswordManager.JOURNAL_SUFFIX, 'wb') as f:
+        f.write(b"kaputt\n")
+    monkeypatch.setattr(password_storage, 'atomic_write', _fail)
+    
+    pm = password_storage.PasswordManager(vault_path)
+    assert pm.unlock_database("master")
+    assert "simulierter Fehler" in pm.take_storage_warnings()[0]
+    assert pm._save_failed
@@ -0,0 +1,76 @@
+import pytest
+from cryptography.exceptions import InvalidTag
+
+from core import secret_store
+from core.password_storage import PasswordEntry
+from core.secret_store import SecretStore
+
+
+def test_seal_and_reveal_round_trip():
+    store = SecretStore()
+    token = store.seal("geheim ü")
+    
+    assert b"geheim" not in token
+    assert store.reveal(token) == "geheim ü"
+    assert store.seal("geheim ü") != token
+    assert store.seal("") == b'' and store.reveal(b'') == ''
+
+
+def test_other_store_cannot_reveal():
+    token = SecretStore().seal("geheim")
+    with pytest.raises(InvalidTag):
+        SecretStore().reveal(token)
+
+
+def test_cache_evicts_least_recently_used():
+    store = SecretStore(cache_size=2)
+    tokens = [store.seal(f"wert {i}") for i in range(3)]
+    
+    store.reveal(tokens[0])
+    store.reveal(tokens[1])
+    store.reveal(tokens[0])
+    store.reveal(tokens[2])
+    
+    assert store.cached_count == 2
+    assert set(store._cache) == {tokens[0], tokens[2]}
+
+
+def test_cache_expires_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(secret_store.time, 'monotonic', lambda: now[0])
+    store = SecretStore(cache_ttl=10)
+    token = store.seal("wert")
+    
+    store.reveal(token)
+    now[0] += 5
+    store.purge_expired()
+    assert store.cached_count == 1
+    
+    now[0] += 10
+    store.purge_expired()
+    assert store.cached_count == 0
+    assert store.reveal(token) == "wert"
+
+
+def test_reveal_without_cache_and_clear():
+    store = SecretStore()
+    token = store.seal("wert")
+    
+    assert store.reveal(token, cache=False) == "wert"
+    assert store.cached_count == 0
+    
+    store.reveal(token)
+    store.clear()
+    assert store.cached_count == 0
+
+
+def test_entry_keeps_secrets_sealed():
+    store = SecretStore()
+    entry = PasswordEntry("Titel", "user", "passwort", notes="notiz", secret_store=store)
+    
+    assert b"passwort" not in entry._password and b"notiz" not in entry._notes
+    assert entry.password_length == len("passwort")
+    assert entry.has_notes()
+    assert store.cached_count == 0
+    assert entry.password == "passwort"
+    assert store.cached_count == 1
@@ -0,0 +1,31 @@
+def test_soft_lock_round_trip(make_manager, reopen):
+    make_manager(entries=10).lock_database()
+    pm = reopen()
+    pm.lock_database(soft=True)
+    
+    assert not pm.is_unlocked and pm.entries == []
+    assert pm.unlock_database("master")
+    assert pm.get_entry("Entry 9").password == "secret-9"
+
+
+def test_soft_lock_rejects_wrong_password(make_manager, reopen):
+    make_manager(entries=3).lock_database()
+    pm = reopen()
+    pm.lock_database(soft=True)
+    
+    assert not pm.unlock_database("falsch")
+    assert pm.last_unlock_error == 'password'
+    assert pm.unlock_database("master")
+
+
+def test_changed_file_invalidates_soft_lock_image(make_manager, reopen):
+    make_manager(entries=3).lock_database()
+    pm = reopen()
+    pm.lock_database(soft=True)
+    
+    other = reopen()
+    assert other.add_entry("Neu", "user", "pw")
+    other.lock_database()
+    
+    assert pm.unlock_database("master")
+    assert pm.get_entry("Neu").password == "pw"
@@ -0,0 +1,30 @@
+from core.password_storage import PasswordEntry
+
+
+def test_title_index_with_duplicates(make_manager):
+    pm = make_manager()
+    pm.entries = [PasswordEntry("Dup", "a", "1"), PasswordEntry("dup", "b", "2"), PasswordEntry("Solo", "c", "3")]
+    pm._rebuild_index()
+    
+    first = pm.get_entry("DUP")
+    pm.update_entry(first, category="Work")
+    assert pm.get_entry("dup") is first
+    
+    pm.update_entry(first, title="Other")
+    assert pm.get_entry("dup").username == "b"
+    assert pm.get_entry("other") is first
+    
+    assert pm.delete_entry("dup")
+    assert pm.get_entry("dup") is None
+    assert not pm.add_entry("solo", "d", "4")
+    assert pm.add_entry("Dup", "e", "5")
+
+
+def test_title_lookup_is_case_insensitive(make_manager):
+    pm = make_manager(entries=5)
+    
+    assert pm.get_entry("ENTRY 3").username == "user3"
+    assert pm.get_entry("fehlt") is None
+    assert not pm.add_entry("entry 3", "x", "y")
+    assert pm.update_entry(pm.get_entry("Entry 4"), title="Neu")
+    assert pm.get_entry("entry 4") is None and pm.get_entry("NEU").username == "user4"
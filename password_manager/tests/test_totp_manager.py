@@ -0,0 +1,270 @@
+import base64
+
+import pyotp
+import pytest
+
+from core import totp_manager
+from core.totp_manager import (
+    PARAMS_CACHE_SIZE, PRECOMPUTE_LEAD, QR_CACHE_SIZE, REFRESH_SLACK_MS, TOTPManager, format_otp_params,
+    parse_otp_params, parse_otpauth_uri
+)
+
+SECRET = "JBSWY3DPEHPK3PXP"
+# Testschlüssel aus RFC 4226 (Anhang D) und RFC 6238 (Anhang B)
+RFC_SEED = b"12345678901234567890"
+RFC_SECRETS = {
+    'SHA1': base64.b32encode(RFC_SEED).decode(),
+    'SHA256': base64.b32encode(RFC_SEED + RFC_SEED[:12]).decode(),
+    'SHA512': base64.b32encode(RFC_SEED * 3 + RFC_SEED[:4]).decode(),
+}
+HOTP_VECTORS = ["755224", "287082", "359152", "969429", "338314",
+                "254676", "287922", "162583", "399871", "520489"]
+TOTP_VECTORS = [
+    (59, {'SHA1': "94287082", 'SHA256': "46119246", 'SHA512': "90693936"}),
+    (1111111109, {'SHA1': "07081804", 'SHA256': "68084774", 'SHA512': "25091201"}),
+    (1111111111, {'SHA1': "14050471", 'SHA256': "67062674", 'SHA512': "99943326"}),
+    (1234567890, {'SHA1': "89005924", 'SHA256': "91819424", 'SHA512': "93441116"}),
+    (2000000000, {'SHA1': "69279037", 'SHA256': "90698825", 'SHA512': "38618901"}),
+    (20000000000, {'SHA1': "65353130", 'SHA256': "77737706", 'SHA512': "47863826"}),
+]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000_020.0]
+    monkeypatch.setattr(totp_manager.time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = TOTPManager()
+    compute_batch = manager.compute_batch
+    manager.batches = []
+    
+    def counting(secrets, timestamp=None, params=''):
+        manager.batches.append(list(secrets))
+        return compute_batch(secrets, timestamp, params)
+    
+    monkeypatch.setattr(manager, 'compute_batch', counting)
+    return manager
+
+
+def test_code_is_computed_once_per_time_step(manager, clock):
+    code, remaining = manager.get_current_totp(SECRET)
+    clock[0] += 1
+    
+    assert manager.get_current_totp(SECRET) == (code, remaining - 1)
+    assert len(manager.batches) == 1
+    
+    clock[0] += 30
+    manager.get_current_totp(SECRET)
+    assert len(manager.batches) == 2
+
+
+def test_next_window_is_precomputed(manager, clock):
+    period = 30
+    clock[0] = (clock[0] // period + 1) * period - PRECOMPUTE_LEAD + 0.5
+    manager.get_current_totp(SECRET)
+    assert len(manager.batches) == 2
+    
+    clock[0] += PRECOMPUTE_LEAD
+    code, remaining = manager.get_current_totp(SECRET)
+    assert len(manager.batches) == 2
+    assert remaining == period
+    assert code == TOTPManager().compute_batch([SECRET], clock[0])[SECRET]
+
+
+def test_invalid_secret_gives_no_code(manager, clock):
+    assert manager.get_current_totp("zu kurz") == (None, 0)
+    assert manager.get_current_totp("") == (None, 0)
+    assert manager.get_current_totp(SECRET, "digits=99") == (None, 0)
+
+
+def test_clear_cache_drops_codes_and_keys(manager, clock):
+    manager.get_current_totp(SECRET)
+    manager.clear_cache()
+    
+    assert manager._keys == {} and manager._windows == {}
+    manager.get_current_totp(SECRET)
+    assert len(manager.batches) == 2
+
+
+@pytest.mark.parametrize("counter, expected", list(enumerate(HOTP_VECTORS)))
+def test_compute_batch_matches_rfc4226(counter, expected):
+    codes = TOTPManager().compute_batch([RFC_SECRETS['SHA1']], params=f"type=hotp&counter={counter}")
+    assert codes[RFC_SECRETS['SHA1']] == expected
+
+
+@pytest.mark.parametrize("timestamp, expected", TOTP_VECTORS)
+def test_compute_batch_matches_rfc6238(timestamp, expected):
+    manager = TOTPManager()
+    for algorithm, code in expected.items():
+        secret = RFC_SECRETS[algorithm]
+        assert manager.compute_batch([secret], timestamp, f"digits=8&algorithm={algorithm}")[secret] == code
+
+
+def test_compute_batch_handles_many_and_invalid_secrets():
+    secrets = [pyotp.random_base32() for _ in range(50)] + ["ungültig"]
+    codes = TOTPManager().compute_batch(secrets, 1_700_000_000)
+    
+    assert codes["ungültig"] is None
+    for secret in secrets[:-1]:
+        assert codes[secret] == pyotp.TOTP(secret).at(1_700_000_000)
+    assert TOTPManager().compute_batch([SECRET], params="type=unbekannt") == {SECRET: None}
+
+
+def test_otp_params_round_trip():
+    params = parse_otp_params("type=HOTP&counter=7&digits=8&algorithm=sha256&issuer=Beispiel")
+    
+    assert params == {'type': 'hotp', 'period': 30, 'digits': 8, 'algorithm': 'SHA256', 'counter': 7}
+    assert parse_otp_params(format_otp_params(params)) == params
+    assert format_otp_params(parse_otp_params("")) == ""
+    assert format_otp_params(parse_otp_params("period=60&counter=3")) == "period=60"
+
+
+@pytest.mark.parametrize("text", ["type=motp", "algorithm=MD5", "digits=5", "period=0", "counter=-1", "digits=x"])
+def test_invalid_otp_params_are_rejected(text):
+    with pytest.raises(ValueError):
+        parse_otp_params(text)
+
+
+def test_parse_otpauth_uri():
+    secret, params = parse_otpauth_uri(
+        f"otpauth://totp/Beispiel:user?secret={SECRET}&issuer=Beispiel&period=60&digits=8&algorithm=SHA512")
+    assert secret == SECRET
+    assert parse_otp_params(params) == {'type': 'totp', 'period': 60, 'digits': 8, 'algorithm': 'SHA512',
+                                        'counter': 0}
+    
+    assert parse_otpauth_uri(f"otpauth://hotp/user?secret={SECRET}&counter=5") == (SECRET, "type=hotp&counter=5")
+    for uri in ("https://example.com/?secret=X", "otpauth://totp/user?issuer=Beispiel"):
+        with pytest.raises(ValueError):
+            parse_otpauth_uri(uri)
+
+
+def test_take_code_advances_hotp_counter(make_manager):
+    pm = make_manager()
+    pm.add_entry("HOTP", "user", "pw", totp_secret=RFC_SECRETS['SHA1'], otp_params="type=hotp")
+    entry = pm.get_entry("HOTP")
+    manager = TOTPManager()
+    
+    assert manager.get_current_totp(entry.totp_secret, entry.otp_params) == (HOTP_VECTORS[0], None)
+    assert manager.take_code(entry, pm) == (HOTP_VECTORS[0], None)
+    assert entry.otp_params == "type=hotp&counter=1"
+    assert manager.take_code(entry, pm) == (HOTP_VECTORS[1], None)
+    assert entry.otp_params == "type=hotp&counter=2"
+
+
+def test_hotp_cache_keeps_only_current_counter():
+    manager = TOTPManager()
+    secret = RFC_SECRETS['SHA1']
+    
+    for counter in range(PARAMS_CACHE_SIZE + 50):
+        manager.get_current_totp(secret, f"type=hotp&counter={counter}")
+    assert len(manager._hotp_codes) == 1
+    assert len(manager._params) == PARAMS_CACHE_SIZE
+    
+    assert manager.get_current_totp(secret, "type=hotp&counter=9") == (HOTP_VECTORS[9], None)
+    assert len(manager._hotp_codes) == 1
+
+
+def test_take_code_leaves_totp_entry_unchanged(make_manager, clock):
+    pm = make_manager()
+    pm.add_entry("TOTP", "user", "pw", totp_secret=SECRET)
+    entry = pm.get_entry("TOTP")
+    
+    code, remaining = TOTPManager().take_code(entry, pm)
+    assert code and remaining == 30
+    assert entry.otp_params == ""
+
+
+def test_next_refresh_ms(clock):
+    manager = TOTPManager()
+    clock[0] = 1_000_000_040.25
+    
+    assert manager.next_refresh_ms(["", "period=60"]) == 750 + REFRESH_SLACK_MS
+    assert manager.next_refresh_ms(["", "period=60"], countdown=False) == 9750 + REFRESH_SLACK_MS
+    assert manager.next_refresh_ms(["period=60"], countdown=False) == 39750 + REFRESH_SLACK_MS
+    assert manager.next_refresh_ms(["type=hotp", "digits=99"]) is None
+    assert manager.next_refresh_ms([]) is None
+
+
+def test_verify_totp_uses_otp_params(clock):
+    manager = TOTPManager()
+    secret = RFC_SECRETS['SHA256']
+    params = "period=60&digits=8&algorithm=SHA256"
+    code = manager.compute_batch([secret], clock[0], params)[secret]
+    
+    assert len(code) == 8
+    assert manager.verify_totp(secret, code, params)
+    assert not manager.verify_totp(secret, code)
+    
+    clock[0] += 60
+    assert not manager.verify_totp(secret, code, params)
+    assert manager.verify_totp(secret, code, params, window=1)
+
+
+def test_verify_hotp_looks_ahead_within_window():
+    manager = TOTPManager()
+    secret = RFC_SECRETS['SHA1']
+    
+    assert manager.verify_totp(secret, HOTP_VECTORS[0], "type=hotp")
+    assert not manager.verify_totp(secret, HOTP_VECTORS[2], "type=hotp")
+    assert manager.verify_totp(secret, HOTP_VECTORS[2], "type=hotp", window=2)
+    assert not manager.verify_totp(secret, "", "type=hotp")
+
+
+@pytest.fixture
+def qr_manager(monkeypatch):
+    manager = TOTPManager()
+    render_qr = manager._render_qr
+    manager.renders = []
+    
+    def counting(provisioning_uri):
+        manager.renders.append(provisioning_uri)
+        return render_qr(provisioning_uri)
+    
+    monkeypatch.setattr(manager, '_render_qr', counting)
+    return manager
+
+
+def test_qr_image_comes_from_cache(qr_manager):
+    image = qr_manager.get_qr_image(SECRET, "alice", 120)
+    
+    assert image.size == (120, 120)
+    assert qr_manager.get_qr_image(SECRET, "alice", 120) is image
+    assert len(qr_manager.renders) == 1
+
+
+def test_qr_sizes_are_cached_separately(qr_manager):
+    small = qr_manager.get_qr_image(SECRET, "alice", 100)
+    large = qr_manager.get_qr_image(SECRET, "alice", 200)
+    
+    assert small is not large
+    assert (small.size, large.size) == ((100, 100), (200, 200))
+    assert qr_manager.get_qr_image(SECRET, "alice", 100) is small
+    assert len(qr_manager.renders) == 2
+
+
+def test_qr_cache_evicts_least_recently_used(qr_manager):
+    first = qr_manager.get_qr_image(SECRET, "account 0", 64)
+    for i in range(1, QR_CACHE_SIZE):
+        qr_manager.get_qr_image(SECRET, f"account {i}", 64)
+    # Zugriff macht den ersten Eintrag wieder zum jüngsten, verdrängt wird "account 1"
+    assert qr_manager.get_qr_image(SECRET, "account 0", 64) is first
+    qr_manager.get_qr_image(SECRET, f"account {QR_CACHE_SIZE}", 64)
+    
+    assert len(qr_manager._qr_cache) == QR_CACHE_SIZE
+    assert qr_manager.get_qr_image(SECRET, "account 0", 64) is first
+    renders = len(qr_manager.renders)
+    qr_manager.get_qr_image(SECRET, "account 1", 64)
+    assert len(qr_manager.renders) == renders + 1
+
+
+def test_clear_cache_drops_qr_images(qr_manager):
+    image = qr_manager.get_qr_image(SECRET, "alice", 120)
+    qr_manager.clear_cache()
+    
+    assert len(qr_manager._qr_cache) == 0
+    assert qr_manager.get_qr_image(SECRET, "alice", 120) is not image
+    assert len(qr_manager.renders) == 2
@@ -0,0 +1,52 @@
+import pytest
+
+
+def test_transaction_rollback_restores_memory_and_file(make_manager, reopen):
+    pm = make_manager(entries=5)
+    with pytest.raises(RuntimeError):
+        with pm.transaction():
+            pm.update_entry(pm.get_entry("Entry 1"), password="changed")
+            pm.delete_entry("Entry 2")
+            raise RuntimeError
+    
+    assert pm.get_entry("Entry 1").password == "secret-1"
+    assert pm.get_entry("Entry 2") is not None
+    assert reopen().get_entry("Entry 1").password == "secret-1"
+
+
+def test_transaction_rollback_with_lazy_secrets(make_manager, reopen):
+    make_manager(entries=5).lock_database()
+    pm = reopen()
+    
+    with pytest.raises(RuntimeError):
+        with pm.transaction():
+            pm.update_entry(pm.get_entry("Entry 4"), password="changed")
+            raise RuntimeError
+    
+    assert pm.get_entry("Entry 4").password == "secret-4"
+
+
+def test_nested_transactions_save_once(make_manager, reopen, monkeypatch):
+    pm = make_manager(entries=3)
+    saves = []
+    write_snapshot = pm._write_snapshot
+    monkeypatch.setattr(pm, '_write_snapshot', lambda: saves.append(1) or write_snapshot())
+    
+    with pm.transaction():
+        pm.add_entry("Outer", "user", "secret")
+        with pm.transaction():
+            pm.add_entry("Inner", "user", "secret")
+            pm.delete_entry("Entry 0")
+        assert saves == []
+    
+    assert len(saves) == 1
+    reopened = reopen()
+    assert reopened.get_entry("Inner") is not None and reopened.get_entry("Entry 0") is None
+
+
+def test_transaction_without_changes_does_not_save(make_manager, monkeypatch):
+    pm = make_manager(entries=1)
+    monkeypatch.setattr(pm, '_write_snapshot', lambda: pytest.fail("unerwartetes Speichern"))
+    
+    with pm.transaction():
+        pm.get_entry("Entry 0")
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from core.password_storage import PasswordManager
+
+
+def test_unlock_reports_phases(make_manager, vault_path):
+    make_manager(entries=3).lock_database()
+    phases = []
+    
+    assert PasswordManager(vault_path).unlock_database("master", phases.append)
+    assert phases == ['read', 'kdf', 'decrypt', 'parse', 'index']
+
+
+def test_cancelled_unlock_keeps_state_of_newer_attempt(make_manager, vault_path):
+    make_manager(entries=3).lock_database()
+    pm = PasswordManager(vault_path)
+    cancel_event = threading.Event()
+    
+    def progress(phase):
+        if phase == 'decrypt':
+            # Ein neuerer Versuch hat inzwischen sein Ergebnis gemeldet
+            pm.last_unlock_error = 'missing'
+            cancel_event.set()
+    
+    assert not pm.unlock_database("master", progress, cancel_event)
+    assert not pm.is_unlocked
+    assert pm.last_unlock_error == 'missing'
+
+
+@pytest.mark.parametrize("layout, salvageable", [("records", True), ("blob", False)])
+def test_corrupt_vault_offers_salvage_only_for_records(make_manager, vault_path, layout, salvageable):
+    make_manager(entries=40, vault_layout=layout).lock_database()
+    with open(vault_path, 'r+b') as f:
+        f.seek(-1, 2)
+        last = f.read(1)
+        f.seek(-1, 2)
+        f.write(bytes([last[0] ^ 0xFF]))
+    
+    pm = PasswordManager(vault_path)
+    assert not pm.unlock_database("master")
+    assert pm.last_unlock_error == 'corrupt'
+    assert pm.supports_salvage() == salvageable
+
+
+def test_unlock_takes_file_lock_before_manager_lock(make_manager, vault_path):
+    make_manager(entries=3).lock_database()
+    # Unlesbares Journal: das Entsperren speichert sofort einen neuen Snapshot
+    with open(vault_path + PasswordManager.JOURNAL_SUFFIX, 'wb') as f:
+        f.write(b"kaputt\n")
+    pm = PasswordManager(vault_path)
+    indexing = threading.Event()
+    saving = threading.Event()
+    
+    def progress(phase):
+        if phase == 'index':
+            indexing.set()
+            saving.wait(5)
+    
+    worker = threading.Thread(target=pm.unlock_database, args=("master", progress))
+    worker.start()
+    assert indexing.wait(5)
+    # Wie ein laufendes Hintergrund-Speichern: hält _file_lock und braucht danach _lock
+    with pm._file_lock:
+        saving.set()
+        time.sleep(0.05)
+        assert pm._lock.acquire(timeout=1)
+        pm._lock.release()
+    worker.join(5)
+    assert pm.is_unlocked
+
+
+@pytest.mark.parametrize("fast_kdf", ["scrypt"], indirect=True)
+def test_scrypt_vault_round_trip(vault_path, fast_kdf):
+    pm = PasswordManager(vault_path)
+    pm.create_new_database("master", fast_kdf)
+    pm.add_entry("Neu", "user", "pw")
+    pm.lock_database()
+    
+    reopened = PasswordManager(vault_path)
+    assert not reopened.unlock_database("falsch")
+    assert reopened.last_unlock_error == 'password'
+    assert reopened.unlock_database("master")
+    assert reopened.encryptor.get_kdf_params() == fast_kdf
+    assert reopened.get_entry("Neu").password == "pw"
@@ -0,0 +1,60 @@
+import json
+import os
+
+import pytest
+
+from core.password_storage import PasswordManager
+from core.vault_format import decode_vault, encode_vault
+
+
+def test_binary_vault_round_trip(entry_rows):
+    data = {'created': "2024-01-01T00:00:00", 'entries': entry_rows(50)}
+    decoded = decode_vault(encode_vault(data))
+    
+    assert decoded['created'] == data['created']
+    assert decoded['entries'] == data['entries']
+
+
+def test_legacy_json_vault_is_still_readable(entry_rows):
+    data = {'version': '1.0', 'entries': entry_rows(3)}
+    assert decode_vault(json.dumps(data, indent=2).encode('utf-8')) == data
+
+
+def test_missing_values_are_stored_as_empty_fields():
+    data = {'entries': [{'title': "Kurz", 'username': None, 'notes': None}]}
+    entry = decode_vault(encode_vault(data))['entries'][0]
+    
+    assert entry['title'] == "Kurz"
+    assert entry['username'] == "" and entry['notes'] == "" and entry['url'] == ""
+
+
+@pytest.mark.parametrize("layout, cipher, compression", [
+    ("records", "aes-256-gcm", "none"),
+    ("records", "aes-256-gcm", "zlib"),
+    ("blob", "aes-256-gcm", "lzma"),
+    ("blob", "fernet", "none"),
+    # Fernet gibt es nur im Block-Format, der Manager fällt darauf zurück
+    ("records", "fernet", "zlib"),
+])
+def test_manager_round_trip(make_manager, vault_path, layout, cipher, compression):
+    pm = make_manager(entries=70, vault_layout=layout, cipher=cipher, compression=compression)
+    pm.lock_database()
+    
+    reopened = PasswordManager(vault_path)
+    assert reopened.unlock_database("master")
+    assert len(reopened.entries) == 70
+    entry = reopened.get_entry("entry 11")
+    assert entry.password_length == len("secret-11")
+    assert entry.has_notes() and not entry.has_totp()
+    assert entry.password == "secret-11"
+    assert entry.notes == "note 11"
+    assert reopened.get_entry("Entry 10").has_totp()
+
+
+def test_wrong_password_is_rejected(make_manager, vault_path):
+    make_manager(entries=5).lock_database()
+    pm = PasswordManager(vault_path)
+    
+    assert not pm.unlock_database("falsch")
+    assert pm.last_unlock_error == 'password'
+    assert not os.path.exists(vault_path + ".damaged")